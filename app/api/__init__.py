@@ -1,3 +1,3 @@
-from .routes import router
+from .routes import router, job_queue
 
-__all__ = ["router"]
\ No newline at end of file
+__all__ = ["router", "job_queue"]
\ No newline at end of file
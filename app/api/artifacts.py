@@ -0,0 +1,107 @@
+import re
+from typing import Optional
+from fastapi import Request, Response
+from fastapi.responses import StreamingResponse
+
+# Artifacts never change once written, so clients and CDNs may keep them
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    """If-None-Match comparison (weak, as RFC 9110 requires for GET)"""
+    if header.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in header.split(","))
+
+
+def _parse_range(header: str, size: int) -> Optional[tuple[int, int]]:
+    """
+    (start, end) of a single byte range, inclusive
+
+    Returns None for headers that should be ignored (multiple ranges,
+    unknown units) and raises ValueError for unsatisfiable ranges.
+    """
+    match = _RANGE.match(header.strip())
+    if not match:
+        return None
+
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            raise ValueError("Empty suffix range")
+        return max(size - length, 0), size - 1
+
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError("Range not satisfiable")
+    return start, end
+
+
+def artifact_response(
+    request: Request,
+    store,
+    key: str,
+    media_type: str,
+    filename: str
+) -> Optional[Response]:
+    """
+    Serve a stored artifact with validators and range support
+
+    Sends a strong content-hash ETag and immutable Cache-Control, answers
+    If-None-Match with 304, and serves a single Range (honouring If-Range)
+    as 206. HEAD requests get the headers only. Returns None if the
+    artifact is not in the store.
+    """
+    info = store.info(key)
+    if info is None:
+        return None
+
+    headers = {
+        "ETag": info.etag,
+        "Cache-Control": CACHE_CONTROL,
+        "Accept-Ranges": "bytes"
+    }
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, info.etag):
+        return Response(status_code=304, headers=headers)
+
+    headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    if media_type.startswith("text/"):
+        media_type += "; charset=utf-8"
+
+    byte_range = None
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    # A stale If-Range validator means the client wants the whole artifact
+    if range_header and (not if_range or if_range.strip() == info.etag):
+        try:
+            byte_range = _parse_range(range_header, info.size)
+        except ValueError:
+            headers["Content-Range"] = f"bytes */{info.size}"
+            return Response(status_code=416, headers=headers)
+
+    status_code = 200
+    start, end = 0, info.size - 1
+    if byte_range:
+        status_code = 206
+        start, end = byte_range
+        headers["Content-Range"] = f"bytes {start}-{end}/{info.size}"
+    headers["Content-Length"] = str(end - start + 1)
+
+    if request.method == "HEAD":
+        return Response(status_code=status_code, headers=headers, media_type=media_type)
+
+    return StreamingResponse(
+        store.iter_range(key, start, end),
+        status_code=status_code,
+        headers=headers,
+        media_type=media_type
+    )
@@ -0,0 +1,136 @@
+import os
+import uuid
+import asyncio
+from functools import lru_cache
+from typing import TYPE_CHECKING
+from fastapi import HTTPException
+from app.schemas import AnalyzeRequest, BatchTrack, JobState, SongInfo
+from app.services import UpstreamError
+from app.services.job_queue import Job
+from app.services.events import event_broker
+from app.api.startup import load_pipeline
+
+if TYPE_CHECKING:
+    from app.services import SpotifyService
+
+
+def resolve_batch(spotify_service: "SpotifyService", spotify_url: str) -> list[SongInfo]:
+    """Resolve a playlist or album URL to track metadata with the bulk endpoints"""
+    try:
+        track_ids = spotify_service.get_collection_track_ids(spotify_url)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except UpstreamError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    if not track_ids:
+        raise HTTPException(status_code=400, detail="No tracks found in playlist or album")
+
+    max_tracks = int(os.getenv("BATCH_MAX_TRACKS", 200))
+    if len(track_ids) > max_tracks:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Batch has {len(track_ids)} tracks; the limit is {max_tracks}"
+        )
+
+    try:
+        return spotify_service.get_tracks_info(track_ids)
+    except UpstreamError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+
+def batch_tracks(songs: list[SongInfo]) -> list[BatchTrack]:
+    """Create the per-track progress entries and event streams of a new batch"""
+    tracks = [
+        BatchTrack(
+            task_id=str(uuid.uuid4()),
+            spotify_id=song.spotify_id,
+            title=song.title,
+            artist=song.artist
+        )
+        for song in songs
+    ]
+    for track in tracks:
+        _publish_track_status(track)
+    return tracks
+
+
+@lru_cache(maxsize=None)
+def batch_slots() -> asyncio.Semaphore:
+    """
+    Track analyses in progress across all batches, BATCH_CONCURRENCY in total
+
+    A batch holds one JOB_WORKERS slot however many tracks it has, so its
+    tracks count against this shared limit instead; without it every running
+    batch would add BATCH_CONCURRENCY pipelines of its own.
+    """
+    return asyncio.Semaphore(int(os.getenv("BATCH_CONCURRENCY", 2)))
+
+
+def _publish_track_status(track: BatchTrack):
+    """Report a track's state on its own event stream"""
+    data = {"error": track.error} if track.error else {}
+    event_broker.publish(track.task_id, track.status.value, **data)
+    if track.status not in (JobState.QUEUED, JobState.RUNNING):
+        event_broker.close(track.task_id)
+
+
+async def run_batch(
+    job: Job,
+    songs: list[SongInfo],
+    tracks: list[BatchTrack],
+    transpose: int,
+    spotify_service: "SpotifyService"
+) -> list[BatchTrack]:
+    """
+    Analyze every track of a batch under the shared batch_slots() limit
+
+    The track list is published on the job as soon as the batch starts so
+    progress can be polled; a failed track does not stop the others. Tracks
+    are not jobs of their own: their progress is on the batch and on each
+    track's event stream.
+    """
+    job.result = tracks
+    pipeline = await load_pipeline()
+    semaphore = batch_slots()
+
+    async def analyze(song: SongInfo, track: BatchTrack):
+        async with semaphore:
+            track.status = JobState.RUNNING
+            _publish_track_status(track)
+            try:
+                response = await pipeline.run_analysis(
+                    track.task_id,
+                    AnalyzeRequest(
+                        spotify_url=f"spotify:track:{song.spotify_id}",
+                        transpose=transpose
+                    ),
+                    spotify_service,
+                    song_info=song
+                )
+            except HTTPException as e:
+                track.error = e.detail
+                track.status = JobState.FAILED
+            except Exception as e:
+                track.error = f"Analysis failed: {str(e)}"
+                track.status = JobState.FAILED
+            else:
+                track.pdf_url = response.pdf_url
+                track.cached = response.cached
+                track.status = JobState.COMPLETED
+            _publish_track_status(track)
+
+    try:
+        await asyncio.gather(*(analyze(song, track) for song, track in zip(songs, tracks)))
+    finally:
+        cancel_batch_tracks(tracks)
+
+    return tracks
+
+
+def cancel_batch_tracks(tracks: list[BatchTrack]):
+    """Mark tracks left unfinished by a cancelled batch"""
+    for track in tracks:
+        if track.status in (JobState.QUEUED, JobState.RUNNING):
+            track.status = JobState.CANCELLED
+            _publish_track_status(track)
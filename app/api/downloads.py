@@ -0,0 +1,106 @@
+import os
+import json
+import time
+import uuid
+from pathlib import Path
+from typing import Optional
+from app.schemas import ChordSheet, ExportFormat
+from app.services import SheetExporter, get_artifact_store
+from app.services.metrics import EXPORT_DURATION
+from app.utils.chords import transpose_sheet
+
+# Scratch space for renders in progress
+TEMP_DIR = Path(os.getenv("TEMP_DIR", "./temp"))
+TEMP_DIR.mkdir(exist_ok=True)
+
+
+def task_sheet_key(task_id: str) -> str:
+    """Artifact key of a task's stored chord sheet"""
+    return f"{task_id}.json"
+
+
+def export_key(task_id: str, fmt: ExportFormat, semitones: int) -> str:
+    """Artifact key of a task's download in one format and key"""
+    return f"{task_id}.t{semitones % 12}.{fmt.value}"
+
+
+def save_task_sheet(task_id: str, chord_sheet: ChordSheet, transpose: int):
+    """Store a task's chord sheet alongside the key it was first rendered in"""
+    get_artifact_store().put(task_sheet_key(task_id), json.dumps({
+        "transpose": transpose,
+        "chord_sheet": chord_sheet.model_dump(mode="json")
+    }).encode("utf-8"))
+
+
+def load_task_sheet(task_id: str) -> Optional[tuple[ChordSheet, int]]:
+    """Load a task's chord sheet and original transposition"""
+    data = get_artifact_store().read(task_sheet_key(task_id))
+    if data is None:
+        return None
+
+    data = json.loads(data)
+    return ChordSheet.model_validate(data["chord_sheet"]), data["transpose"]
+
+
+def transpose_label(semitones: int, original_transpose: int) -> int:
+    """
+    Signed shift a render in one of the 12 keys is labelled with
+
+    The task's own key keeps the shift it was requested with; other keys
+    take the shortest direction, e.g. +10 as 2 semitones down.
+    """
+    if semitones % 12 == original_transpose % 12:
+        return original_transpose
+    return (semitones % 12 + 5) % 12 - 5
+
+
+def export_filename(task_id: str, fmt: ExportFormat, label: int) -> str:
+    """Download filename of a render, with its labelled shift"""
+    suffix = f"_{'up' if label > 0 else 'down'}{abs(label)}" if label else ""
+    return f"chord_sheet_{task_id}{suffix}.{fmt.value}"
+
+
+def render_task_export(
+    task_id: str,
+    fmt: ExportFormat,
+    transpose: Optional[int] = None
+) -> Optional[tuple[str, int]]:
+    """
+    Render a task's chord sheet in a format and key, once
+
+    Without ``transpose`` the sheet is rendered in the key it was requested
+    in. Each format is kept in the artifact store per task for each of the
+    12 keys, so repeat downloads are served from the store. Returns the
+    artifact key and the shift the render is labelled with, so the key, the
+    label in the sheet and the download filename always agree.
+    """
+    store = get_artifact_store()
+
+    stored = load_task_sheet(task_id)
+    if stored is None:
+        return None
+
+    chord_sheet, original_transpose = stored
+    if transpose is None:
+        transpose = original_transpose
+    semitones = transpose % 12
+    label = transpose_label(semitones, original_transpose)
+
+    key = export_key(task_id, fmt, semitones)
+    if store.exists(key):
+        return key, label
+
+    started = time.perf_counter()
+    if fmt == ExportFormat.PDF:
+        # Imported here so reportlab loads with the first PDF, not the app
+        from app.services.pdf_generator import PDFGenerator
+
+        # Rendered to a temp file, then moved into the store whole
+        tmp_path = TEMP_DIR / f"{task_id}.t{semitones}.{uuid.uuid4().hex}.tmp"
+        PDFGenerator().generate_chord_sheet(chord_sheet, str(tmp_path), transpose=label)
+        store.put_file(key, tmp_path)
+    else:
+        text = SheetExporter().render(transpose_sheet(chord_sheet, label), fmt, transpose=label)
+        store.put(key, text.encode("utf-8"))
+    EXPORT_DURATION.labels(format=fmt.value).observe(time.perf_counter() - started)
+    return key, label
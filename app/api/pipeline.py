@@ -0,0 +1,631 @@
+import os
+import json
+import time
+import asyncio
+from pathlib import Path
+from typing import Awaitable, Optional, TypeVar, Union
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+from crewai import Crew, Process
+from pydantic import BaseModel
+from app.schemas import AnalyzeRequest, AnalyzeResponse, SongInfo, AudioAnalysis, ChordSheet, ChordLine, CachedAnalysis, StageTiming, PreviewDownload, ExportFormat
+from app.services import SpotifyService, get_analysis_cache, get_spotify_service, get_genius_service, enable_agent_llm_cache, UpstreamError
+from app.services.events import event_broker
+from app.services.metrics import STAGE_DURATION, PREVIEW_BYTES, PREVIEW_FIRST_BYTE, enable_llm_metrics
+from app.services.single_flight import analysis_flights
+from app.crew import MusicAgents, MusicTasks, AudioChordAnalysisTool, LyricsChordMapperTool
+from app.crew.tools import LYRICS_NOT_FOUND
+from app.utils import AudioUtils, MusicEstimator
+from app.api.downloads import save_task_sheet, render_task_export
+
+# Scratch space for preview audio
+TEMP_DIR = Path(os.getenv("TEMP_DIR", "./temp"))
+TEMP_DIR.mkdir(exist_ok=True)
+
+# litellm is configured with the pipeline that uses it, so processes that
+# never analyze a track (or haven't yet) don't pay for importing it
+enable_agent_llm_cache()
+enable_llm_metrics()
+
+T = TypeVar("T")
+
+# A preview file path (the agents hand the tool a path), or a decoded mono
+# signal and its sample rate
+Audio = Union[str, tuple]
+
+
+class StageTimer:
+    """
+    Record start and end times of pipeline stages, including overlapping ones
+
+    With a task ID, stage starts and finishes and partial results are also
+    published to the task's event stream. A timer shared by several tasks
+    publishes to every task ID in ``task_ids``, which may change while the
+    stages run.
+    """
+
+    def __init__(self, task_id: Optional[str] = None, task_ids: Optional[list[str]] = None):
+        self.task_ids = task_ids if task_ids is not None else [task_id] if task_id else []
+        self.stages: list[StageTiming] = []
+
+    def publish(self, event: str, **data):
+        for task_id in list(self.task_ids):
+            event_broker.publish(task_id, event, **data)
+
+    def partial(self, stage: str, **data):
+        """Publish a result that is available before the pipeline finishes"""
+        self.publish("partial", stage=stage, data=data)
+
+    async def run(self, name: str, awaitable: Awaitable[T]) -> T:
+        """Await a stage and record its wall-clock span"""
+        start = time.time()
+        self.publish("stage_started", stage=name)
+        result, ok, outcome = None, False, "error"
+        try:
+            result = await awaitable
+            ok, outcome = True, "ok"
+            return result
+        except asyncio.CancelledError:
+            outcome = "cancelled"
+            raise
+        finally:
+            end = time.time()
+            STAGE_DURATION.labels(stage=name, outcome=outcome).observe(end - start)
+            self.stages.append(StageTiming(
+                name=name,
+                start=start,
+                end=end,
+                duration_ms=round((end - start) * 1000, 1)
+            ))
+            self.publish(
+                "stage_finished",
+                stage=name,
+                ok=ok,
+                duration_ms=self.stages[-1].duration_ms,
+                payload_bytes=_payload_size(result)
+            )
+
+
+def _payload_size(value) -> int:
+    """Approximate size in bytes of a stage's output"""
+    if value is None:
+        return 0
+    if isinstance(value, PreviewDownload):
+        return value.size_bytes
+    if isinstance(value, Path):
+        return value.stat().st_size if value.exists() else 0
+    if isinstance(value, bytes):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode())
+    if isinstance(value, BaseModel):
+        return len(value.model_dump_json())
+    if isinstance(value, tuple):
+        return sum(_payload_size(item) for item in value)
+    if hasattr(value, "nbytes"):
+        return int(value.nbytes)
+    return len(json.dumps(value, default=str))
+
+
+async def _in_thread(func, *args, **kwargs):
+    """
+    run_in_threadpool whose thread finishes before a cancellation propagates
+
+    Cancelling a plain run_in_threadpool await returns at once while the
+    thread keeps reading the preview or waiting on an upstream call, so the
+    caller could clean up from under it.
+    """
+    call = asyncio.ensure_future(run_in_threadpool(func, *args, **kwargs))
+    try:
+        return await asyncio.shield(call)
+    except asyncio.CancelledError:
+        await asyncio.wait([call])
+        raise
+
+
+async def _gather(*awaitables: Awaitable) -> list:
+    """
+    Run stages concurrently; if one fails the others are cancelled
+
+    The cancelled stages are awaited before the error propagates, so their
+    blocking calls have finished by the time the caller cleans up.
+    """
+    tasks = [asyncio.ensure_future(awaitable) for awaitable in awaitables]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
+async def run_analysis(
+    task_id: str,
+    request: AnalyzeRequest,
+    spotify_service: Optional[SpotifyService] = None,
+    song_info: Optional[SongInfo] = None
+) -> AnalyzeResponse:
+    """
+    Run the full analysis pipeline for one request
+
+    Pass song_info when the track metadata is already known (e.g. from a
+    bulk lookup) to skip the metadata stage.
+
+    Stages form a dependency graph: once the track metadata is known, the
+    lyrics fetch runs concurrently with the download, estimation and audio
+    analysis branch, and chord mapping starts as soon as both are done.
+    Blocking stages (Spotify, CrewAI, ReportLab) are dispatched to the
+    threadpool so the event loop stays responsive while a job runs.
+    """
+
+    timer = StageTimer(task_id)
+
+    # Repeat requests for a track only pay for the render
+    try:
+        track_id = SpotifyService.extract_track_id(request.spotify_url)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    cached = await timer.run(
+        "cache_lookup",
+        run_in_threadpool(get_analysis_cache().get, track_id)
+    )
+    if cached:
+        return await _render_response(task_id, cached, request.transpose, cached=True, timer=timer)
+
+    # Concurrent requests for the same track share one analysis, then each
+    # renders its own key. The analysis publishes its stage events to every
+    # request still attached to it, so followers see progress even after the
+    # request that started it is cancelled
+    leader = analysis_flights.leader(track_id)
+    flight_timer = StageTimer(task_ids=[])
+    flight = analysis_flights.run(
+        track_id,
+        lambda: _analyze_track(task_id, request, flight_timer, spotify_service, song_info),
+        owner=task_id,
+        owners=flight_timer.task_ids
+    )
+    if leader is None:
+        entry = await flight
+        timer.stages.extend(flight_timer.stages)
+    else:
+        timer.publish("coalesced", leader_task_id=leader)
+        entry = await timer.run("coalesced", flight)
+
+    return await _render_response(task_id, entry, request.transpose, coalesced=leader is not None, timer=timer)
+
+
+async def _analyze_track(
+    task_id: str,
+    request: AnalyzeRequest,
+    timer: StageTimer,
+    spotify_service: Optional[SpotifyService] = None,
+    song_info: Optional[SongInfo] = None
+) -> CachedAnalysis:
+    """Analyze a track from metadata to the untransposed chord sheet"""
+
+    analysis_cache = get_analysis_cache()
+
+    # Steps 3-6 either go through CrewAI agents or call the services and
+    # tools directly. The agents hand the audio tool a file path; without
+    # them the preview stays in memory and is decoded once
+    pipeline_mode = os.getenv("PIPELINE_MODE", "crew").lower()
+    if pipeline_mode == "direct":
+        audio_path = None
+        fetch_lyrics, analyze_audio, map_chords = (
+            _fetch_lyrics_direct, _analyze_audio_direct, _map_chords_direct
+        )
+    else:
+        audio_path = TEMP_DIR / f"{task_id}.mp3"
+        fetch_lyrics, analyze_audio, map_chords = (
+            _fetch_lyrics_with_crew, _analyze_audio_with_crew, _map_chords_with_crew
+        )
+
+    try:
+        # Shared, already-authenticated client unless one is injected
+        spotify_service = spotify_service or get_spotify_service()
+
+        # Step 1: Get song info
+        if song_info is None:
+            song_info = await timer.run(
+                "metadata",
+                run_in_threadpool(spotify_service.get_track_info, request.spotify_url)
+            )
+        timer.partial("metadata", song_info=song_info.model_dump(mode="json"))
+
+        # Lyrics only need the title and artist, so they are fetched while
+        # the audio branch downloads and analyzes the preview
+        async def audio_branch() -> tuple[SongInfo, dict]:
+            download = await timer.run(
+                "download",
+                _download_preview(spotify_service, song_info, audio_path)
+            )
+            if audio_path is None:
+                # Estimation and audio analysis share one decoded signal
+                sample_rate = MusicEstimator().sample_rate
+                samples = await timer.run(
+                    "decode",
+                    _in_thread(AudioUtils.decode_audio_bytes, download.content, sample_rate)
+                )
+                audio = (samples, sample_rate)
+            else:
+                audio = str(audio_path)
+
+            updated_info, known_values, settled = await timer.run(
+                "estimate",
+                _estimate_known_values(song_info, audio)
+            )
+            timer.partial("estimate", **known_values)
+
+            audio_analysis = await timer.run(
+                "audio_analysis",
+                analyze_audio(updated_info, audio, settled, known_values)
+            )
+            if 'error' in audio_analysis:
+                # A failed analysis must not be reported as a chord sheet
+                raise HTTPException(status_code=502, detail=audio_analysis['error'])
+
+            # Settled values take precedence over what the analysis reported
+            audio_analysis.update(settled)
+            audio_analysis['confidence'] = known_values['confidence']
+            timer.partial("audio_analysis", **audio_analysis)
+            return updated_info, audio_analysis
+
+        async def lyrics_branch() -> str:
+            lyrics = await timer.run("lyrics", fetch_lyrics(request, song_info))
+            timer.partial("lyrics", lyrics=lyrics)
+            return lyrics
+
+        lyrics_text, (song_info, audio_analysis) = await _gather(
+            lyrics_branch(),
+            audio_branch()
+        )
+
+        chord_mapping = await timer.run(
+            "chord_mapping",
+            map_chords(lyrics_text, audio_analysis)
+        )
+        lines_data = chord_mapping.get('lines', [])
+        timer.partial("chord_mapping", lines=lines_data)
+
+        # Step 7: Create chord sheet structure
+        chord_lines = []
+        for line_obj in lines_data:
+            chord_lines.append(
+                ChordLine(
+                    lyrics_line=line_obj.get('lyrics_line', ''),
+                    chords=line_obj.get('chords', [])
+                )
+            )
+
+        chord_sheet = ChordSheet(
+            song_info=song_info,
+            key=audio_analysis.get('key', 'Unknown'),
+            tempo=audio_analysis.get('tempo', 0),
+            capo=None,  # Could be calculated based on transposition
+            lines=chord_lines
+        )
+
+        analysis = AudioAnalysis(
+            key=audio_analysis.get('key'),
+            tempo=audio_analysis.get('tempo'),
+            time_signature=audio_analysis.get('time_signature'),
+            chord_progressions=audio_analysis.get('chord_progressions', []),
+            structure=audio_analysis.get('structure'),
+            chord_timeline=audio_analysis.get('chord_timeline'),
+            confidence=audio_analysis.get('confidence')
+        )
+
+        # Only complete results are worth reusing
+        if chord_lines and 'error' not in chord_mapping:
+            return await run_in_threadpool(analysis_cache.put, analysis, chord_sheet)
+        return CachedAnalysis(
+            analysis=analysis,
+            chord_sheet=chord_sheet,
+            created_at=time.time()
+        )
+
+    except UpstreamError as e:
+        # Retries are exhausted; report the outage rather than a partial sheet
+        raise HTTPException(status_code=503, detail=str(e))
+
+    finally:
+        # Cleanup audio file; _gather has waited for every stage reading it
+        if audio_path and audio_path.exists():
+            audio_path.unlink()
+
+
+async def _download_preview(
+    spotify_service: SpotifyService,
+    song_info: SongInfo,
+    audio_path: Optional[Path]
+) -> PreviewDownload:
+    """Step 2: Download the audio preview, to disk or without a path to memory"""
+
+    if not song_info.preview_url:
+        raise HTTPException(
+            status_code=404,
+            detail="No preview URL available for this track"
+        )
+
+    download = await spotify_service.download_preview(
+        song_info.preview_url,
+        str(audio_path) if audio_path else None
+    )
+    if not download:
+        raise HTTPException(
+            status_code=404,
+            detail="Audio preview not available for this track"
+        )
+    # The download stage's duration is already in STAGE_DURATION
+    PREVIEW_BYTES.observe(download.size_bytes)
+    PREVIEW_FIRST_BYTE.observe(download.time_to_first_byte_ms / 1000)
+    return download
+
+
+async def _estimate_known_values(
+    song_info: SongInfo,
+    audio: Audio
+) -> tuple[SongInfo, dict, dict]:
+    """
+    Step 2b: Estimate key, tempo and meter locally
+
+    Estimates fill in missing Spotify audio features and cross-check the
+    reported ones. Returns the completed song info, the reconciled values
+    and the subset confident enough to hand to audio analysis as settled.
+    """
+
+    estimator = MusicEstimator()
+    if isinstance(audio, str):
+        estimates = await _in_thread(estimator.estimate_file, audio)
+    else:
+        estimates = await _in_thread(estimator.estimate, *audio)
+    known_values = MusicEstimator.reconcile(
+        {
+            "key": song_info.key,
+            "tempo": song_info.tempo,
+            "time_signature": song_info.time_signature
+        },
+        estimates
+    )
+    song_info = song_info.model_copy(update={
+        field: known_values[field]
+        for field in ("key", "tempo", "time_signature")
+        if getattr(song_info, field) is None and known_values[field] is not None
+    })
+
+    settled = MusicEstimator.settled_values(
+        known_values,
+        float(os.getenv("KNOWN_VALUE_MIN_CONFIDENCE", 0.5))
+    )
+
+    return song_info, known_values, settled
+
+
+async def _fetch_lyrics_with_crew(request: AnalyzeRequest, song_info: SongInfo) -> str:
+    """Confirm metadata and fetch lyrics with the CrewAI agents"""
+
+    metadata_agent = MusicAgents.metadata_agent()
+    lyrics_agent = MusicAgents.lyrics_agent()
+
+    fetch_metadata = MusicTasks.fetch_metadata_task(
+        request.spotify_url,
+        metadata_agent
+    )
+
+    fetch_lyrics = MusicTasks.fetch_lyrics_task(
+        song_info.title,
+        song_info.artist,
+        lyrics_agent
+    )
+
+    lyrics_crew = Crew(
+        agents=[metadata_agent, lyrics_agent],
+        tasks=[fetch_metadata, fetch_lyrics],
+        process=Process.sequential,
+        verbose=True
+    )
+
+    await _in_thread(lyrics_crew.kickoff)
+
+    try:
+        lyrics_result = json.loads(str(fetch_lyrics.output))
+    except json.JSONDecodeError as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to parse analysis results: {str(e)}"
+        )
+
+    # A song without lyrics gets a bar-line chart; a Genius outage fails the job
+    error = lyrics_result.get('error')
+    if error and error != LYRICS_NOT_FOUND:
+        raise HTTPException(status_code=503, detail=error)
+
+    return lyrics_result.get('lyrics', '')
+
+
+async def _analyze_audio_with_crew(
+    song_info: SongInfo,
+    audio_path: str,
+    settled: dict,
+    known_values: dict
+) -> dict:
+    """
+    Analyze the audio preview with the audio analyst agent
+
+    The agent hands the tool only the settled values, so ``known_values``
+    is not used here.
+    """
+
+    audio_analyst = MusicAgents.audio_analyst_agent()
+
+    analyze_audio = MusicTasks.analyze_audio_task(
+        audio_path,
+        song_info.title,
+        song_info.artist,
+        audio_analyst,
+        known_values=settled
+    )
+
+    audio_crew = Crew(
+        agents=[audio_analyst],
+        tasks=[analyze_audio],
+        process=Process.sequential,
+        verbose=True
+    )
+
+    await _in_thread(audio_crew.kickoff)
+
+    try:
+        return json.loads(str(analyze_audio.output))
+    except json.JSONDecodeError as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to parse analysis results: {str(e)}"
+        )
+
+
+async def _map_chords_with_crew(lyrics_text: str, audio_analysis: dict) -> dict:
+    """Map chords to lyrics with the chord mapper and quality control agents"""
+
+    chord_mapper = MusicAgents.chord_mapper_agent()
+    quality_controller = MusicAgents.quality_control_agent()
+
+    # Chords stay in the original key; transposition happens at render time
+    map_chords = MusicTasks.map_chords_to_lyrics_task(
+        lyrics_text,
+        json.dumps(audio_analysis),
+        0,
+        chord_mapper
+    )
+
+    review_task = MusicTasks.quality_review_task(
+        "",  # Will be filled after chord mapping
+        quality_controller
+    )
+
+    mapping_crew = Crew(
+        agents=[chord_mapper, quality_controller],
+        tasks=[map_chords, review_task],
+        process=Process.sequential,
+        verbose=True
+    )
+
+    await _in_thread(mapping_crew.kickoff)
+
+    try:
+        return json.loads(str(map_chords.output))
+    except json.JSONDecodeError:
+        raise HTTPException(
+            status_code=500,
+            detail="Failed to parse chord mapping"
+        )
+
+
+async def _fetch_lyrics_direct(request: AnalyzeRequest, song_info: SongInfo) -> str:
+    """
+    Fetch lyrics from Genius without agents
+
+    This stage is a plain API call, so skipping the agent saves an LLM
+    reasoning round-trip. Metadata was already fetched.
+    """
+
+    lyrics_data = await _in_thread(
+        get_genius_service().search_lyrics,
+        song_info.title,
+        song_info.artist
+    )
+    return lyrics_data.lyrics if lyrics_data else ''
+
+
+async def _analyze_audio_direct(
+    song_info: SongInfo,
+    audio: Audio,
+    settled: dict,
+    known_values: dict
+) -> dict:
+    """
+    Analyze the decoded preview by calling the analysis tool without agents
+
+    The local engine reuses the reconciled estimate instead of estimating
+    key, tempo and meter a second time.
+    """
+
+    samples, sample_rate = audio
+    result = await _in_thread(
+        AudioChordAnalysisTool().analyze_samples,
+        samples,
+        sample_rate,
+        song_info.title,
+        song_info.artist,
+        settled,
+        known_values
+    )
+
+    try:
+        return json.loads(result)
+    except json.JSONDecodeError as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to parse analysis results: {str(e)}"
+        )
+
+
+async def _map_chords_direct(lyrics_text: str, audio_analysis: dict) -> dict:
+    """Map chords to lyrics by calling the mapper tool without agents"""
+
+    result = await _in_thread(
+        LyricsChordMapperTool().run,
+        lyrics=lyrics_text,
+        chord_progressions=json.dumps(audio_analysis)
+    )
+
+    try:
+        return json.loads(result)
+    except json.JSONDecodeError:
+        raise HTTPException(
+            status_code=500,
+            detail="Failed to parse chord mapping"
+        )
+
+
+async def _render_response(
+    task_id: str,
+    entry: CachedAnalysis,
+    transpose: int,
+    cached: bool = False,
+    coalesced: bool = False,
+    timer: Optional[StageTimer] = None
+) -> AnalyzeResponse:
+    """
+    Store the chord sheet for a task and build the API response
+
+    Downloads are rendered on first request; PDF_EAGER_RENDER=true renders
+    the PDF here as well.
+    """
+    timer = timer or StageTimer(task_id)
+
+    async def render() -> Optional[str]:
+        # Persist the untransposed sheet so any format and key can be rendered later
+        await run_in_threadpool(save_task_sheet, task_id, entry.chord_sheet, transpose)
+        if os.getenv("PDF_EAGER_RENDER", "false").lower() == "true":
+            key, _ = await run_in_threadpool(render_task_export, task_id, ExportFormat.PDF)
+            return key
+        return None
+
+    await timer.run("render", render())
+
+    response = AnalyzeResponse(
+        status="success",
+        task_id=task_id,
+        pdf_url=f"/download/{task_id}",
+        song_info=entry.chord_sheet.song_info,
+        analysis=entry.analysis,
+        cached=cached,
+        coalesced=coalesced,
+        stages=timer.stages,
+        downloads={fmt.value: f"/download/{task_id}.{fmt.value}" for fmt in ExportFormat}
+    )
+    timer.publish("result", result=response.model_dump(mode="json"))
+    return response
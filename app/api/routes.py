@@ -1,219 +1,353 @@
-import os
 import json
 import uuid
-from pathlib import Path
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import FileResponse
-from crewai import Crew, Process
-from app.schemas import AnalyzeRequest, AnalyzeResponse, SongInfo, ChordSheet, ChordLine, ErrorResponse
-from app.services import SpotifyService, PDFGenerator
-from app.crew import MusicAgents, MusicTasks
+from typing import TYPE_CHECKING, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from app.schemas import AnalyzeRequest, AnalyzeResponse, BatchRequest, BatchResponse, ExportFormat, JobResponse, JobState
+from app.services import JobQueue, JobQueueFullError, get_analysis_cache, get_lyrics_cache, get_llm_cache, get_artifact_store, temp_janitor, upstream_stats
+from app.services.job_queue import Job
+from app.services.events import event_broker
+from app.services.single_flight import analysis_flights
+from app.api.downloads import render_task_export, export_filename, task_sheet_key
+from app.api.startup import load_pipeline
+from app.api.artifacts import artifact_response
+from app.api.batch import resolve_batch, batch_tracks, run_batch, cancel_batch_tracks
+
+if TYPE_CHECKING:
+    from app.services import SpotifyService
 
 router = APIRouter()
 
-# Storage for generated PDFs
-TEMP_DIR = Path(os.getenv("TEMP_DIR", "./temp"))
-TEMP_DIR.mkdir(exist_ok=True)
+# Bounded worker pool for analysis jobs, started from the app lifespan
+job_queue = JobQueue()
+
 
+def spotify_dependency() -> "SpotifyService":
+    """Inject the process-wide Spotify client"""
+    # Imported here so spotipy loads with the first request that needs it
+    from app.services import get_spotify_service
+
+    try:
+        return get_spotify_service()
+    except ValueError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+
+def _job_response(job: Job) -> JobResponse:
+    """Build the public status view of a job"""
+    return JobResponse(
+        task_id=job.task_id,
+        status=job.status,
+        status_url=f"/jobs/{job.task_id}",
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+        # Batch jobs carry track progress instead; see GET /batches/{batch_id}
+        result=job.result if isinstance(job.result, AnalyzeResponse) else None,
+        error=job.error
+    )
 
-@router.post("/analyze", response_model=AnalyzeResponse)
-async def analyze_song(request: AnalyzeRequest):
+
+def _batch_response(job: Job) -> BatchResponse:
+    """Build the public progress view of a batch"""
+    tracks = job.result or []
+    return BatchResponse(
+        batch_id=job.task_id,
+        status=job.status,
+        status_url=f"/batches/{job.task_id}",
+        total=len(tracks),
+        completed=sum(track.status == JobState.COMPLETED for track in tracks),
+        failed=sum(track.status == JobState.FAILED for track in tracks),
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+        tracks=tracks
+    )
+
+
+@router.post("/analyze", response_model=JobResponse, status_code=202)
+async def analyze_song(
+    request: AnalyzeRequest,
+    spotify_service: "SpotifyService" = Depends(spotify_dependency)
+):
     """
-    Analyze a Spotify song and generate chord sheet PDF
-    
-    This endpoint orchestrates multiple AI agents using CrewAI to:
+    Queue a Spotify song for analysis and chord sheet generation
+
+    The job runs on a bounded worker pool and orchestrates multiple AI agents
+    using CrewAI to:
     1. Fetch song metadata from Spotify
     2. Download audio preview
     3. Fetch lyrics from Genius
     4. Analyze audio for chord progressions using multimodal LLM
     5. Map chords to lyrics
     6. Generate downloadable PDF chord sheet
+
+    Poll GET /jobs/{task_id} for the result.
     """
-    
+
     task_id = str(uuid.uuid4())
-    audio_path = TEMP_DIR / f"{task_id}.mp3"
-    
+
+    async def analyze(job: Job):
+        pipeline = await load_pipeline()
+        return await pipeline.run_analysis(task_id, request, spotify_service)
+
     try:
-        # Initialize services
-        spotify_service = SpotifyService()
-        pdf_generator = PDFGenerator()
-        
-        # Step 1: Get song info
-        song_info = spotify_service.get_track_info(request.spotify_url)
-        
-        # Step 2: Download audio preview
-        if song_info.preview_url:
-            success = await spotify_service.download_preview(
-                song_info.preview_url, 
-                str(audio_path)
-            )
-            if not success:
-                raise HTTPException(
-                    status_code=404, 
-                    detail="Audio preview not available for this track"
-                )
-        else:
-            raise HTTPException(
-                status_code=404, 
-                detail="No preview URL available for this track"
-            )
-        
-        # Step 3: Create CrewAI agents
-        metadata_agent = MusicAgents.metadata_agent()
-        lyrics_agent = MusicAgents.lyrics_agent()
-        audio_analyst = MusicAgents.audio_analyst_agent()
-        chord_mapper = MusicAgents.chord_mapper_agent()
-        quality_controller = MusicAgents.quality_control_agent()
-        
-        # Step 4: Create tasks
-        fetch_metadata = MusicTasks.fetch_metadata_task(
-            request.spotify_url, 
-            metadata_agent
-        )
-        
-        fetch_lyrics = MusicTasks.fetch_lyrics_task(
-            song_info.title, 
-            song_info.artist, 
-            lyrics_agent
-        )
-        
-        analyze_audio = MusicTasks.analyze_audio_task(
-            str(audio_path),
-            song_info.title,
-            song_info.artist,
-            audio_analyst
-        )
-        
-        # Step 5: Execute crew for initial analysis
-        analysis_crew = Crew(
-            agents=[metadata_agent, lyrics_agent, audio_analyst],
-            tasks=[fetch_metadata, fetch_lyrics, analyze_audio],
-            process=Process.sequential,
-            verbose=True
-        )
-        
-        analysis_result = analysis_crew.kickoff()
-        
-        # Parse results
-        try:
-            # Get the last task output which should be the audio analysis
-            audio_analysis = json.loads(str(analyze_audio.output))
-            lyrics_result = json.loads(str(fetch_lyrics.output))
-            lyrics_text = lyrics_result.get('lyrics', '')
-        except json.JSONDecodeError as e:
-            raise HTTPException(
-                status_code=500,
-                detail=f"Failed to parse analysis results: {str(e)}"
-            )
-        
-        # Step 6: Map chords to lyrics
-        map_chords = MusicTasks.map_chords_to_lyrics_task(
-            lyrics_text,
-            json.dumps(audio_analysis),
-            request.transpose,
-            chord_mapper
-        )
-        
-        review_task = MusicTasks.quality_review_task(
-            "",  # Will be filled after chord mapping
-            quality_controller
-        )
-        
-        mapping_crew = Crew(
-            agents=[chord_mapper, quality_controller],
-            tasks=[map_chords, review_task],
-            process=Process.sequential,
-            verbose=True
-        )
-        
-        mapping_result = mapping_crew.kickoff()
-        
-        # Parse chord mapping
-        try:
-            chord_mapping = json.loads(str(map_chords.output))
-            lines_data = chord_mapping.get('lines', [])
-        except json.JSONDecodeError:
-            raise HTTPException(
-                status_code=500,
-                detail="Failed to parse chord mapping"
-            )
-        
-        # Step 7: Create chord sheet structure
-        chord_lines = []
-        for line_obj in lines_data:
-            chord_lines.append(
-                ChordLine(
-                    lyrics_line=line_obj.get('lyrics_line', ''),
-                    chords=line_obj.get('chords', [])
-                )
-            )
-        
-        chord_sheet = ChordSheet(
-            song_info=song_info,
-            key=audio_analysis.get('key', 'Unknown'),
-            tempo=audio_analysis.get('tempo', 0),
-            capo=None,  # Could be calculated based on transposition
-            lines=chord_lines
-        )
-        
-        # Step 8: Generate PDF
-        pdf_path = TEMP_DIR / f"{task_id}.pdf"
-        pdf_generator.generate_chord_sheet(
-            chord_sheet,
-            str(pdf_path),
-            transpose=request.transpose
-        )
-        
-        # Step 9: Return response
-        from app.schemas import AudioAnalysis
-        
-        return AnalyzeResponse(
-            status="success",
-            task_id=task_id,
-            pdf_url=f"/download/{task_id}",
-            song_info=song_info,
-            analysis=AudioAnalysis(
-                key=audio_analysis.get('key'),
-                tempo=audio_analysis.get('tempo'),
-                time_signature=audio_analysis.get('time_signature'),
-                chord_progressions=audio_analysis.get('chord_progressions', []),
-                structure=audio_analysis.get('structure')
-            )
+        job = job_queue.submit(task_id, analyze)
+    except JobQueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    return _job_response(job)
+
+
+@router.get("/analyze/{task_id}/events")
+async def stream_job_events(task_id: str):
+    """
+    Server-sent events for an analysis job
+
+    Emits job state changes (queued, running, completed, failed, cancelled),
+    stage_started/stage_finished with duration_ms and payload_bytes, partial
+    results as soon as each stage produces them, and the final result. Past
+    events are replayed first, so the stream can be opened at any time.
+    """
+
+    channel = event_broker.get(task_id)
+
+    if channel is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def event_stream():
+        index = 0
+        async for event in channel.subscribe():
+            if event is None:
+                # Comment line keeps proxies from closing an idle stream
+                yield ": keepalive\n\n"
+                continue
+            yield f"id: {index}\nevent: {event['event']}\ndata: {json.dumps(event, default=str)}\n\n"
+            index += 1
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.post("/analyze/batch", response_model=BatchResponse, status_code=202)
+async def analyze_batch(
+    request: BatchRequest,
+    spotify_service: "SpotifyService" = Depends(spotify_dependency)
+):
+    """
+    Queue every track of a Spotify playlist or album for analysis
+
+    Tracks are resolved with Spotify's bulk endpoints, then analyzed at most
+    BATCH_CONCURRENCY at a time across all batches. Poll GET
+    /batches/{batch_id} for per-track progress (tracks are not jobs, so
+    /jobs/{task_id} does not know them); each track's events are at
+    /analyze/{task_id}/events and its PDF at /download/{task_id}.
+    """
+
+    songs = await run_in_threadpool(resolve_batch, spotify_service, request.spotify_url)
+    tracks = batch_tracks(songs)
+    batch_id = str(uuid.uuid4())
+
+    try:
+        job = job_queue.submit(
+            batch_id,
+            lambda job: run_batch(job, songs, tracks, request.transpose, spotify_service)
         )
-    
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"Analysis failed: {str(e)}"
+    except JobQueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    # Published before the job starts so queued batches report their tracks
+    job.result = tracks
+    return _batch_response(job)
+
+
+@router.get("/batches/{batch_id}", response_model=BatchResponse)
+async def get_batch(batch_id: str):
+    """Get per-track progress of a playlist or album batch"""
+
+    job = job_queue.get(batch_id)
+
+    if job is None or not isinstance(job.result, list):
+        raise HTTPException(status_code=404, detail="Batch not found")
+
+    return _batch_response(job)
+
+
+@router.delete("/batches/{batch_id}", response_model=BatchResponse)
+async def cancel_batch(batch_id: str):
+    """Cancel a batch; tracks already analyzed keep their results"""
+
+    job = job_queue.get(batch_id)
+
+    if job is None or not isinstance(job.result, list):
+        raise HTTPException(status_code=404, detail="Batch not found")
+
+    job_queue.cancel(batch_id)
+    cancel_batch_tracks(job.result)
+
+    return _batch_response(job)
+
+
+@router.get("/jobs/{task_id}", response_model=JobResponse)
+async def get_job(task_id: str):
+    """Get the status and result of an analysis job"""
+
+    job = job_queue.get(task_id)
+
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    return _job_response(job)
+
+
+@router.delete("/jobs/{task_id}", response_model=JobResponse)
+async def cancel_job(task_id: str):
+    """Cancel a queued or running analysis job"""
+
+    job = job_queue.cancel(task_id)
+
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    return _job_response(job)
+
+
+# Media types of the download formats; text types are served as UTF-8
+EXPORT_MEDIA_TYPES = {
+    ExportFormat.PDF: "application/pdf",
+    ExportFormat.CHORDPRO: "text/x-chordpro",
+    ExportFormat.TEXT: "text/plain",
+    ExportFormat.JSON: "application/json"
+}
+
+
+def _serve_download(request: Request, task_id: str, fmt: ExportFormat, transpose: Optional[int]) -> Response:
+    """Render a download if needed and serve it from the artifact store"""
+    rendered = render_task_export(task_id, fmt, transpose)
+    store = get_artifact_store()
+
+    response = None
+    if rendered is not None:
+        key, label = rendered
+        response = artifact_response(
+            request,
+            store,
+            key,
+            media_type=EXPORT_MEDIA_TYPES[fmt],
+            filename=export_filename(task_id, fmt, label)
         )
-    finally:
-        # Cleanup audio file
-        if audio_path.exists():
-            audio_path.unlink()
-
-
-@router.get("/download/{task_id}")
-async def download_chord_sheet(task_id: str):
-    """Download the generated chord sheet PDF"""
-    
-    pdf_path = TEMP_DIR / f"{task_id}.pdf"
-    
-    if not pdf_path.exists():
+
+    if response is None:
         raise HTTPException(
             status_code=404,
             detail="Chord sheet not found. It may have been deleted or never existed."
         )
-    
-    return FileResponse(
-        path=str(pdf_path),
-        media_type="application/pdf",
-        filename=f"chord_sheet_{task_id}.pdf"
+
+    # Keep the stored sheet as fresh as its renders so other keys still work
+    store.touch(key)
+    store.touch(task_sheet_key(task_id))
+    return response
+
+
+# Registered before /download/{task_id}, which would otherwise match "abc.cho"
+@router.api_route("/download/{task_id}.{fmt}", methods=["GET", "HEAD"])
+async def download_chord_sheet_as(
+    request: Request,
+    task_id: str,
+    fmt: ExportFormat,
+    transpose: Optional[int] = Query(
+        default=None,
+        ge=-11,
+        le=11,
+        description=(
+            "Semitones from the original, untransposed key (not added to the "
+            "job's own transpose); omit for the key the job was requested in"
+        )
     )
+):
+    """
+    Download the chord sheet as PDF, ChordPro (.cho), plain text or JSON
+
+    Each format is rendered on first request and then served from the
+    artifact store with a content-hash ETag and immutable caching; supports
+    If-None-Match (304) and byte ranges (206).
+    """
+
+    return await run_in_threadpool(_serve_download, request, task_id, fmt, transpose)
+
+
+@router.api_route("/download/{task_id}", methods=["GET", "HEAD"])
+async def download_chord_sheet(
+    request: Request,
+    task_id: str,
+    transpose: Optional[int] = Query(
+        default=None,
+        ge=-11,
+        le=11,
+        description=(
+            "Semitones from the original, untransposed key (not added to the "
+            "job's own transpose); omit for the key the job was requested in"
+        )
+    )
+):
+    """Download the chord sheet PDF, optionally in another key"""
+
+    return await run_in_threadpool(_serve_download, request, task_id, ExportFormat.PDF, transpose)
+
+
+@router.delete("/cache/{spotify_id}")
+async def invalidate_cached_analysis(spotify_id: str):
+    """Drop the cached analysis for a track so the next request re-analyzes it"""
+
+    removed = get_analysis_cache().invalidate(spotify_id)
+
+    if not removed:
+        raise HTTPException(status_code=404, detail="Track not found in analysis cache")
+
+    return {"status": "invalidated", "spotify_id": spotify_id}
+
+
+@router.get("/cache/stats")
+async def analysis_cache_stats():
+    """Hit/miss and size statistics for the analysis cache"""
+    return get_analysis_cache().stats()
+
+
+@router.get("/cache/lyrics/stats")
+async def lyrics_cache_stats():
+    """Hit/miss, negative-hit and size statistics for the lyrics cache"""
+    return get_lyrics_cache().stats()
+
+
+@router.get("/cache/llm/stats")
+async def llm_cache_stats():
+    """Hit rate and size statistics for the LLM response cache"""
+    return get_llm_cache().stats()
+
+
+@router.get("/upstream/stats")
+async def upstream_call_stats():
+    """Per-provider rate limits, queue wait times, retries and 429s"""
+    return upstream_stats()
+
+
+@router.get("/coalescing/stats")
+async def coalescing_stats():
+    """How many analysis requests joined an analysis already in flight for their track"""
+    return analysis_flights.stats()
+
+
+@router.get("/storage/stats")
+async def storage_stats():
+    """Artifacts kept in TEMP_DIR and what the janitor has reclaimed"""
+    return temp_janitor.stats()
 
 
 @router.get("/health")
 async def health_check():
     """Health check endpoint"""
-    return {"status": "healthy", "service": "spotify-chord-analyzer"}
\ No newline at end of file
+    return {"status": "healthy", "service": "spotify-chord-analyzer"}
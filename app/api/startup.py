@@ -0,0 +1,38 @@
+import time
+from importlib import import_module
+from fastapi.concurrency import run_in_threadpool
+
+# Heavy modules the first analysis needs: CrewAI and litellm via the pipeline,
+# the Spotify and Genius clients, and reportlab for the first PDF
+WARMUP_MODULES = (
+    "app.api.pipeline",
+    "app.services.spotify",
+    "app.services.genius",
+    "app.services.pdf_generator"
+)
+
+PIPELINE_MODULE = "app.api.pipeline"
+
+
+def warm_up():
+    """Import the heavy modules ahead of the first request"""
+    started = time.perf_counter()
+    for name in WARMUP_MODULES:
+        try:
+            import_module(name)
+        except Exception as e:
+            # The first request that needs the module raises the same error
+            print(f"Warm-up failed to import {name}: {e}")
+            return
+    print(f"Warm-up imported {len(WARMUP_MODULES)} modules in {time.perf_counter() - started:.1f}s")
+
+
+async def load_pipeline():
+    """
+    The analysis pipeline module, imported on first use
+
+    The import takes seconds when warm-up is off or still running, so it
+    happens in a worker thread instead of blocking the event loop. Once
+    imported this is a dictionary lookup.
+    """
+    return await run_in_threadpool(import_module, PIPELINE_MODULE)
@@ -1,19 +1,29 @@
-from .agents import MusicAgents
-from .tasks import MusicTasks
-from .tools import (
-    SpotifyInfoTool,
-    LyricsFetchTool,
-    AudioChordAnalysisTool,
-    ChordTransposeTool,
-    LyricsChordMapperTool
-)
+"""CrewAI agents, tasks and tools, imported on first use since crewai is slow to import"""
+from importlib import import_module
 
-__all__ = [
-    "MusicAgents",
-    "MusicTasks",
-    "SpotifyInfoTool",
-    "LyricsFetchTool",
-    "AudioChordAnalysisTool",
-    "ChordTransposeTool",
-    "LyricsChordMapperTool"
-]
\ No newline at end of file
+# Exported name -> submodule that defines it
+_EXPORTS = {
+    "MusicAgents": ".agents",
+    "MusicTasks": ".tasks",
+    "SpotifyInfoTool": ".tools",
+    "LyricsFetchTool": ".tools",
+    "AudioChordAnalysisTool": ".tools",
+    "ChordTransposeTool": ".tools",
+    "LyricsChordMapperTool": ".tools"
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    """Import the submodule that defines a name on first access"""
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -1,5 +1,5 @@
 import os
-from crewai import Agent
+from crewai import Agent, LLM
 from app.crew.tools import (
     SpotifyInfoTool,
     LyricsFetchTool,
@@ -7,14 +7,16 @@ from app.crew.tools import (
     ChordTransposeTool,
     LyricsChordMapperTool
 )
-import litellm
+from app.services.llm_cache import agent_llm_cache_enabled
 
 
 def get_llm():
     """Get LLM instance via LiteLLM"""
     model = os.getenv("TEXT_ANALYSIS_MODEL", "gpt-4o-mini")
-    # LiteLLM automatically handles model routing
-    return model
+    # LiteLLM automatically handles model routing; the agents opt in to its
+    # cache per call, since it is off by default (see enable_agent_llm_cache)
+    options = {"cache": {"use-cache": True}} if agent_llm_cache_enabled() else {}
+    return LLM(model=model, is_litellm=True, **options)
 
 
 class MusicAgents:
@@ -1,5 +1,7 @@
+from typing import Optional
 from crewai import Task
 from app.crew.agents import MusicAgents
+from app.utils.music_estimation import format_known_values
 
 
 class MusicTasks:
@@ -57,10 +59,24 @@ class MusicTasks:
         )
     
     @staticmethod
-    def analyze_audio_task(audio_path: str, song_title: str, artist: str, agent):
+    def analyze_audio_task(
+        audio_path: str,
+        song_title: str,
+        artist: str,
+        agent,
+        known_values: Optional[dict] = None
+    ):
         """Task to analyze audio and extract chords"""
+        known_info = ""
+        if known_values:
+            known_info = f"""
+            
+            ALREADY KNOWN: {format_known_values(known_values)}
+            Pass these to the tool as key, tempo and time_signature so it only
+            has to identify what is still missing."""
+        
         return Task(
-            description=f"""Analyze the audio file at {audio_path} for "{song_title}" by {artist}
+            description=f"""Analyze the audio file at {audio_path} for "{song_title}" by {artist}{known_info}
             
             Use the Audio Chord Analysis Tool to:
             1. Listen to the entire audio clip
@@ -86,6 +102,8 @@ class MusicTasks:
               - chords: Array of chord names
               - timing: Description of chord timing
             - structure: Overall song structure
+            - chord_timeline: Array of {chord, start, end} objects, copied
+              unchanged if the tool provides it
             
             All chord names should use standard notation (C, Am, F, G7, etc.)""",
             agent=agent
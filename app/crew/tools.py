@@ -3,10 +3,14 @@ import json
 from typing import Type, Optional
 from pydantic import BaseModel, Field
 from crewai.tools import BaseTool
-from app.services import SpotifyService, GeniusService
-from app.utils import AudioUtils
+from app.services import get_spotify_service, get_genius_service, get_llm_cache, UpstreamError
+from app.utils import AudioUtils, ChordRecognizer, ChordAligner
+from app.utils.chords import transpose_chord, transpose_key
+from app.utils.music_estimation import format_known_values
 from app.schemas import SongInfo, LyricsData
-import litellm
+
+# Lyrics tool result for songs Genius has no lyrics for
+LYRICS_NOT_FOUND = "Lyrics not found"
 
 
 class SpotifyInfoInput(BaseModel):
@@ -20,7 +24,7 @@ class SpotifyInfoTool(BaseTool):
     args_schema: Type[BaseModel] = SpotifyInfoInput
     
     def _run(self, spotify_url: str) -> str:
-        service = SpotifyService()
+        service = get_spotify_service()
         info = service.get_track_info(spotify_url)
         return json.dumps(info.model_dump(), indent=2)
 
@@ -37,11 +41,14 @@ class LyricsFetchTool(BaseTool):
     args_schema: Type[BaseModel] = LyricsFetchInput
     
     def _run(self, title: str, artist: str) -> str:
-        service = GeniusService()
-        lyrics_data = service.search_lyrics(title, artist)
+        service = get_genius_service()
+        try:
+            lyrics_data = service.search_lyrics(title, artist)
+        except UpstreamError as e:
+            return json.dumps({"error": str(e)})
         
         if not lyrics_data:
-            return json.dumps({"error": "Lyrics not found"})
+            return json.dumps({"error": LYRICS_NOT_FOUND})
         
         return json.dumps(lyrics_data.model_dump(), indent=2)
 
@@ -51,32 +58,163 @@ class AudioAnalysisInput(BaseModel):
     audio_file_path: str = Field(..., description="Path to audio file (MP3 or WAV)")
     song_title: str = Field(..., description="Title of the song")
     artist: str = Field(..., description="Artist name")
+    key: Optional[str] = Field(None, description="Known key, e.g. 'C Major', if already determined")
+    tempo: Optional[float] = Field(None, description="Known tempo in BPM, if already determined")
+    time_signature: Optional[int] = Field(None, description="Known beats per bar, if already determined")
 
 
 class AudioChordAnalysisTool(BaseTool):
     name: str = "Analyze Audio for Chords"
-    description: str = "Uses multimodal LLM to analyze audio file and extract chord progressions throughout the song"
+    description: str = "Analyzes an audio file (multimodal LLM or local chroma engine) and extracts chord progressions throughout the song"
     args_schema: Type[BaseModel] = AudioAnalysisInput
     
-    def _run(self, audio_file_path: str, song_title: str, artist: str) -> str:
-        """Analyze audio using LiteLLM with multimodal support"""
+    def _run(
+        self,
+        audio_file_path: str,
+        song_title: str,
+        artist: str,
+        key: Optional[str] = None,
+        tempo: Optional[float] = None,
+        time_signature: Optional[int] = None
+    ) -> str:
+        """Analyze audio using LiteLLM with multimodal support, or locally"""
         
         try:
-            # Convert to WAV if needed
-            if audio_file_path.endswith('.mp3'):
-                wav_path = audio_file_path.replace('.mp3', '.wav')
-                AudioUtils.convert_to_wav(audio_file_path, wav_path)
-                audio_file_path = wav_path
+            # Read the preview once; decoding and encoding happen in memory
+            with open(audio_file_path, 'rb') as audio_file:
+                audio_bytes = audio_file.read()
+            sample_rate = self.engine_sample_rate()
+            samples = AudioUtils.decode_audio_bytes(audio_bytes, sample_rate)
+        except Exception as e:
+            return json.dumps({"error": f"Audio analysis failed: {str(e)}"})
+        
+        known = {"key": key, "tempo": tempo, "time_signature": time_signature}
+        return self.analyze_samples(samples, sample_rate, song_title, artist, known)
+    
+    @staticmethod
+    def engine_sample_rate() -> int:
+        """Sample rate the configured engine analyzes at"""
+        if os.getenv("AUDIO_ANALYSIS_ENGINE", "llm").lower() == "local":
+            return ChordRecognizer().sample_rate
+        return int(os.getenv("AUDIO_UPLOAD_SAMPLE_RATE", 16000))
+    
+    def analyze_samples(
+        self,
+        samples,
+        sample_rate: int,
+        song_title: str,
+        artist: str,
+        known: Optional[dict] = None,
+        estimate: Optional[dict] = None
+    ) -> str:
+        """
+        Analyze an already decoded mono signal
+        
+        Used directly by the pipeline without agents, which decodes the
+        in-memory preview once for estimation and analysis alike. ``known``
+        holds the settled values; ``estimate`` the pipeline's reconciled
+        key, tempo and meter, which the local engine uses for anything not
+        settled instead of estimating them again.
+        """
+        
+        # Values already established upstream (Spotify or local estimation)
+        known = {name: value for name, value in (known or {}).items() if value}
+        
+        try:
+            # Local chroma/template engine: no network call, adds timestamps
+            if os.getenv("AUDIO_ANALYSIS_ENGINE", "llm").lower() == "local":
+                recognizer = ChordRecognizer()
+                samples = AudioUtils.resample(samples, sample_rate, recognizer.sample_rate)
+                reconciled = {
+                    field: (estimate or {}).get(field)
+                    for field in ("key", "tempo", "time_signature")
+                }
+                analysis = recognizer.analyze(
+                    samples,
+                    recognizer.sample_rate,
+                    known={**reconciled, **known}
+                )
+                return json.dumps(analysis)
             
-            # Encode audio to base64
-            audio_base64 = AudioUtils.encode_audio_to_base64(audio_file_path)
+            # Downmix, resample and encode to a base64 WAV without temp files
+            upload_rate = self.engine_sample_rate()
+            samples = AudioUtils.resample(samples, sample_rate, upload_rate)
+            audio_base64 = AudioUtils.encode_wav_base64(samples, upload_rate)
             
             # Get model from environment
             model = os.getenv("AUDIO_ANALYSIS_MODEL", "gpt-4o-audio-preview")
             
             # Prepare prompt for chord analysis
-            prompt = f"""Analyze this audio file for "{song_title}" by {artist} and extract the chord progressions.
+            prompt = self._build_prompt(song_title, artist, known)
+            
+            # Identical audio and prompt are answered from the LLM cache
+            analysis = get_llm_cache().completion(
+                model=model,
+                messages=[
+                    {
+                        "role": "user",
+                        "content": [
+                            {"type": "text", "text": prompt},
+                            {
+                                "type": "input_audio",
+                                "input_audio": {
+                                    "data": audio_base64,
+                                    "format": "wav"
+                                }
+                            }
+                        ]
+                    }
+                ],
+                temperature=0.1,
+                response_format={"type": "json_object"},
+                validate=json.loads
+            )
+            
+            result = json.loads(analysis)
+            
+            if not known:
+                return analysis
+            
+            # The prompt only asked for what was unknown
+            result.update(known)
+            return json.dumps(result)
+            
+        except UpstreamError:
+            # An LLM outage fails the job like a Spotify or Genius one
+            raise
+        except Exception as e:
+            # Reported as an error, never as an analysis with placeholder values
+            return json.dumps({"error": f"Audio analysis failed: {str(e)}"})
+
+
+    def _build_prompt(self, song_title: str, artist: str, known: dict) -> str:
+        """Build the analysis prompt, asking only for values not already known"""
+        
+        if len(known) == 3:
+            # Key, tempo and meter are settled; only chords are needed
+            return f"""Identify the chord progressions in this audio of "{song_title}" by {artist}.
+The song is in {known['key']} at {known['tempo']} BPM in {known['time_signature']}/4.
 
+Format the response as JSON with this structure:
+{{
+  "chord_progressions": [
+    {{
+      "section": "Verse 1",
+      "chords": ["C", "G", "Am", "F"],
+      "timing": "Each chord for 1 bar"
+    }}
+  ],
+  "structure": "Verse-Chorus-Verse-Chorus-Bridge-Chorus"
+}}
+
+Be precise and accurate. Listen carefully to identify all chord changes."""
+        
+        hint = ""
+        if known:
+            hint = f"\nAlready known (use these values as given): {format_known_values(known)}\n"
+        
+        return f"""Analyze this audio file for "{song_title}" by {artist} and extract the chord progressions.
+{hint}
 Please provide:
 1. The main key of the song
 2. Tempo (BPM)
@@ -105,51 +243,13 @@ Format the response as JSON with this structure:
 }}
 
 Be precise and accurate. Listen carefully to identify all chord changes."""
-            
-            # Make LiteLLM call with audio
-            response = litellm.completion(
-                model=model,
-                messages=[
-                    {
-                        "role": "user",
-                        "content": [
-                            {"type": "text", "text": prompt},
-                            {
-                                "type": "input_audio",
-                                "input_audio": {
-                                    "data": audio_base64,
-                                    "format": "wav"
-                                }
-                            }
-                        ]
-                    }
-                ],
-                temperature=0.1,
-                response_format={"type": "json_object"}
-            )
-            
-            # Extract response
-            analysis = response.choices[0].message.content
-            
-            # Validate JSON
-            json.loads(analysis)  # Will raise if invalid
-            
-            return analysis
-            
-        except Exception as e:
-            return json.dumps({
-                "error": f"Audio analysis failed: {str(e)}",
-                "key": "Unknown",
-                "tempo": 0,
-                "time_signature": 4,
-                "chord_progressions": []
-            })
 
 
 class ChordTransposeInput(BaseModel):
     """Input schema for chord transposition"""
-    chord: str = Field(..., description="Chord to transpose (e.g., 'C', 'Am', 'G7')")
+    chord: str = Field(..., description="Chord to transpose (e.g., 'C', 'Am', 'G7', 'D/F#')")
     semitones: int = Field(..., description="Number of semitones to transpose (-11 to +11)")
+    key: Optional[str] = Field(default=None, description="Song key (e.g., 'F Major'), used to choose sharp or flat spelling")
 
 
 class ChordTransposeTool(BaseTool):
@@ -157,30 +257,9 @@ class ChordTransposeTool(BaseTool):
     description: str = "Transposes a single chord by specified semitones"
     args_schema: Type[BaseModel] = ChordTransposeInput
     
-    def _run(self, chord: str, semitones: int) -> str:
-        notes = ['C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B']
-        flat_to_sharp = {'Db': 'C#', 'Eb': 'D#', 'Gb': 'F#', 'Ab': 'G#', 'Bb': 'A#'}
-        
-        # Extract root note
-        root = chord[0]
-        if len(chord) > 1 and chord[1] in ['#', 'b']:
-            root = chord[:2]
-        
-        # Convert flats to sharps
-        if root in flat_to_sharp:
-            root = flat_to_sharp[root]
-        
-        # Find index and transpose
-        if root in notes:
-            idx = notes.index(root)
-            new_idx = (idx + semitones) % 12
-            new_root = notes[new_idx]
-            
-            # Replace root in chord
-            transposed = chord.replace(root, new_root, 1)
-            return transposed
-        
-        return chord
+    def _run(self, chord: str, semitones: int, key: Optional[str] = None) -> str:
+        _, use_flats = transpose_key(key, semitones)
+        return transpose_chord(chord, semitones, use_flats)
 
 
 class LyricsChordMapperInput(BaseModel):
@@ -191,11 +270,33 @@ class LyricsChordMapperInput(BaseModel):
 
 class LyricsChordMapperTool(BaseTool):
     name: str = "Map Chords to Lyrics"
-    description: str = "Uses LLM to intelligently map chord progressions to specific positions in lyrics"
+    description: str = "Maps chord progressions to specific positions in lyrics, section by section"
     args_schema: Type[BaseModel] = LyricsChordMapperInput
     
     def _run(self, lyrics: str, chord_progressions: str) -> str:
-        """Use LLM to map chords to lyrics positions"""
+        """
+        Align chords to lyrics locally, optionally refined by an LLM
+        
+        CHORD_MAPPING_ENGINE=local (default) returns the deterministic
+        alignment; "llm" sends it to TEXT_ANALYSIS_MODEL as a draft to refine
+        and falls back to the draft if that fails.
+        """
+        try:
+            progressions = json.loads(chord_progressions)
+        except json.JSONDecodeError:
+            progressions = []
+        if isinstance(progressions, dict):
+            progressions = progressions.get('chord_progressions', [])
+        
+        draft = ChordAligner().align(lyrics, progressions)
+        
+        if os.getenv("CHORD_MAPPING_ENGINE", "local").lower() != "llm":
+            return json.dumps(draft)
+        
+        return self._refine(lyrics, chord_progressions, draft)
+    
+    def _refine(self, lyrics: str, chord_progressions: str, draft: dict) -> str:
+        """Use LLM to improve a local chord alignment"""
         
         model = os.getenv("TEXT_ANALYSIS_MODEL", "gpt-4o-mini")
         
@@ -207,7 +308,10 @@ LYRICS:
 CHORD PROGRESSIONS:
 {chord_progressions}
 
-Map each chord to the word/syllable position where it should be played. Return a JSON array where each element represents a line of lyrics with chord positions:
+DRAFT MAPPING (sections matched and chords spread evenly over words):
+{json.dumps(draft)}
+
+Improve the draft: move each chord to the word/syllable position where it should be played. Return a JSON array where each element represents a line of lyrics with chord positions:
 
 {{
   "lines": [
@@ -226,20 +330,14 @@ Each chord is [position_in_line, "chord_name"]. Position 0 is the start of the l
 Be accurate and place chords where they naturally fall in the song structure."""
         
         try:
-            response = litellm.completion(
+            return get_llm_cache().completion(
                 model=model,
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.2,
-                response_format={"type": "json_object"}
+                response_format={"type": "json_object"},
+                validate=json.loads
             )
             
-            result = response.choices[0].message.content
-            json.loads(result)  # Validate
-            
-            return result
-            
         except Exception as e:
-            return json.dumps({
-                "error": f"Chord mapping failed: {str(e)}",
-                "lines": []
-            })
\ No newline at end of file
+            print(f"Chord mapping refinement failed, using local alignment: {e}")
+            return json.dumps(draft)
@@ -1,9 +1,18 @@
 import os
+import time
+import asyncio
+from contextlib import asynccontextmanager
 from pathlib import Path
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
-from app.api import router
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from app.api import router, job_queue
+from app.api.startup import warm_up
+from app.services import register_app_collector, temp_janitor
+# From the module: the package attribute is the submodule once it's imported
+from app.services.http_client import http_client
+from app.services.metrics import HTTP_DURATION, HTTP_IN_PROGRESS
 
 # Load environment variables
 load_dotenv()
@@ -12,13 +21,39 @@ load_dotenv()
 TEMP_DIR = Path(os.getenv("TEMP_DIR", "./temp"))
 TEMP_DIR.mkdir(exist_ok=True)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start and stop shared clients and background workers with the application"""
+    register_app_collector(job_queue)
+    await http_client.start()
+    await job_queue.start()
+    await temp_janitor.start()
+
+    # Heavy imports (CrewAI, litellm, spotipy, reportlab) are deferred to first
+    # use; warm-up loads them in a thread while the app already serves requests
+    warmup_mode = os.getenv("APP_WARMUP", "background").lower()
+    warmup = None
+    if warmup_mode == "blocking":
+        await asyncio.to_thread(warm_up)
+    elif warmup_mode == "background":
+        # Held so the task isn't garbage collected before it finishes
+        warmup = asyncio.create_task(asyncio.to_thread(warm_up))
+
+    yield
+    await temp_janitor.stop()
+    await job_queue.stop()
+    await http_client.stop()
+
+
 # Create FastAPI app
 app = FastAPI(
     title="Spotify Chord Analyzer",
     description="Extract lyrics and chord progressions from Spotify songs using AI agents",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -30,6 +65,43 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+def _route_template(request: Request) -> str:
+    """Path template of the matched route, including any router prefix"""
+    route = request.scope.get("route")
+    template = getattr(route, "path", None)
+    if template is None:
+        return "unmatched"
+
+    # Routes of included routers may report their path without the prefix
+    try:
+        matched = template.format(**request.path_params)
+    except (KeyError, IndexError, ValueError):
+        return template
+    path = request.url.path
+    return path[:len(path) - len(matched)] + template if path.endswith(matched) else template
+
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Request latency by route template and requests in progress"""
+    started = time.perf_counter()
+    status = 500
+    HTTP_IN_PROGRESS.inc()
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        HTTP_IN_PROGRESS.dec()
+        # Label with the template, not the path, so task IDs don't explode cardinality
+        HTTP_DURATION.labels(
+            method=request.method,
+            route=_route_template(request),
+            status=str(status)
+        ).observe(time.perf_counter() - started)
+
+
 # Include routers
 app.include_router(router, prefix="/api/v1", tags=["analysis"])
 
@@ -44,6 +116,18 @@ async def root():
     }
 
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """
+    Prometheus metrics
+
+    A plain function so FastAPI runs it in the threadpool: collecting builds
+    the caches on the first scrape and reads their on-disk stats, which must
+    not block the event loop.
+    """
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
 if __name__ == "__main__":
     import uvicorn
     
@@ -2,11 +2,21 @@ from .models import (
     AnalyzeRequest,
     AnalyzeResponse,
     SongInfo,
+    PreviewDownload,
     LyricsData,
     ChordProgression,
+    TimedChord,
     AudioAnalysis,
     ChordLine,
     ChordSheet,
+    CachedAnalysis,
+    StageTiming,
+    ExportFormat,
+    JobState,
+    JobResponse,
+    BatchRequest,
+    BatchTrack,
+    BatchResponse,
     ErrorResponse
 )
 
@@ -14,10 +24,20 @@ __all__ = [
     "AnalyzeRequest",
     "AnalyzeResponse",
     "SongInfo",
+    "PreviewDownload",
     "LyricsData",
     "ChordProgression",
+    "TimedChord",
     "AudioAnalysis",
     "ChordLine",
     "ChordSheet",
+    "CachedAnalysis",
+    "StageTiming",
+    "ExportFormat",
+    "JobState",
+    "JobResponse",
+    "BatchRequest",
+    "BatchTrack",
+    "BatchResponse",
     "ErrorResponse"
 ]
\ No newline at end of file
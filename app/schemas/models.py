@@ -1,5 +1,6 @@
+from enum import Enum
 from pydantic import BaseModel, Field, HttpUrl
-from typing import Optional, List
+from typing import Optional, List, Dict
 
 
 class AnalyzeRequest(BaseModel):
@@ -29,6 +30,15 @@ class SongInfo(BaseModel):
     time_signature: Optional[int] = None
 
 
+class PreviewDownload(BaseModel):
+    """Downloaded preview audio and transfer statistics"""
+    content: Optional[bytes] = Field(default=None, description="Audio bytes when downloaded to memory")
+    path: Optional[str] = Field(default=None, description="File path when downloaded to disk")
+    size_bytes: int
+    time_to_first_byte_ms: float
+    elapsed_ms: float
+
+
 class LyricsData(BaseModel):
     """Lyrics information"""
     lyrics: str
@@ -42,6 +52,13 @@ class ChordProgression(BaseModel):
     timing: Optional[str] = None
 
 
+class TimedChord(BaseModel):
+    """A chord with its position in the audio"""
+    chord: str
+    start: float = Field(..., description="Start time in seconds")
+    end: float = Field(..., description="End time in seconds")
+
+
 class AudioAnalysis(BaseModel):
     """Audio analysis results"""
     key: str
@@ -49,6 +66,11 @@ class AudioAnalysis(BaseModel):
     time_signature: int
     chord_progressions: List[ChordProgression]
     structure: Optional[str] = None
+    chord_timeline: Optional[List[TimedChord]] = None
+    confidence: Optional[Dict[str, float]] = Field(
+        default=None,
+        description="0-1 confidence for key, tempo and time_signature"
+    )
 
 
 class ChordLine(BaseModel):
@@ -69,6 +91,29 @@ class ChordSheet(BaseModel):
     lines: List[ChordLine]
 
 
+class CachedAnalysis(BaseModel):
+    """Reusable analysis result for a track, independent of transposition"""
+    analysis: AudioAnalysis
+    chord_sheet: ChordSheet
+    created_at: float
+
+
+class StageTiming(BaseModel):
+    """Wall-clock span of one pipeline stage"""
+    name: str
+    start: float
+    end: float
+    duration_ms: float
+
+
+class ExportFormat(str, Enum):
+    """Downloadable chord sheet formats"""
+    PDF = "pdf"
+    CHORDPRO = "cho"
+    TEXT = "txt"
+    JSON = "json"
+
+
 class AnalyzeResponse(BaseModel):
     """Response model for analysis"""
     status: str
@@ -76,6 +121,16 @@ class AnalyzeResponse(BaseModel):
     pdf_url: str
     song_info: SongInfo
     analysis: Optional[AudioAnalysis] = None
+    cached: bool = False
+    coalesced: bool = Field(
+        default=False,
+        description="True when the analysis was shared with a concurrent request for the same track"
+    )
+    stages: List[StageTiming] = []
+    downloads: Dict[str, str] = Field(
+        default_factory=dict,
+        description="Download URL per export format, generated on first request"
+    )
 
     class Config:
         json_schema_extra = {
@@ -83,6 +138,12 @@ class AnalyzeResponse(BaseModel):
                 "status": "success",
                 "task_id": "abc123",
                 "pdf_url": "/download/abc123",
+                "downloads": {
+                    "pdf": "/download/abc123.pdf",
+                    "cho": "/download/abc123.cho",
+                    "txt": "/download/abc123.txt",
+                    "json": "/download/abc123.json"
+                },
                 "song_info": {
                     "title": "Wonderwall",
                     "artist": "Oasis",
@@ -96,6 +157,77 @@ class AnalyzeResponse(BaseModel):
         }
 
 
+class JobState(str, Enum):
+    """Lifecycle states of a queued analysis job"""
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+class JobResponse(BaseModel):
+    """Status of an analysis job"""
+    task_id: str
+    status: JobState
+    status_url: str
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Optional[AnalyzeResponse] = None
+    error: Optional[str] = None
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "task_id": "abc123",
+                "status": "queued",
+                "status_url": "/jobs/abc123",
+                "created_at": 1700000000.0
+            }
+        }
+
+
+class BatchRequest(BaseModel):
+    """Request model for playlist or album analysis"""
+    spotify_url: str = Field(..., description="Spotify playlist or album URL")
+    transpose: int = Field(default=0, ge=-11, le=11, description="Semitones to transpose (-11 to +11)")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "spotify_url": "https://open.spotify.com/playlist/37i9dQZF1DXcBWIGoYBM5M",
+                "transpose": 0
+            }
+        }
+
+
+class BatchTrack(BaseModel):
+    """Progress of one track in a batch"""
+    task_id: str
+    spotify_id: str
+    title: str
+    artist: str
+    status: JobState = JobState.QUEUED
+    pdf_url: Optional[str] = None
+    cached: bool = False
+    error: Optional[str] = None
+
+
+class BatchResponse(BaseModel):
+    """Status of a playlist or album batch"""
+    batch_id: str
+    status: JobState
+    status_url: str
+    total: int
+    completed: int
+    failed: int
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    tracks: List[BatchTrack]
+
+
 class ErrorResponse(BaseModel):
     """Error response model"""
     status: str = "error"
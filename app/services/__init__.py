@@ -1,5 +1,51 @@
-from .spotify import SpotifyService
-from .genius import GeniusService
-from .pdf_generator import PDFGenerator
+"""Services, imported on first use so clients such as spotipy load only when needed"""
+from importlib import import_module
 
-__all__ = ["SpotifyService", "GeniusService", "PDFGenerator"]
\ No newline at end of file
+# Exported name -> submodule that defines it
+_EXPORTS = {
+    "HTTPClient": ".http_client",
+    "http_client": ".http_client",
+    "Provider": ".upstream",
+    "UpstreamError": ".upstream",
+    "get_upstream": ".upstream",
+    "upstream_stats": ".upstream",
+    "SpotifyService": ".spotify",
+    "get_spotify_service": ".spotify",
+    "GeniusService": ".genius",
+    "get_genius_service": ".genius",
+    "PDFGenerator": ".pdf_generator",
+    "SheetExporter": ".exporters",
+    "JobQueue": ".job_queue",
+    "JobQueueFullError": ".job_queue",
+    "AnalysisCache": ".analysis_cache",
+    "get_analysis_cache": ".analysis_cache",
+    "LyricsCache": ".lyrics_cache",
+    "get_lyrics_cache": ".lyrics_cache",
+    "LLMCache": ".llm_cache",
+    "get_llm_cache": ".llm_cache",
+    "enable_agent_llm_cache": ".llm_cache",
+    "LocalArtifactStore": ".artifact_store",
+    "SQLiteArtifactStore": ".artifact_store",
+    "SplitArtifactStore": ".artifact_store",
+    "get_artifact_store": ".artifact_store",
+    "TempJanitor": ".janitor",
+    "temp_janitor": ".janitor",
+    "enable_llm_metrics": ".metrics",
+    "register_app_collector": ".metrics"
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    """Import the submodule that defines a name on first access"""
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
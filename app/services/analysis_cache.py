@@ -0,0 +1,80 @@
+import os
+import time
+from functools import lru_cache
+from typing import Optional
+from pydantic import ValidationError
+from app.schemas import AudioAnalysis, ChordSheet, CachedAnalysis
+from app.utils import LRUCache, DiskCache, TieredCache
+
+# Bump when the cached payload shape changes so stale entries are ignored
+CACHE_VERSION = 1
+
+
+class AnalysisCache:
+    """Cross-request cache of analysis results keyed by Spotify track ID"""
+
+    def __init__(self):
+        self.enabled = os.getenv("ANALYSIS_CACHE_ENABLED", "true").lower() == "true"
+        temp_dir = os.getenv("TEMP_DIR", "./temp")
+        directory = os.getenv(
+            "ANALYSIS_CACHE_DIR",
+            os.path.join(temp_dir, "cache", "analysis")
+        )
+
+        self.cache = TieredCache(
+            memory=LRUCache(int(os.getenv("ANALYSIS_CACHE_MEMORY_ENTRIES", 256))),
+            disk=DiskCache(
+                directory,
+                max_bytes=int(os.getenv("ANALYSIS_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+            )
+        )
+
+    def _key(self, spotify_id: str) -> str:
+        return f"v{CACHE_VERSION}:{spotify_id}"
+
+    def get(self, spotify_id: str) -> Optional[CachedAnalysis]:
+        """Return the cached analysis for a track, if any"""
+        if not self.enabled:
+            return None
+
+        data = self.cache.get(self._key(spotify_id))
+        if data is None:
+            return None
+
+        try:
+            return CachedAnalysis.model_validate(data)
+        except ValidationError:
+            self.cache.delete(self._key(spotify_id))
+            return None
+
+    def put(self, analysis: AudioAnalysis, chord_sheet: ChordSheet) -> CachedAnalysis:
+        """Store an untransposed analysis result for its track"""
+        entry = CachedAnalysis(
+            analysis=analysis,
+            chord_sheet=chord_sheet,
+            created_at=time.time()
+        )
+
+        if self.enabled:
+            self.cache.set(
+                self._key(chord_sheet.song_info.spotify_id),
+                entry.model_dump(mode="json")
+            )
+
+        return entry
+
+    def invalidate(self, spotify_id: str) -> bool:
+        """Drop a track from both cache tiers"""
+        return self.cache.delete(self._key(spotify_id))
+
+    def clear(self):
+        self.cache.clear()
+
+    def stats(self) -> dict:
+        return {"enabled": self.enabled, **self.cache.stats()}
+
+
+@lru_cache(maxsize=None)
+def get_analysis_cache() -> AnalysisCache:
+    """Process-wide analysis cache, created on first use"""
+    return AnalysisCache()
@@ -0,0 +1,281 @@
+import os
+import time
+import shutil
+import itertools
+import sqlite3
+import hashlib
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterator, Optional
+
+CHUNK_SIZE = 64 * 1024
+
+
+class ArtifactInfo:
+    """Size, strong ETag and last download time of a stored artifact"""
+
+    __slots__ = ('key', 'size', 'etag', 'last_used')
+
+    def __init__(self, key: str, size: int, etag: str, last_used: float):
+        self.key = key
+        self.size = size
+        self.etag = etag
+        self.last_used = last_used
+
+
+def content_etag(digest: str) -> str:
+    """Quoted strong ETag from a content hash"""
+    return f'"{digest[:32]}"'
+
+
+@lru_cache(maxsize=4096)
+def _file_digest(path: str, mtime_ns: int, size: int) -> str:
+    """SHA-256 of a file; artifacts are immutable, so keyed by path, mtime and size"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class LocalArtifactStore:
+    """
+    Artifacts as files in sharded directories
+
+    Files live under ``<root>/<aa>/<key>``, where ``aa`` is taken from a hash
+    of the task ID, so one task's artifacts share a directory and no
+    directory grows past a few hundred entries. The access time records the
+    last download.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        task_id = key.split(".", 1)[0]
+        shard = hashlib.sha256(task_id.encode("utf-8")).hexdigest()[:2]
+        return self.directory / shard / key
+
+    def info(self, key: str) -> Optional[ArtifactInfo]:
+        path = self._path(key)
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+        digest = _file_digest(str(path), stat.st_mtime_ns, stat.st_size)
+        return ArtifactInfo(key, stat.st_size, content_etag(digest), max(stat.st_atime, stat.st_mtime))
+
+    def exists(self, key: str) -> bool:
+        return self._path(key).exists()
+
+    def read(self, key: str) -> Optional[bytes]:
+        try:
+            return self._path(key).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def iter_range(self, key: str, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+        """Yield bytes start..end (inclusive) of an artifact in chunks"""
+        with open(self._path(key), "rb") as f:
+            f.seek(start)
+            remaining = None if end is None else end - start + 1
+            while remaining is None or remaining > 0:
+                chunk = f.read(CHUNK_SIZE if remaining is None else min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+
+    def put(self, key: str, data: bytes):
+        """Store an artifact atomically"""
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+
+    def put_file(self, key: str, source: Path):
+        """Move a finished file into the store"""
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        shutil.move(str(source), str(path))
+
+    def touch(self, key: str):
+        """Record a download"""
+        path = self._path(key)
+        try:
+            os.utime(path, (time.time(), path.stat().st_mtime))
+        except FileNotFoundError:
+            pass
+
+    def delete(self, key: str) -> bool:
+        try:
+            self._path(key).unlink()
+            return True
+        except FileNotFoundError:
+            return False
+
+    def entries(self) -> Iterator[tuple[str, int, float]]:
+        """(key, size, last download) of every stored artifact"""
+        for shard in os.scandir(self.directory):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.endswith(".tmp"):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                yield entry.name, stat.st_size, max(stat.st_atime, stat.st_mtime)
+
+
+class SQLiteArtifactStore:
+    """
+    Artifacts as blobs in one SQLite database
+
+    Suited to the small text exports and stored sheets (a few KB each): no
+    per-artifact inode, and the ETag is stored with the blob. Reads load the
+    whole blob, so large artifacts belong in a LocalArtifactStore (see
+    SplitArtifactStore).
+    """
+
+    def __init__(self, path: str):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS artifacts ("
+            "key TEXT PRIMARY KEY, data BLOB NOT NULL, size INTEGER NOT NULL, "
+            "etag TEXT NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._lock = threading.Lock()
+
+    def _query(self, sql: str, params: tuple = ()) -> list:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def info(self, key: str) -> Optional[ArtifactInfo]:
+        rows = self._query("SELECT size, etag, last_used FROM artifacts WHERE key = ?", (key,))
+        if not rows:
+            return None
+        size, etag, last_used = rows[0]
+        return ArtifactInfo(key, size, etag, last_used)
+
+    def exists(self, key: str) -> bool:
+        return bool(self._query("SELECT 1 FROM artifacts WHERE key = ?", (key,)))
+
+    def read(self, key: str) -> Optional[bytes]:
+        rows = self._query("SELECT data FROM artifacts WHERE key = ?", (key,))
+        return rows[0][0] if rows else None
+
+    def iter_range(self, key: str, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+        """Yield bytes start..end (inclusive) of an artifact"""
+        if end is None:
+            rows = self._query("SELECT substr(data, ?) FROM artifacts WHERE key = ?", (start + 1, key))
+        else:
+            rows = self._query(
+                "SELECT substr(data, ?, ?) FROM artifacts WHERE key = ?",
+                (start + 1, end - start + 1, key)
+            )
+        if rows:
+            yield rows[0][0]
+
+    def put(self, key: str, data: bytes):
+        etag = content_etag(hashlib.sha256(data).hexdigest())
+        self._query(
+            "INSERT OR REPLACE INTO artifacts (key, data, size, etag, last_used) VALUES (?, ?, ?, ?, ?)",
+            (key, sqlite3.Binary(data), len(data), etag, time.time())
+        )
+
+    def put_file(self, key: str, source: Path):
+        self.put(key, source.read_bytes())
+        source.unlink()
+
+    def touch(self, key: str):
+        self._query("UPDATE artifacts SET last_used = ? WHERE key = ?", (time.time(), key))
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            return self._conn.execute("DELETE FROM artifacts WHERE key = ?", (key,)).rowcount > 0
+
+    def entries(self) -> Iterator[tuple[str, int, float]]:
+        yield from self._query("SELECT key, size, last_used FROM artifacts")
+
+
+class SplitArtifactStore:
+    """
+    Small artifacts in SQLite, large ones as files
+
+    Keys ending in one of ``file_suffixes`` (PDFs by default) go to the
+    file store, where range requests stream from disk; stored sheets and
+    text exports go to the SQLite store.
+    """
+
+    def __init__(
+        self,
+        small: SQLiteArtifactStore,
+        files: LocalArtifactStore,
+        file_suffixes: tuple[str, ...] = (".pdf",)
+    ):
+        self.small = small
+        self.files = files
+        self.file_suffixes = file_suffixes
+
+    def _store(self, key: str):
+        return self.files if key.endswith(self.file_suffixes) else self.small
+
+    def info(self, key: str) -> Optional[ArtifactInfo]:
+        return self._store(key).info(key)
+
+    def exists(self, key: str) -> bool:
+        return self._store(key).exists(key)
+
+    def read(self, key: str) -> Optional[bytes]:
+        return self._store(key).read(key)
+
+    def iter_range(self, key: str, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+        return self._store(key).iter_range(key, start, end)
+
+    def put(self, key: str, data: bytes):
+        self._store(key).put(key, data)
+
+    def put_file(self, key: str, source: Path):
+        self._store(key).put_file(key, source)
+
+    def touch(self, key: str):
+        self._store(key).touch(key)
+
+    def delete(self, key: str) -> bool:
+        return self._store(key).delete(key)
+
+    def entries(self) -> Iterator[tuple[str, int, float]]:
+        return itertools.chain(self.small.entries(), self.files.entries())
+
+
+@lru_cache(maxsize=None)
+def get_artifact_store():
+    """
+    Process-wide artifact store, created on first use
+
+    ARTIFACT_STORE=local (default) keeps sharded files under
+    TEMP_DIR/artifacts; "sqlite" keeps stored sheets and text exports as
+    blobs in TEMP_DIR/artifacts.db and PDFs as files under TEMP_DIR/artifacts.
+    """
+    temp_dir = os.getenv("TEMP_DIR", "./temp")
+    backend = os.getenv("ARTIFACT_STORE", "local").lower()
+    files = LocalArtifactStore(
+        os.getenv("ARTIFACT_DIR", os.path.join(temp_dir, "artifacts"))
+    )
+
+    if backend == "sqlite":
+        return SplitArtifactStore(
+            SQLiteArtifactStore(
+                os.getenv("ARTIFACT_SQLITE_PATH", os.path.join(temp_dir, "artifacts.db"))
+            ),
+            files
+        )
+    return files
@@ -0,0 +1,103 @@
+import os
+import time
+import asyncio
+from collections import OrderedDict
+from typing import AsyncIterator, Optional
+
+
+class EventChannel:
+    """Ordered event history of one task, with wake-ups for live subscribers"""
+
+    def __init__(self):
+        self.events: list[dict] = []
+        self.closed = False
+        self._changed = asyncio.Event()
+
+    def publish(self, event: dict):
+        if self.closed:
+            return
+        self.events.append(event)
+        self._notify()
+
+    def close(self):
+        self.closed = True
+        self._notify()
+
+    def _notify(self):
+        # Wake everyone waiting on the current event, then start a fresh one
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def subscribe(self, keepalive: float = 15.0) -> AsyncIterator[Optional[dict]]:
+        """
+        Yield past events, then live ones until the channel closes
+
+        Yields None when nothing happened for ``keepalive`` seconds so the
+        caller can keep the connection open.
+        """
+        index = 0
+        while True:
+            changed = self._changed
+            while index < len(self.events):
+                yield self.events[index]
+                index += 1
+
+            if self.closed:
+                return
+
+            try:
+                await asyncio.wait_for(changed.wait(), timeout=keepalive)
+            except asyncio.TimeoutError:
+                yield None
+
+
+class EventBroker:
+    """
+    Per-task pipeline events for progress streaming
+
+    History is kept so late subscribers replay what they missed; the oldest
+    closed channels are dropped beyond EVENT_HISTORY_SIZE.
+    """
+
+    def __init__(self, history_size: Optional[int] = None):
+        self.history_size = history_size
+        self._channels: "OrderedDict[str, EventChannel]" = OrderedDict()
+
+    def channel(self, task_id: str) -> EventChannel:
+        """Get or create the channel of a task"""
+        channel = self._channels.get(task_id)
+        if channel is None:
+            channel = self._channels[task_id] = EventChannel()
+            self._prune()
+        return channel
+
+    def get(self, task_id: str) -> Optional[EventChannel]:
+        return self._channels.get(task_id)
+
+    def publish(self, task_id: str, event: str, **data):
+        """Append an event to a task's channel"""
+        self.channel(task_id).publish({
+            "event": event,
+            "task_id": task_id,
+            "time": time.time(),
+            **data
+        })
+
+    def close(self, task_id: str):
+        """Mark a task's stream as finished"""
+        self.channel(task_id).close()
+
+    def _prune(self):
+        if self.history_size is None:
+            self.history_size = int(os.getenv("EVENT_HISTORY_SIZE", 1000))
+
+        excess = len(self._channels) - self.history_size
+        for task_id in list(self._channels):
+            if excess <= 0:
+                break
+            if self._channels[task_id].closed:
+                del self._channels[task_id]
+                excess -= 1
+
+
+event_broker = EventBroker()
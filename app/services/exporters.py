@@ -0,0 +1,94 @@
+import json
+from app.schemas import ChordSheet, ExportFormat
+
+
+class SheetExporter:
+    """Text exports of a chord sheet: ChordPro, plain text and JSON"""
+
+    def render(self, chord_sheet: ChordSheet, fmt: ExportFormat, transpose: int = 0) -> str:
+        """
+        Render an already transposed sheet as text
+
+        ``transpose`` only labels the output; PDFs go through PDFGenerator.
+        """
+        if fmt == ExportFormat.CHORDPRO:
+            return self.chordpro(chord_sheet, transpose)
+        if fmt == ExportFormat.TEXT:
+            return self.plain_text(chord_sheet, transpose)
+        if fmt == ExportFormat.JSON:
+            return self.json_document(chord_sheet, transpose)
+        raise ValueError(f"Not a text export format: {fmt}")
+
+    @staticmethod
+    def _is_header(line: str) -> bool:
+        return line.startswith('[') and line.endswith(']')
+
+    @staticmethod
+    def _sorted_chords(chords: list[tuple[int, str]]) -> list[tuple[int, str]]:
+        return sorted(chords, key=lambda item: item[0])
+
+    def chordpro(self, chord_sheet: ChordSheet, transpose: int = 0) -> str:
+        """ChordPro with chords inline in square brackets"""
+        info = chord_sheet.song_info
+        out = [f"{{title: {info.title}}}", f"{{artist: {info.artist}}}"]
+        if info.album:
+            out.append(f"{{album: {info.album}}}")
+        if chord_sheet.key:
+            out.append(f"{{key: {chord_sheet.key}}}")
+        if chord_sheet.tempo:
+            out.append(f"{{tempo: {chord_sheet.tempo}}}")
+        if chord_sheet.capo:
+            out.append(f"{{capo: {chord_sheet.capo}}}")
+        if transpose:
+            out.append(f"{{comment: Transposed {abs(transpose)} semitones {'up' if transpose > 0 else 'down'}}}")
+        out.append("")
+
+        for line in chord_sheet.lines:
+            text = line.lyrics_line
+            if self._is_header(text):
+                out.append(f"{{comment: {text.strip('[]')}}}")
+                continue
+
+            # Insert from the right so earlier positions stay valid
+            for position, chord in reversed(self._sorted_chords(line.chords)):
+                position = min(max(position, 0), len(text))
+                text = f"{text[:position]}[{chord}]{text[position:]}"
+            out.append(text)
+
+        return "\n".join(out).rstrip() + "\n"
+
+    def plain_text(self, chord_sheet: ChordSheet, transpose: int = 0) -> str:
+        """Monospaced chords-over-lyrics text"""
+        info = chord_sheet.song_info
+        details = [f"Key: {chord_sheet.key}", f"Tempo: {chord_sheet.tempo} BPM"]
+        if chord_sheet.capo:
+            details.append(f"Capo: {chord_sheet.capo}")
+        if transpose:
+            details.append(f"Transposed: {abs(transpose)} semitones {'up' if transpose > 0 else 'down'}")
+
+        out = [info.title, info.artist, "   ".join(details), ""]
+
+        for line in chord_sheet.lines:
+            text = line.lyrics_line
+            if self._is_header(text):
+                if out[-1]:
+                    out.append("")
+                out.append(text)
+                continue
+
+            if line.chords:
+                # Chords never overlap; a chord that collides moves right
+                chord_line = ""
+                for position, chord in self._sorted_chords(line.chords):
+                    start = max(position, len(chord_line) + 1 if chord_line else 0)
+                    chord_line = chord_line.ljust(start) + chord
+                out.append(chord_line)
+            out.append(text)
+
+        return "\n".join(out).strip() + "\n"
+
+    def json_document(self, chord_sheet: ChordSheet, transpose: int = 0) -> str:
+        """The structured chord sheet"""
+        data = chord_sheet.model_dump(mode="json")
+        data["transpose"] = transpose
+        return json.dumps(data, indent=2)
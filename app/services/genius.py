@@ -1,8 +1,15 @@
 import os
 import re
-import lyricsgenius
+import logging
+from functools import lru_cache
 from typing import Optional
+import requests
+import lyricsgenius
 from app.schemas import LyricsData
+from app.services.lyrics_cache import get_lyrics_cache
+from app.services.upstream import UpstreamError, get_upstream
+
+logger = logging.getLogger(__name__)
 
 
 class GeniusService:
@@ -21,6 +28,24 @@ class GeniusService:
             remove_section_headers=False,
             verbose=False
         )
+        
+        # Size the shared session's pool for concurrent lookups
+        pool_size = int(os.getenv("GENIUS_POOL_SIZE", 10))
+        adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.genius._session.mount("https://", adapter)
+        self.genius._session.mount("http://", adapter)
+        
+        # One alternative root for the API, public API and song pages, e.g.
+        # the stand-in in benchmarks/standins.py
+        base_url = os.getenv("GENIUS_BASE_URL")
+        if base_url:
+            base_url = base_url.rstrip("/")
+            self.genius.API_ROOT = f"{base_url}/"
+            self.genius.PUBLIC_API_ROOT = f"{base_url}/api/"
+            self.genius.WEB_ROOT = f"{base_url}/"
+        
+        self.cache = get_lyrics_cache()
+        self.upstream = get_upstream("genius")
     
     def clean_lyrics(self, lyrics: str) -> str:
         """Clean and format lyrics"""
@@ -36,25 +61,44 @@ class GeniusService:
         return lyrics
     
     def search_lyrics(self, title: str, artist: str) -> Optional[LyricsData]:
-        """Search for song lyrics on Genius"""
+        """
+        Search for song lyrics on Genius, consulting the lyrics cache first
+        
+        Returns None when Genius has no lyrics for the song (or its page
+        cannot be parsed) and raises UpstreamError when Genius cannot be
+        reached, so an outage is never mistaken for an instrumental.
+        """
+        found, cached = self.cache.get(title, artist)
+        if found:
+            return cached
+        
         try:
             # Search for the song
-            song = self.genius.search_song(title, artist)
-            
-            if not song:
-                return None
-            
-            # Clean the lyrics
-            cleaned_lyrics = self.clean_lyrics(song.lyrics)
-            
-            return LyricsData(
-                lyrics=cleaned_lyrics,
-                source="genius"
-            )
+            song = self.upstream.call(self.genius.search_song, title, artist)
+        except UpstreamError:
+            raise
+        except requests.RequestException as e:
+            # Transport and HTTP errors the upstream policy does not retry
+            raise UpstreamError("genius", str(e)) from e
+        except Exception:
+            # A lyricsgenius parsing bug on one song is not an outage
+            logger.exception("Genius lyrics lookup failed for %s - %s", title, artist)
+            return None
         
-        except Exception as e:
-            print(f"Error fetching lyrics: {e}")
+        if not song:
+            # Remember the miss; errors above are not cached
+            self.cache.put(title, artist, None)
             return None
+        
+        # Clean the lyrics
+        cleaned_lyrics = self.clean_lyrics(song.lyrics)
+        
+        lyrics = LyricsData(
+            lyrics=cleaned_lyrics,
+            source="genius"
+        )
+        self.cache.put(title, artist, lyrics)
+        return lyrics
     
     def get_lyrics_lines(self, lyrics: str) -> list[str]:
         """Split lyrics into lines, preserving section headers"""
@@ -63,4 +107,10 @@ class GeniusService:
             line = line.strip()
             if line:
                 lines.append(line)
-        return lines
\ No newline at end of file
+        return lines
+
+
+@lru_cache(maxsize=None)
+def get_genius_service() -> GeniusService:
+    """Process-wide Genius service, created on first use"""
+    return GeniusService()
\ No newline at end of file
@@ -0,0 +1,56 @@
+import os
+from typing import Optional
+import httpx
+
+
+class HTTPClient:
+    """App-lifetime pooled HTTP client shared by all outbound requests"""
+
+    def __init__(self):
+        self._client: Optional[httpx.AsyncClient] = None
+
+    async def start(self):
+        """Create the pooled client; called from the app lifespan"""
+        if self._client is None:
+            self._client = self._create_client()
+
+    async def stop(self):
+        """Close pooled connections"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # Created lazily when used outside the app lifespan (scripts, tools)
+        if self._client is None:
+            self._client = self._create_client()
+        return self._client
+
+    def _create_client(self) -> httpx.AsyncClient:
+        limits = httpx.Limits(
+            max_connections=int(os.getenv("HTTP_MAX_CONNECTIONS", 100)),
+            max_keepalive_connections=int(os.getenv("HTTP_MAX_KEEPALIVE", 20)),
+            keepalive_expiry=float(os.getenv("HTTP_KEEPALIVE_EXPIRY", 30.0))
+        )
+        timeout = httpx.Timeout(float(os.getenv("HTTP_TIMEOUT", 30.0)))
+        http2 = os.getenv("HTTP2_ENABLED", "false").lower() == "true"
+
+        try:
+            return httpx.AsyncClient(
+                limits=limits,
+                timeout=timeout,
+                http2=http2,
+                follow_redirects=True
+            )
+        except ImportError:
+            # HTTP/2 needs the optional h2 package
+            print("HTTP/2 requested but h2 is not installed; using HTTP/1.1")
+            return httpx.AsyncClient(
+                limits=limits,
+                timeout=timeout,
+                follow_redirects=True
+            )
+
+
+http_client = HTTPClient()
@@ -0,0 +1,140 @@
+import os
+import time
+import asyncio
+import threading
+from pathlib import Path
+from typing import Optional
+from app.services.artifact_store import get_artifact_store
+
+# Files that only exist while a job or render is in progress
+INTERMEDIATE_SUFFIXES = {".mp3", ".wav", ".tmp"}
+
+
+class TempJanitor:
+    """
+    Background garbage collector for task artifacts
+
+    Stored chord sheets and rendered downloads in the artifact store are
+    evicted once they have not been downloaded for TEMP_FILE_TTL, and least
+    recently downloaded first while the store is over TEMP_DIR_MAX_BYTES.
+    Intermediate files left in TEMP_DIR by crashed jobs are removed after
+    TEMP_JANITOR_GRACE. Caches are left alone; they enforce their own budgets.
+    """
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self._lock = threading.Lock()
+        self.runs = 0
+        self.expired = 0
+        self.evicted = 0
+        self.intermediate = 0
+        self.bytes_reclaimed = 0
+        self.last_run: Optional[float] = None
+        self.files = 0
+        self.bytes = 0
+
+    @property
+    def directory(self) -> Path:
+        return Path(os.getenv("TEMP_DIR", "./temp"))
+
+    async def start(self):
+        """Start the periodic sweep; called from the app lifespan"""
+        if os.getenv("TEMP_JANITOR_ENABLED", "true").lower() != "true":
+            return
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _loop(self):
+        interval = float(os.getenv("TEMP_JANITOR_INTERVAL", 300))
+        while True:
+            try:
+                await asyncio.to_thread(self.sweep)
+            except Exception as e:
+                print(f"Temp janitor sweep failed: {str(e)}")
+            await asyncio.sleep(interval)
+
+    def sweep(self, now: Optional[float] = None) -> dict:
+        """Evict expired and over-budget artifacts; returns what this run removed"""
+        now = now or time.time()
+        ttl = float(os.getenv("TEMP_FILE_TTL", 7 * 24 * 3600))
+        grace = float(os.getenv("TEMP_JANITOR_GRACE", 3600))
+        max_bytes = int(os.getenv("TEMP_DIR_MAX_BYTES", 1024 * 1024 * 1024))
+
+        removed = {"expired": 0, "evicted": 0, "intermediate": 0, "bytes": 0}
+
+        # Preview audio and renders in progress, orphaned by a crash
+        for entry in os.scandir(self.directory):
+            if not entry.is_file(follow_symlinks=False):
+                continue
+            if Path(entry.name).suffix not in INTERMEDIATE_SUFFIXES:
+                continue
+            stat = entry.stat(follow_symlinks=False)
+            if now - stat.st_mtime > grace:
+                try:
+                    os.unlink(entry.path)
+                except FileNotFoundError:
+                    continue
+                removed["intermediate"] += 1
+                removed["bytes"] += stat.st_size
+
+        store = get_artifact_store()
+        artifacts = []
+        for key, size, last_used in store.entries():
+            if now - last_used > ttl:
+                if store.delete(key):
+                    removed["expired"] += 1
+                    removed["bytes"] += size
+                continue
+            artifacts.append((last_used, size, key))
+
+        total = sum(size for _, size, _ in artifacts)
+        artifacts.sort(key=lambda item: item[0])
+        kept = len(artifacts)
+        for _, size, key in artifacts:
+            if total <= max_bytes:
+                break
+            if store.delete(key):
+                removed["evicted"] += 1
+                removed["bytes"] += size
+                kept -= 1
+            total -= size
+
+        with self._lock:
+            self.runs += 1
+            self.expired += removed["expired"]
+            self.evicted += removed["evicted"]
+            self.intermediate += removed["intermediate"]
+            self.bytes_reclaimed += removed["bytes"]
+            self.last_run = now
+            self.files = kept
+            self.bytes = total
+
+        if removed["bytes"]:
+            print(
+                f"Temp janitor removed {removed['expired'] + removed['evicted'] + removed['intermediate']} "
+                f"files ({removed['bytes']} bytes)"
+            )
+        return removed
+
+    def stats(self) -> dict:
+        return {
+            "running": self._task is not None,
+            "runs": self.runs,
+            "last_run": self.last_run,
+            "files": self.files,
+            "bytes": self.bytes,
+            "expired": self.expired,
+            "evicted": self.evicted,
+            "intermediate": self.intermediate,
+            "files_removed": self.expired + self.evicted + self.intermediate,
+            "bytes_reclaimed": self.bytes_reclaimed
+        }
+
+
+temp_janitor = TempJanitor()
@@ -0,0 +1,189 @@
+import os
+import time
+import asyncio
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Optional
+from fastapi import HTTPException
+from app.schemas import JobState
+from app.services.events import event_broker
+
+
+class JobQueueFullError(Exception):
+    """Raised when the job queue cannot accept more work"""
+
+
+class Job:
+    """A single unit of work tracked by the job queue"""
+
+    def __init__(self, task_id: str, runner: Callable[["Job"], Awaitable[Any]]):
+        self.task_id = task_id
+        self.runner = runner
+        self.status = JobState.QUEUED
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.status_code: Optional[int] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.cancel_requested = False
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in (JobState.COMPLETED, JobState.FAILED, JobState.CANCELLED)
+
+    def _finish(self, status: JobState):
+        self.status = status
+        self.finished_at = time.time()
+        self._publish_status()
+
+    def _publish_status(self):
+        """Report the job's state on its event stream"""
+        data = {"error": self.error, "status_code": self.status_code} if self.error else {}
+        event_broker.publish(self.task_id, self.status.value, **data)
+        if self.is_finished:
+            event_broker.close(self.task_id)
+
+
+class JobQueue:
+    """Bounded asyncio worker pool for long-running analysis jobs"""
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        max_queued: Optional[int] = None,
+        history_size: Optional[int] = None
+    ):
+        self.max_workers = max_workers
+        self.max_queued = max_queued
+        self.history_size = history_size
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: list[asyncio.Task] = []
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+
+    async def start(self):
+        """Start the worker tasks on the running event loop"""
+        # Read configuration here rather than at import so .env is loaded
+        if self.max_workers is None:
+            self.max_workers = int(os.getenv("JOB_WORKERS", 2))
+        if self.max_queued is None:
+            self.max_queued = int(os.getenv("JOB_QUEUE_SIZE", 100))
+        if self.history_size is None:
+            self.history_size = int(os.getenv("JOB_HISTORY_SIZE", 1000))
+
+        self._queue = asyncio.Queue(maxsize=self.max_queued)
+        self._workers = [
+            asyncio.create_task(self._worker())
+            for _ in range(self.max_workers)
+        ]
+
+    async def stop(self):
+        """Cancel running jobs and stop all workers"""
+        # Cancelling a worker also cancels the job it is awaiting
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+
+        for job in self._jobs.values():
+            if job.status == JobState.QUEUED:
+                job._finish(JobState.CANCELLED)
+
+        self._workers = []
+        self._queue = None
+
+    def submit(self, task_id: str, runner: Callable[[Job], Awaitable[Any]]) -> Job:
+        """Enqueue a job; raises JobQueueFullError if the queue is saturated"""
+        if self._queue is None:
+            raise RuntimeError("Job queue is not running")
+
+        job = Job(task_id, runner)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise JobQueueFullError(
+                f"Job queue is full ({self.max_queued} pending jobs)"
+            )
+
+        self._jobs[task_id] = job
+        self._prune()
+        job._publish_status()
+        return job
+
+    def get(self, task_id: str) -> Optional[Job]:
+        """Look up a job by task ID"""
+        return self._jobs.get(task_id)
+
+    def cancel(self, task_id: str) -> Optional[Job]:
+        """Cancel a queued or running job"""
+        job = self._jobs.get(task_id)
+        if job is None or job.is_finished:
+            return job
+
+        # Queued jobs are skipped by the worker when dequeued
+        job.cancel_requested = True
+        if job._task:
+            job._task.cancel()
+        job._finish(JobState.CANCELLED)
+
+        return job
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    def stats(self) -> dict:
+        """Tracked jobs by state, plus jobs waiting for a worker"""
+        counts = {state.value: 0 for state in JobState}
+        # A snapshot: /metrics reads this from a worker thread
+        for job in list(self._jobs.values()):
+            counts[job.status.value] += 1
+        return {**counts, "pending": self.pending}
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            try:
+                if job.status == JobState.QUEUED:
+                    await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: Job):
+        job.status = JobState.RUNNING
+        job.started_at = time.time()
+        job._publish_status()
+        job._task = asyncio.create_task(job.runner(job))
+
+        try:
+            job.result = await job._task
+            job._finish(JobState.COMPLETED)
+        except asyncio.CancelledError:
+            # cancel() has already finished the job it was asked to stop
+            if not job.is_finished:
+                job._finish(JobState.CANCELLED)
+            if not job.cancel_requested:
+                # The worker itself is shutting down
+                raise
+        except HTTPException as e:
+            job.error = e.detail
+            job.status_code = e.status_code
+            job._finish(JobState.FAILED)
+        except Exception as e:
+            job.error = f"Analysis failed: {str(e)}"
+            job.status_code = 500
+            job._finish(JobState.FAILED)
+        finally:
+            job._task = None
+
+    def _prune(self):
+        """Drop the oldest finished jobs beyond the history size"""
+        excess = len(self._jobs) - self.history_size
+        if excess <= 0:
+            return
+
+        for task_id in list(self._jobs):
+            if excess <= 0:
+                break
+            if self._jobs[task_id].is_finished:
+                del self._jobs[task_id]
+                excess -= 1
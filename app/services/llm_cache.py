@@ -0,0 +1,175 @@
+import os
+import json
+import hashlib
+import threading
+from functools import lru_cache
+from typing import Any, Callable, Optional
+from app.utils import LRUCache, DiskCache, TieredCache
+from app.services.upstream import get_upstream
+
+# Bump when the cached payload shape changes so stale entries are ignored
+CACHE_VERSION = 1
+
+
+class LLMCache:
+    """
+    Content-addressed cache of LLM completions
+
+    Entries are keyed by a hash of everything that determines the answer of
+    a low-temperature call: model, messages (including any audio payload),
+    temperature and response format. Only responses that pass validation are
+    stored, so a malformed answer is retried rather than replayed.
+    """
+
+    def __init__(self):
+        self.enabled = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+        # Refresh mode: every call goes upstream and overwrites its entry
+        self.bypass = os.getenv("LLM_CACHE_BYPASS", "false").lower() == "true"
+        temp_dir = os.getenv("TEMP_DIR", "./temp")
+        directory = os.getenv(
+            "LLM_CACHE_DIR",
+            os.path.join(temp_dir, "cache", "llm")
+        )
+
+        self.cache = TieredCache(
+            memory=LRUCache(int(os.getenv("LLM_CACHE_MEMORY_ENTRIES", 128))),
+            disk=DiskCache(
+                directory,
+                max_bytes=int(os.getenv("LLM_CACHE_MAX_BYTES", 128 * 1024 * 1024))
+            )
+        )
+
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+
+    @staticmethod
+    def key(
+        model: str,
+        messages: list[dict],
+        temperature: Optional[float] = None,
+        response_format: Optional[dict] = None
+    ) -> str:
+        """Hash of the request fields that determine the completion"""
+        payload = json.dumps(
+            {
+                "model": model,
+                "messages": messages,
+                "temperature": temperature,
+                "response_format": response_format
+            },
+            sort_keys=True,
+            separators=(",", ":")
+        )
+        digest = hashlib.sha256(payload.encode()).hexdigest()
+        return f"v{CACHE_VERSION}:{digest}"
+
+    def _count(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def completion(
+        self,
+        model: str,
+        messages: list[dict],
+        temperature: Optional[float] = None,
+        response_format: Optional[dict] = None,
+        validate: Optional[Callable[[str], Any]] = None,
+        bypass: bool = False
+    ) -> str:
+        """
+        Message content of a litellm completion, served from cache when possible
+
+        ``validate`` should raise for unusable content; such responses are
+        returned to the caller but never cached. ``bypass`` (or
+        LLM_CACHE_BYPASS) forces a fresh call; its result still refreshes
+        the cache.
+        """
+        key = self.key(model, messages, temperature, response_format)
+
+        if not self.enabled or bypass or self.bypass:
+            self._count("bypassed")
+        else:
+            cached = self.cache.get(key)
+            if cached is not None:
+                self._count("hits")
+                return cached["content"]
+            self._count("misses")
+
+        # This cache is the only one for these calls; litellm's is for the agents
+        kwargs = {"model": model, "messages": messages, "caching": False}
+        if temperature is not None:
+            kwargs["temperature"] = temperature
+        if response_format is not None:
+            kwargs["response_format"] = response_format
+
+        # Misses go through the shared LLM rate limit and retry policy
+        import litellm
+
+        response = get_upstream("llm").call(litellm.completion, **kwargs)
+        content = response.choices[0].message.content
+
+        if validate:
+            validate(content)
+
+        if self.enabled:
+            self.cache.set(key, {"model": model, "content": content})
+
+        return content
+
+    def clear(self):
+        self.cache.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "misses": self.misses,
+            "bypass": self.bypass,
+            "bypassed": self.bypassed,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            **self.cache.stats()
+        }
+
+
+def agent_llm_cache_enabled() -> bool:
+    """Whether the CrewAI agents' completions should use litellm's cache"""
+    return (
+        os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+        and os.getenv("LLM_CACHE_AGENTS", "true").lower() == "true"
+    )
+
+
+def enable_agent_llm_cache():
+    """
+    Back the CrewAI agents' completions with litellm's cache
+
+    The cache is off by default, so only calls that opt in with
+    ``cache={"use-cache": True}`` use it: the agents' LLMs
+    (``app/crew/agents.py``) do, the tools' calls through LLMCache do not.
+    Uses litellm's disk cache when the optional diskcache package is
+    installed, otherwise its in-memory cache.
+    """
+    if not agent_llm_cache_enabled():
+        return
+
+    import litellm
+    from litellm.caching.caching import CacheMode
+
+    temp_dir = os.getenv("TEMP_DIR", "./temp")
+    try:
+        litellm.cache = litellm.Cache(
+            type="disk",
+            disk_cache_dir=os.path.join(temp_dir, "cache", "llm_agents"),
+            mode=CacheMode.default_off
+        )
+    except ImportError:
+        litellm.cache = litellm.Cache(type="local", mode=CacheMode.default_off)
+
+
+@lru_cache(maxsize=None)
+def get_llm_cache() -> LLMCache:
+    """Process-wide LLM response cache, created on first use"""
+    return LLMCache()
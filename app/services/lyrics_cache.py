@@ -0,0 +1,160 @@
+import os
+import re
+import time
+import threading
+import unicodedata
+from functools import lru_cache
+from typing import Optional
+from pydantic import ValidationError
+from app.schemas import LyricsData
+from app.utils import LRUCache, DiskCache, TieredCache
+
+# Bump when the cached payload shape or key normalization changes
+CACHE_VERSION = 1
+
+# "(feat. X)", "[with X]", "- Remastered 2011", "(Radio Edit)" and similar
+_TITLE_DECORATIONS = re.compile(
+    r"""
+    \s*[(\[]\s*(?:feat\.?|ft\.?|featuring|with)\s[^)\]]*[)\]]
+    | \s*[(\[][^)\]]*\b(?:remaster(?:ed)?|remix|mix|edit|version|mono|stereo)\b[^)\]]*[)\]]
+    | \s+-\s+.*\b(?:remaster(?:ed)?|remix|mix|edit|version|mono|stereo)\b.*$
+    | \s+(?:feat\.?|ft\.?|featuring)\s.*$
+    """,
+    re.IGNORECASE | re.VERBOSE
+)
+
+# Spotify joins artists with ", "; only the primary artist is kept
+_ARTIST_SEPARATORS = re.compile(r",|\s(?:feat\.?|ft\.?|featuring)\s", re.IGNORECASE)
+
+
+def _simplify(text: str) -> str:
+    """Lowercase, strip accents and punctuation, collapse whitespace"""
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    text = text.lower().replace("&", " and ")
+    text = re.sub(r"[^\w\s]", "", text)
+    return " ".join(text.split())
+
+
+def normalize_song_key(title: str, artist: str) -> str:
+    """
+    Normalized "artist|title" key for a song
+
+    Featured artists, remaster/remix suffixes and punctuation are dropped so
+    different releases of the same song share one lyrics entry.
+    """
+    title = _TITLE_DECORATIONS.sub("", title)
+    artist = _ARTIST_SEPARATORS.split(artist, maxsplit=1)[0]
+    return f"{_simplify(artist)}|{_simplify(title)}"
+
+
+class LyricsCache:
+    """
+    Cross-request cache of Genius lookups keyed by normalized title and artist
+
+    Found lyrics expire after LYRICS_CACHE_TTL; misses are cached as negative
+    entries for the shorter LYRICS_CACHE_NEGATIVE_TTL so a song that is not on
+    Genius is not searched again on every request.
+    """
+
+    def __init__(self):
+        self.enabled = os.getenv("LYRICS_CACHE_ENABLED", "true").lower() == "true"
+        self.ttl = float(os.getenv("LYRICS_CACHE_TTL", 30 * 24 * 3600))
+        self.negative_ttl = float(os.getenv("LYRICS_CACHE_NEGATIVE_TTL", 3600))
+        temp_dir = os.getenv("TEMP_DIR", "./temp")
+        directory = os.getenv(
+            "LYRICS_CACHE_DIR",
+            os.path.join(temp_dir, "cache", "lyrics")
+        )
+
+        self.cache = TieredCache(
+            memory=LRUCache(int(os.getenv("LYRICS_CACHE_MEMORY_ENTRIES", 1024))),
+            disk=DiskCache(
+                directory,
+                max_bytes=int(os.getenv("LYRICS_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+            )
+        )
+
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.expired = 0
+
+    def _key(self, title: str, artist: str) -> str:
+        return f"v{CACHE_VERSION}:{normalize_song_key(title, artist)}"
+
+    def _count(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def get(self, title: str, artist: str) -> tuple[bool, Optional[LyricsData]]:
+        """
+        Look up a song
+
+        Returns (found, lyrics): found is False when Genius must be asked;
+        (True, None) is a cached miss.
+        """
+        if not self.enabled:
+            return False, None
+
+        key = self._key(title, artist)
+        data = self.cache.get(key)
+        if data is None:
+            self._count("misses")
+            return False, None
+
+        lyrics = data.get("lyrics")
+        ttl = self.ttl if lyrics is not None else self.negative_ttl
+        if time.time() - data.get("stored_at", 0) > ttl:
+            self.cache.delete(key)
+            self._count("expired")
+            self._count("misses")
+            return False, None
+
+        if lyrics is None:
+            self._count("negative_hits")
+            return True, None
+
+        try:
+            result = LyricsData.model_validate(lyrics)
+        except ValidationError:
+            self.cache.delete(key)
+            self._count("misses")
+            return False, None
+
+        self._count("hits")
+        return True, result
+
+    def put(self, title: str, artist: str, lyrics: Optional[LyricsData]):
+        """Store lyrics for a song, or None to record that Genius has none"""
+        if not self.enabled:
+            return
+
+        self.cache.set(self._key(title, artist), {
+            "lyrics": lyrics.model_dump(mode="json") if lyrics else None,
+            "stored_at": time.time()
+        })
+
+    def invalidate(self, title: str, artist: str) -> bool:
+        """Drop a song from both cache tiers"""
+        return self.cache.delete(self._key(title, artist))
+
+    def clear(self):
+        self.cache.clear()
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "expired": self.expired,
+            **self.cache.stats()
+        }
+
+
+@lru_cache(maxsize=None)
+def get_lyrics_cache() -> LyricsCache:
+    """Process-wide lyrics cache, created on first use"""
+    return LyricsCache()
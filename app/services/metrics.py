@@ -0,0 +1,189 @@
+from prometheus_client import Counter, Gauge, Histogram, REGISTRY
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+# Pipeline stages run from milliseconds (cache lookups) to a minute or more (agents)
+STAGE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 40, 80, 160)
+
+STAGE_DURATION = Histogram(
+    "chord_analyzer_stage_duration_seconds",
+    "Duration of analysis pipeline stages",
+    ["stage", "outcome"],
+    buckets=STAGE_BUCKETS
+)
+
+EXPORT_DURATION = Histogram(
+    "chord_analyzer_export_render_duration_seconds",
+    "Time to render a download on its first request",
+    ["format"],
+    buckets=STAGE_BUCKETS
+)
+
+UPSTREAM_WAIT = Histogram(
+    "chord_analyzer_upstream_wait_seconds",
+    "Time upstream calls waited for a rate limit token and concurrency slot",
+    ["provider"],
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+)
+
+PREVIEW_BYTES = Histogram(
+    "chord_analyzer_preview_download_bytes",
+    "Size of downloaded audio previews",
+    buckets=(64_000, 128_000, 256_000, 512_000, 1_000_000, 2_000_000, 4_000_000)
+)
+
+PREVIEW_FIRST_BYTE = Histogram(
+    "chord_analyzer_preview_first_byte_seconds",
+    "Time from requesting an audio preview to its first byte",
+    buckets=STAGE_BUCKETS
+)
+
+HTTP_IN_PROGRESS = Gauge(
+    "chord_analyzer_http_requests_in_progress",
+    "HTTP requests being served"
+)
+
+HTTP_DURATION = Histogram(
+    "chord_analyzer_http_request_duration_seconds",
+    "HTTP request latency by route",
+    ["method", "route", "status"]
+)
+
+LLM_REQUESTS = Counter(
+    "chord_analyzer_llm_requests_total",
+    "LLM completions by model, including litellm cache hits",
+    ["model", "cached"]
+)
+
+LLM_TOKENS = Counter(
+    "chord_analyzer_llm_tokens_total",
+    "LLM tokens by model",
+    ["model", "type"]
+)
+
+LLM_COST = Counter(
+    "chord_analyzer_llm_cost_usd_total",
+    "Estimated LLM spend in USD by model, from litellm's price table",
+    ["model"]
+)
+
+LLM_FAILURES = Counter(
+    "chord_analyzer_llm_failures_total",
+    "Failed LLM completions by model",
+    ["model"]
+)
+
+
+def _record_llm_success(kwargs, completion_response, start_time, end_time):
+    """litellm success callback: tokens and cost of every completion"""
+    model = kwargs.get("model") or getattr(completion_response, "model", None) or "unknown"
+    cached = bool(kwargs.get("cache_hit"))
+    LLM_REQUESTS.labels(model=model, cached=str(cached).lower()).inc()
+    if cached:
+        return
+
+    usage = getattr(completion_response, "usage", None)
+    if usage is not None:
+        LLM_TOKENS.labels(model=model, type="prompt").inc(getattr(usage, "prompt_tokens", 0) or 0)
+        LLM_TOKENS.labels(model=model, type="completion").inc(getattr(usage, "completion_tokens", 0) or 0)
+
+    cost = kwargs.get("response_cost")
+    if cost:
+        LLM_COST.labels(model=model).inc(cost)
+
+
+def _record_llm_failure(kwargs, completion_response, start_time, end_time):
+    LLM_FAILURES.labels(model=kwargs.get("model") or "unknown").inc()
+
+
+def enable_llm_metrics():
+    """
+    Count tokens and cost of every litellm completion
+
+    Registered as litellm callbacks, so the tools' calls and the CrewAI
+    agents' own calls are both counted. Safe to call more than once.
+    """
+    import litellm
+
+    if _record_llm_success not in litellm.success_callback:
+        litellm.success_callback.append(_record_llm_success)
+    if _record_llm_failure not in litellm.failure_callback:
+        litellm.failure_callback.append(_record_llm_failure)
+
+
+class AppCollector:
+    """
+    Expose the counters the services already keep
+
+    Read at scrape time from the caches, upstream providers, job queue,
+    analysis coalescing and TEMP_DIR janitor, so nothing is counted twice.
+    """
+
+    def __init__(self, job_queue):
+        self.job_queue = job_queue
+
+    def collect(self):
+        # Imported here: these modules import this one for their own metrics
+        from app.services import get_analysis_cache, get_lyrics_cache, get_llm_cache, temp_janitor, upstream_stats
+        from app.services.single_flight import analysis_flights
+
+        hits = CounterMetricFamily("chord_analyzer_cache_hits", "Cache hits", labels=["cache"])
+        misses = CounterMetricFamily("chord_analyzer_cache_misses", "Cache misses", labels=["cache"])
+        ratio = GaugeMetricFamily("chord_analyzer_cache_hit_ratio", "Cache hits over lookups since start", labels=["cache"])
+
+        analysis = get_analysis_cache().stats()
+        lyrics = get_lyrics_cache().stats()
+        llm = get_llm_cache().stats()
+        counts = {
+            # The memory tier falls through to disk, so disk misses are the real misses
+            "analysis": (analysis["memory"]["hits"] + analysis["disk"]["hits"], analysis["disk"]["misses"]),
+            "lyrics": (lyrics["hits"] + lyrics["negative_hits"], lyrics["misses"] + lyrics["expired"]),
+            "llm": (llm["hits"], llm["misses"])
+        }
+        for cache, (hit, miss) in counts.items():
+            hits.add_metric([cache], hit)
+            misses.add_metric([cache], miss)
+            ratio.add_metric([cache], hit / (hit + miss) if hit + miss else 0.0)
+        yield hits
+        yield misses
+        yield ratio
+
+        upstream = upstream_stats()
+        families = {
+            "calls": CounterMetricFamily("chord_analyzer_upstream_calls", "Upstream call attempts", labels=["provider"]),
+            "retries": CounterMetricFamily("chord_analyzer_upstream_retries", "Upstream calls retried", labels=["provider"]),
+            "throttled": CounterMetricFamily("chord_analyzer_upstream_throttled", "Upstream 429 responses", labels=["provider"]),
+            "failures": CounterMetricFamily("chord_analyzer_upstream_failures", "Upstream calls that failed after retries", labels=["provider"]),
+            "active": GaugeMetricFamily("chord_analyzer_upstream_in_flight", "Upstream calls in progress", labels=["provider"]),
+            "waiting": GaugeMetricFamily("chord_analyzer_upstream_waiting", "Upstream calls queued for a token or slot", labels=["provider"])
+        }
+        for provider, stats in upstream.items():
+            for field, family in families.items():
+                family.add_metric([provider], stats[field])
+        yield from families.values()
+
+        job_stats = self.job_queue.stats()
+        pending = job_stats.pop("pending")
+        jobs = GaugeMetricFamily("chord_analyzer_jobs", "Tracked jobs by state", labels=["state"])
+        for state, count in job_stats.items():
+            jobs.add_metric([state], count)
+        yield jobs
+        yield GaugeMetricFamily("chord_analyzer_jobs_pending", "Jobs waiting for a worker", value=pending)
+
+        flights = analysis_flights.stats()
+        yield GaugeMetricFamily("chord_analyzer_analyses_in_flight", "Track analyses in progress", value=flights["in_flight"])
+        yield CounterMetricFamily("chord_analyzer_analyses_coalesced", "Requests that joined an analysis in flight", value=flights["coalesced"])
+
+        janitor = temp_janitor.stats()
+        yield GaugeMetricFamily("chord_analyzer_artifact_bytes", "Bytes in the artifact store at the last sweep", value=janitor["bytes"])
+        yield CounterMetricFamily("chord_analyzer_artifact_reclaimed_bytes", "Bytes deleted by the janitor", value=janitor["bytes_reclaimed"])
+
+
+_collector = None
+
+
+def register_app_collector(job_queue):
+    """Register the service counters with the default registry, once"""
+    global _collector
+    if _collector is None:
+        _collector = AppCollector(job_queue)
+        REGISTRY.register(_collector)
@@ -1,4 +1,6 @@
 import os
+from functools import lru_cache
+from typing import Optional
 from reportlab.lib.pagesizes import letter
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
@@ -6,186 +8,327 @@ from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak,
 from reportlab.lib import colors
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.pdfgen import canvas
 from app.schemas import ChordSheet, SongInfo
+from app.utils.chords import transpose_sheet
 
+PAGE_WIDTH, PAGE_HEIGHT = letter
+MARGIN = 0.5 * inch
 
-class PDFGenerator:
-    """Service for generating chord sheet PDFs"""
-    
-    def __init__(self):
-        self.temp_dir = os.getenv("TEMP_DIR", "./temp")
-        os.makedirs(self.temp_dir, exist_ok=True)
-    
-    def generate_chord_sheet(
-        self, 
-        chord_sheet: ChordSheet,
-        output_path: str,
-        transpose: int = 0
-    ) -> str:
-        """Generate a PDF chord sheet"""
-        
-        doc = SimpleDocTemplate(
-            output_path,
-            pagesize=letter,
-            rightMargin=0.5*inch,
-            leftMargin=0.5*inch,
-            topMargin=0.5*inch,
-            bottomMargin=0.5*inch
-        )
-        
-        styles = getSampleStyleSheet()
-        story = []
-        
-        # Custom styles
-        title_style = ParagraphStyle(
+# Fonts, sizes and colors shared by both renderers
+TITLE_FONT, TITLE_SIZE, TITLE_COLOR = 'Helvetica-Bold', 20, colors.HexColor('#1DB954')  # Spotify green
+SUBTITLE_FONT, SUBTITLE_SIZE = 'Helvetica', 12
+INFO_FONT, INFO_SIZE = 'Helvetica-Bold', 9
+SECTION_FONT, SECTION_SIZE, SECTION_COLOR = 'Helvetica-Bold', 13, colors.HexColor('#FF6B6B')
+CHORD_FONT, CHORD_SIZE, CHORD_COLOR = 'Courier-Bold', 10, colors.HexColor('#0066CC')
+LYRICS_FONT, LYRICS_SIZE, LYRICS_LEADING = 'Helvetica', 11, 14
+
+
+@lru_cache(maxsize=None)
+def _paragraph_styles() -> dict:
+    """Platypus styles, built once per process"""
+    styles = getSampleStyleSheet()
+    return {
+        "title": ParagraphStyle(
             'CustomTitle',
             parent=styles['Heading1'],
-            fontSize=20,
-            textColor=colors.HexColor('#1DB954'),  # Spotify green
+            fontSize=TITLE_SIZE,
+            textColor=TITLE_COLOR,
             spaceAfter=6
-        )
-        
-        subtitle_style = ParagraphStyle(
+        ),
+        "subtitle": ParagraphStyle(
             'CustomSubtitle',
             parent=styles['Normal'],
-            fontSize=12,
+            fontSize=SUBTITLE_SIZE,
             textColor=colors.grey,
             spaceAfter=12
-        )
-        
-        chord_style = ParagraphStyle(
+        ),
+        "chord": ParagraphStyle(
             'ChordStyle',
             parent=styles['Normal'],
-            fontSize=10,
-            textColor=colors.HexColor('#0066CC'),
-            fontName='Courier-Bold',
+            fontSize=CHORD_SIZE,
+            textColor=CHORD_COLOR,
+            fontName=CHORD_FONT,
             spaceAfter=2
-        )
-        
-        lyrics_style = ParagraphStyle(
+        ),
+        "lyrics": ParagraphStyle(
             'LyricsStyle',
             parent=styles['Normal'],
-            fontSize=11,
+            fontSize=LYRICS_SIZE,
             spaceAfter=10,
-            leading=14
-        )
-        
-        section_style = ParagraphStyle(
+            leading=LYRICS_LEADING
+        ),
+        "section": ParagraphStyle(
             'SectionStyle',
             parent=styles['Heading2'],
-            fontSize=13,
-            textColor=colors.HexColor('#FF6B6B'),
+            fontSize=SECTION_SIZE,
+            textColor=SECTION_COLOR,
             spaceAfter=8,
             spaceBefore=12
         )
-        
-        # Title
-        story.append(Paragraph(chord_sheet.song_info.title, title_style))
-        
-        # Artist
-        story.append(Paragraph(chord_sheet.song_info.artist, subtitle_style))
-        
-        # Song info table
+    }
+
+
+@lru_cache(maxsize=None)
+def _char_widths(font: str, size: float) -> dict:
+    """Advance widths of the printable ASCII characters of a font"""
+    return {chr(c): pdfmetrics.stringWidth(chr(c), font, size) for c in range(32, 127)}
+
+
+def _text_width(text: str, font: str, size: float) -> float:
+    """String width from the cached metrics, falling back for non-ASCII text"""
+    widths = _char_widths(font, size)
+    try:
+        return sum(widths[c] for c in text)
+    except KeyError:
+        return pdfmetrics.stringWidth(text, font, size)
+
+
+class PDFGenerator:
+    """Service for generating chord sheet PDFs"""
+
+    def __init__(self):
+        self.temp_dir = os.getenv("TEMP_DIR", "./temp")
+        os.makedirs(self.temp_dir, exist_ok=True)
+        self.page_count = 0
+
+    def generate_chord_sheet(
+        self,
+        chord_sheet: ChordSheet,
+        output_path: str,
+        transpose: int = 0,
+        renderer: Optional[str] = None
+    ) -> str:
+        """
+        Generate a PDF chord sheet
+
+        PDF_RENDERER=canvas (default) draws straight onto the reportlab canvas;
+        "platypus" lays the sheet out as flowables.
+        """
+
+        # Transpose the whole sheet once, with spelling for the new key
+        chord_sheet = transpose_sheet(chord_sheet, transpose)
+
+        renderer = (renderer or os.getenv("PDF_RENDERER", "canvas")).lower()
+        if renderer == "platypus":
+            return self._render_platypus(chord_sheet, output_path, transpose)
+        return self._render_canvas(chord_sheet, output_path, transpose)
+
+    def _info_rows(self, chord_sheet: ChordSheet, transpose: int) -> list[list[str]]:
+        """Key, tempo, capo and transposition rows of the header"""
         info_data = [
             ['Key:', chord_sheet.key, 'Tempo:', f"{chord_sheet.tempo} BPM"],
         ]
-        
+
         if chord_sheet.capo:
             info_data.append(['Capo:', f"Fret {chord_sheet.capo}", '', ''])
-        
+
         if transpose != 0:
             direction = "up" if transpose > 0 else "down"
             info_data.append(['Transposed:', f"{abs(transpose)} semitones {direction}", '', ''])
-        
-        info_table = Table(info_data, colWidths=[0.8*inch, 1.5*inch, 0.8*inch, 1.5*inch])
+
+        return info_data
+
+    def _render_canvas(self, chord_sheet: ChordSheet, output_path: str, transpose: int) -> str:
+        """
+        Draw the sheet directly onto the canvas
+
+        Each chord is placed at the measured width of the lyrics before it,
+        so chords stay over their syllable in the proportional lyrics font.
+        """
+        c = canvas.Canvas(output_path, pagesize=letter)
+        c.setTitle(chord_sheet.song_info.title)
+        c.setAuthor(chord_sheet.song_info.artist)
+
+        # Platypus frames pad their content by 6pt on every side
+        left = MARGIN + 6
+        max_width = PAGE_WIDTH - 2 * left
+        bottom = MARGIN + 6
+        y = PAGE_HEIGHT - MARGIN - 6
+
+        def ensure_space(height: float):
+            nonlocal y
+            if y - height < bottom:
+                c.showPage()
+                y = PAGE_HEIGHT - MARGIN - 6
+
+        # Title and artist
+        y -= TITLE_SIZE * 1.2
+        c.setFont(TITLE_FONT, TITLE_SIZE)
+        c.setFillColor(TITLE_COLOR)
+        c.drawString(left, y, chord_sheet.song_info.title)
+        y -= 6 + SUBTITLE_SIZE * 1.2
+        c.setFont(SUBTITLE_FONT, SUBTITLE_SIZE)
+        c.setFillColor(colors.grey)
+        c.drawString(left, y, chord_sheet.song_info.artist)
+        y -= 12
+
+        # Song info rows in the same centered columns as the platypus table
+        columns = [0, 0.8 * inch, 2.3 * inch, 3.1 * inch]
+        table_left = left + (max_width - 4.6 * inch) / 2 + 6
+        c.setFont(INFO_FONT, INFO_SIZE)
+        for row in self._info_rows(chord_sheet, transpose):
+            y -= INFO_SIZE * 1.2 + 8
+            for col, (x, text) in enumerate(zip(columns, row)):
+                c.setFillColor(colors.grey if col in (0, 2) else colors.black)
+                c.drawString(table_left + x, y, str(text))
+        y -= 0.2 * inch
+
+        for line_data in chord_sheet.lines:
+            text = line_data.lyrics_line
+
+            # Section header
+            if text.startswith('[') and text.endswith(']'):
+                ensure_space(12 + SECTION_SIZE * 1.2 + 8 + LYRICS_LEADING)
+                y -= 12 + SECTION_SIZE * 1.2
+                c.setFont(SECTION_FONT, SECTION_SIZE)
+                c.setFillColor(SECTION_COLOR)
+                c.drawString(left, y, text.strip('[]'))
+                y -= 8
+                continue
+
+            # Empty line
+            if not text.strip():
+                y -= 0.1 * inch
+                continue
+
+            for segment, chords in self._wrap(text, line_data.chords, max_width):
+                height = LYRICS_LEADING + 10 + (CHORD_SIZE * 1.2 + 2 if chords else 0)
+                ensure_space(height)
+
+                if chords:
+                    y -= CHORD_SIZE * 1.2
+                    c.setFont(CHORD_FONT, CHORD_SIZE)
+                    c.setFillColor(CHORD_COLOR)
+                    next_free = 0.0
+                    for position, chord in chords:
+                        x = max(_text_width(segment[:position], LYRICS_FONT, LYRICS_SIZE), next_free)
+                        c.drawString(left + x, y, chord)
+                        next_free = x + _text_width(chord + ' ', CHORD_FONT, CHORD_SIZE)
+                    y -= 2
+
+                y -= LYRICS_LEADING
+                c.setFont(LYRICS_FONT, LYRICS_SIZE)
+                c.setFillColor(colors.black)
+                c.drawString(left, y, segment)
+                y -= 10
+
+        self.page_count = c.getPageNumber()
+        c.save()
+        return output_path
+
+    def _wrap(
+        self,
+        text: str,
+        chords: list[tuple[int, str]],
+        max_width: float
+    ) -> list[tuple[str, list[tuple[int, str]]]]:
+        """Split a lyrics line at word boundaries to fit the page, carrying its chords along"""
+        segments = []
+        start = 0
+        while _text_width(text[start:], LYRICS_FONT, LYRICS_SIZE) > max_width:
+            end = start
+            for i in range(start + 1, len(text)):
+                if text[i] == ' ' and _text_width(text[start:i], LYRICS_FONT, LYRICS_SIZE) <= max_width:
+                    end = i
+            if end == start:
+                break
+            segments.append((start, end))
+            start = end + 1
+        segments.append((start, len(text)))
+
+        result = []
+        for i, (seg_start, seg_end) in enumerate(segments):
+            last = i == len(segments) - 1
+            seg_chords = [
+                (position - seg_start, chord)
+                for position, chord in chords
+                if position >= seg_start and (last or position <= seg_end)
+            ]
+            result.append((text[seg_start:seg_end], seg_chords))
+        return result
+
+    def _render_platypus(self, chord_sheet: ChordSheet, output_path: str, transpose: int) -> str:
+        """Lay the sheet out as platypus flowables"""
+
+        doc = SimpleDocTemplate(
+            output_path,
+            pagesize=letter,
+            rightMargin=MARGIN,
+            leftMargin=MARGIN,
+            topMargin=MARGIN,
+            bottomMargin=MARGIN
+        )
+
+        styles = _paragraph_styles()
+        story = []
+
+        # Title
+        story.append(Paragraph(chord_sheet.song_info.title, styles["title"]))
+
+        # Artist
+        story.append(Paragraph(chord_sheet.song_info.artist, styles["subtitle"]))
+
+        # Song info table
+        info_table = Table(
+            self._info_rows(chord_sheet, transpose),
+            colWidths=[0.8*inch, 1.5*inch, 0.8*inch, 1.5*inch]
+        )
         info_table.setStyle(TableStyle([
-            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 9),
+            ('FONTNAME', (0, 0), (-1, -1), INFO_FONT),
+            ('FONTSIZE', (0, 0), (-1, -1), INFO_SIZE),
             ('TEXTCOLOR', (0, 0), (0, -1), colors.grey),
             ('TEXTCOLOR', (2, 0), (2, -1), colors.grey),
             ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
             ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
         ]))
-        
+
         story.append(info_table)
         story.append(Spacer(1, 0.2*inch))
-        
+
         # Chord progressions and lyrics
-        current_section = None
-        
         for line_data in chord_sheet.lines:
             # Check if this is a section header
             if line_data.lyrics_line.startswith('[') and line_data.lyrics_line.endswith(']'):
                 section_name = line_data.lyrics_line.strip('[]')
-                story.append(Paragraph(section_name, section_style))
-                current_section = section_name
+                story.append(Paragraph(section_name, styles["section"]))
                 continue
-            
+
             # Skip empty lines
             if not line_data.lyrics_line.strip():
                 story.append(Spacer(1, 0.1*inch))
                 continue
-            
+
             # Create chord line if chords exist
             if line_data.chords:
                 chord_line = self._create_chord_line(
-                    line_data.lyrics_line, 
-                    line_data.chords,
-                    transpose
+                    line_data.lyrics_line,
+                    line_data.chords
                 )
-                story.append(Paragraph(chord_line, chord_style))
-            
+                story.append(Paragraph(chord_line, styles["chord"]))
+
             # Add lyrics line
-            story.append(Paragraph(line_data.lyrics_line, lyrics_style))
-        
+            story.append(Paragraph(line_data.lyrics_line, styles["lyrics"]))
+
         # Build PDF
         doc.build(story)
+        self.page_count = doc.page
         return output_path
-    
+
     def _create_chord_line(
-        self, 
-        lyrics_line: str, 
-        chords: list[tuple[int, str]],
-        transpose: int = 0
+        self,
+        lyrics_line: str,
+        chords: list[tuple[int, str]]
     ) -> str:
         """Create a line showing chord positions above lyrics"""
-        # Transpose chords if needed
-        if transpose != 0:
-            chords = [(pos, self._transpose_chord(chord, transpose)) for pos, chord in chords]
-        
         # Create chord line with proper spacing
         chord_line_chars = [' '] * len(lyrics_line)
-        
+
         for position, chord in chords:
             if position < len(chord_line_chars):
                 # Place chord at position
                 for i, char in enumerate(chord):
                     if position + i < len(chord_line_chars):
                         chord_line_chars[position + i] = char
-        
+
         return ''.join(chord_line_chars).rstrip()
-    
-    def _transpose_chord(self, chord: str, semitones: int) -> str:
-        """Transpose a chord by semitones"""
-        notes = ['C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B']
-        flat_to_sharp = {'Db': 'C#', 'Eb': 'D#', 'Gb': 'F#', 'Ab': 'G#', 'Bb': 'A#'}
-        
-        # Extract root note
-        root = chord[0]
-        if len(chord) > 1 and chord[1] in ['#', 'b']:
-            root = chord[:2]
-        
-        # Convert flats to sharps
-        if root in flat_to_sharp:
-            root = flat_to_sharp[root]
-        
-        # Find index and transpose
-        if root in notes:
-            idx = notes.index(root)
-            new_idx = (idx + semitones) % 12
-            new_root = notes[new_idx]
-            
-            # Replace root in chord
-            return chord.replace(root, new_root, 1)
-        
-        return chord
\ No newline at end of file
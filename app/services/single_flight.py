@@ -0,0 +1,108 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Optional
+
+
+class _Flight:
+    """One in-flight computation and the callers waiting on it"""
+
+    def __init__(self, owners: list[str]):
+        self.task: Optional[asyncio.Task] = None
+        self.owners = owners
+        self.waiters = 1
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls for the same key into one computation
+
+    The first caller for a key starts the work as its own task; callers that
+    arrive while it runs await the same result. A caller that is cancelled
+    only detaches: the work is cancelled once no caller is left waiting, so
+    cancelling the first request does not fail the others. The caller that
+    started the work still waits for it to finish before its cancellation
+    propagates, so the work stays counted against whatever bounds that
+    caller (e.g. the job workers). Errors reach every waiter, and the key is
+    released as soon as the work finishes, so the next call after a failure
+    starts afresh.
+    """
+
+    def __init__(self):
+        self._flights: dict[str, _Flight] = {}
+        self.leaders = 0
+        self.coalesced = 0
+        self.failed = 0
+        self.abandoned = 0
+
+    def leader(self, key: str) -> Optional[str]:
+        """Earliest owner still waiting on the computation for a key, if any"""
+        flight = self._flights.get(key)
+        return flight.owners[0] if flight and flight.owners else None
+
+    async def run(
+        self,
+        key: str,
+        factory: Callable[[], Awaitable[Any]],
+        owner: Optional[str] = None,
+        owners: Optional[list[str]] = None
+    ) -> Any:
+        """
+        Result of ``factory()`` for this key, shared with concurrent callers
+
+        ``owners`` is the list the starting caller's work reports to: the
+        owner of every caller that joins is added to it, and removed again
+        when that caller detaches.
+        """
+        flight = self._flights.get(key)
+        started = flight is None
+        if started:
+            flight = _Flight(owners if owners is not None else [])
+            if owner is not None and owner not in flight.owners:
+                flight.owners.append(owner)
+            flight.task = asyncio.ensure_future(factory())
+            self._flights[key] = flight
+            self.leaders += 1
+            flight.task.add_done_callback(lambda task: self._finished(key, flight))
+        else:
+            flight.waiters += 1
+            self.coalesced += 1
+            if owner is not None:
+                flight.owners.append(owner)
+
+        try:
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            flight.waiters -= 1
+            if owner in flight.owners:
+                flight.owners.remove(owner)
+            if flight.waiters == 0 and not flight.task.done():
+                self.abandoned += 1
+                self._release(key, flight)
+                flight.task.cancel()
+            if started:
+                await asyncio.wait([flight.task])
+            raise
+
+    def _release(self, key: str, flight: _Flight):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    def _finished(self, key: str, flight: _Flight):
+        self._release(key, flight)
+        # Retrieve the exception so a flight nobody awaits any more stays quiet
+        if not flight.task.cancelled() and flight.task.exception() is not None:
+            self.failed += 1
+
+    def stats(self) -> dict:
+        calls = self.leaders + self.coalesced
+        return {
+            "in_flight": len(self._flights),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+            "coalesced_rate": round(self.coalesced / calls, 3) if calls else 0.0,
+            "failed": self.failed,
+            "abandoned": self.abandoned
+        }
+
+
+# Analyses in progress, keyed by Spotify track ID
+analysis_flights = SingleFlight()
@@ -1,10 +1,36 @@
 import os
 import re
+import time
+import logging
+import threading
+from functools import lru_cache
 from typing import Optional
+import aiofiles
 import httpx
+import requests
 import spotipy
+from spotipy.cache_handler import MemoryCacheHandler
 from spotipy.oauth2 import SpotifyClientCredentials
-from app.schemas import SongInfo
+from app.schemas import SongInfo, PreviewDownload
+from app.services.http_client import http_client
+from app.services.upstream import UpstreamError, get_upstream
+
+logger = logging.getLogger(__name__)
+
+
+class ThreadSafeClientCredentials(SpotifyClientCredentials):
+    """
+    Client-credentials flow whose token is cached in memory and refreshed
+    by one thread at a time, so concurrent requests share a single token
+    """
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, cache_handler=MemoryCacheHandler(), **kwargs)
+        self._token_lock = threading.Lock()
+    
+    def get_access_token(self, as_dict=False, check_cache=True):
+        with self._token_lock:
+            return super().get_access_token(as_dict=as_dict, check_cache=check_cache)
 
 
 class SpotifyService:
@@ -17,13 +43,39 @@ class SpotifyService:
         if not self.client_id or not self.client_secret:
             raise ValueError("Spotify credentials not found in environment")
         
-        auth_manager = SpotifyClientCredentials(
+        # One pooled session for API calls and token requests
+        session = requests.Session()
+        pool_size = int(os.getenv("SPOTIFY_POOL_SIZE", 20))
+        # The adapter is the only retry policy spotipy uses with a session
+        # passed in; it must keep max_retries=0 so the shared upstream provider
+        # is the only retry and backoff policy, 429s reach its throttle
+        # counters and Retry-After isn't slept out holding a concurrency slot
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            max_retries=0
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        
+        auth_manager = ThreadSafeClientCredentials(
             client_id=self.client_id,
-            client_secret=self.client_secret
+            client_secret=self.client_secret,
+            requests_session=session
         )
-        self.sp = spotipy.Spotify(auth_manager=auth_manager)
+        self.sp = spotipy.Spotify(auth_manager=auth_manager, requests_session=session)
+        
+        # Alternative endpoints, e.g. the stand-ins in benchmarks/standins.py
+        if os.getenv("SPOTIFY_API_URL"):
+            self.sp.prefix = os.getenv("SPOTIFY_API_URL").rstrip("/") + "/"
+        if os.getenv("SPOTIFY_TOKEN_URL"):
+            auth_manager.OAUTH_TOKEN_URL = os.getenv("SPOTIFY_TOKEN_URL")
+        
+        # Rate limit, concurrency cap and retries shared by all API calls
+        self.upstream = get_upstream("spotify")
     
-    def extract_track_id(self, spotify_url: str) -> str:
+    @staticmethod
+    def extract_track_id(spotify_url: str) -> str:
         """Extract track ID from Spotify URL"""
         patterns = [
             r'spotify\.com/track/([a-zA-Z0-9]+)',
@@ -37,49 +89,174 @@ class SpotifyService:
         
         raise ValueError("Invalid Spotify URL format")
     
+    @staticmethod
+    def extract_collection(spotify_url: str) -> tuple[str, str]:
+        """Extract ("playlist" | "album", ID) from a Spotify URL or URI"""
+        patterns = [
+            r'spotify\.com/(playlist|album)/([a-zA-Z0-9]+)',
+            r'spotify:(playlist|album):([a-zA-Z0-9]+)'
+        ]
+        
+        for pattern in patterns:
+            match = re.search(pattern, spotify_url)
+            if match:
+                return match.group(1), match.group(2)
+        
+        raise ValueError("Invalid Spotify playlist or album URL format")
+    
     def get_track_info(self, spotify_url: str) -> SongInfo:
         """Get track information from Spotify"""
         track_id = self.extract_track_id(spotify_url)
-        track = self.sp.track(track_id)
+        track = self.upstream.call(self.sp.track, track_id)
         
         if not track:
             raise ValueError("Failed to retrieve track information from Spotify")
         
         # Get audio features for additional info
-        features_list = self.sp.audio_features([track_id])
+        # The endpoint may return nothing (or be unavailable to the app); the
+        # pipeline then falls back to estimating these values from the audio
+        try:
+            features_list = self.upstream.call(self.sp.audio_features, [track_id])
+        except (spotipy.SpotifyException, UpstreamError) as e:
+            logger.warning("Audio features unavailable: %s", e)
+            features_list = None
         audio_features = features_list[0] if features_list and features_list[0] else {}
         
+        return self._build_song_info(track, audio_features)
+    
+    def get_collection_track_ids(self, spotify_url: str) -> list[str]:
+        """List the track IDs of a playlist or album, in order and without repeats"""
+        kind, collection_id = self.extract_collection(spotify_url)
+        
+        if kind == "album":
+            page = self.upstream.call(self.sp.album_tracks, collection_id, limit=50)
+        else:
+            page = self.upstream.call(
+                self.sp.playlist_items,
+                collection_id,
+                fields="items(track(id,type,is_local)),next",
+                additional_types=("track",),
+                limit=100
+            )
+        
+        track_ids = []
+        while page:
+            for item in page['items']:
+                # Playlist items wrap the track; episodes and local files are skipped
+                track = item.get('track') if kind == "playlist" else item
+                if track and track.get('id') and track.get('type', 'track') == 'track' and not track.get('is_local'):
+                    track_ids.append(track['id'])
+            page = self.upstream.call(self.sp.next, page) if page.get('next') else None
+        
+        return list(dict.fromkeys(track_ids))
+    
+    def get_tracks_info(self, track_ids: list[str]) -> list[SongInfo]:
+        """
+        Get information for many tracks with the bulk endpoints
+        
+        Tracks are fetched 50 per request and audio features 100 per request,
+        instead of two requests per track.
+        """
+        tracks = []
+        for i in range(0, len(track_ids), 50):
+            tracks.extend(self.upstream.call(self.sp.tracks, track_ids[i:i + 50])['tracks'])
+        
+        features_by_id = {}
+        for i in range(0, len(track_ids), 100):
+            try:
+                features_list = self.upstream.call(self.sp.audio_features, track_ids[i:i + 100])
+            except (spotipy.SpotifyException, UpstreamError) as e:
+                logger.warning("Audio features unavailable: %s", e)
+                break
+            for features in features_list or []:
+                if features:
+                    features_by_id[features['id']] = features
+        
+        return [
+            self._build_song_info(track, features_by_id.get(track['id'], {}))
+            for track in tracks
+            if track
+        ]
+    
+    @staticmethod
+    def _build_song_info(track: dict, audio_features: dict) -> SongInfo:
+        """Build SongInfo from a full track object and its audio features"""
         # Convert key number to note
         key_map = ['C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B']
-        key_note = key_map[audio_features['key']] if audio_features['key'] != -1 else None
-        mode = 'Major' if audio_features['mode'] == 1 else 'Minor'
+        key_index = audio_features.get('key', -1)
+        key_note = key_map[key_index] if key_index is not None and key_index != -1 else None
+        mode = 'Major' if audio_features.get('mode') == 1 else 'Minor'
         
         return SongInfo(
             title=track['name'],
             artist=', '.join([artist['name'] for artist in track['artists']]),
             album=track['album']['name'],
             duration_ms=track['duration_ms'],
-            spotify_id=track_id,
+            spotify_id=track['id'],
             preview_url=track.get('preview_url'),
             key=f"{key_note} {mode}" if key_note else None,
-            tempo=audio_features['tempo'],
-            time_signature=audio_features['time_signature']
+            tempo=audio_features.get('tempo'),
+            time_signature=audio_features.get('time_signature')
         )
     
-    async def download_preview(self, preview_url: str, output_path: str) -> bool:
-        """Download 30-second preview audio"""
+    async def download_preview(
+        self,
+        preview_url: str,
+        output_path: Optional[str] = None
+    ) -> Optional[PreviewDownload]:
+        """
+        Stream the 30-second preview audio over the shared HTTP client
+        
+        Chunks are written to output_path with non-blocking file I/O, or
+        collected in memory when no path is given. Returns None when the
+        preview does not exist and raises UpstreamError when it cannot be
+        fetched.
+        """
         if not preview_url:
-            return False
+            return None
         
-        try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(preview_url)
+        chunk_size = int(os.getenv("DOWNLOAD_CHUNK_SIZE", 64 * 1024))
+        
+        async def download() -> PreviewDownload:
+            started = time.perf_counter()
+            first_byte = None
+            size = 0
+            chunks = []
+            
+            async with http_client.client.stream("GET", preview_url) as response:
                 response.raise_for_status()
                 
-                with open(output_path, 'wb') as f:
-                    f.write(response.content)
-                
-                return True
-        except Exception as e:
-            print(f"Error downloading preview: {e}")
-            return False
\ No newline at end of file
+                if output_path:
+                    async with aiofiles.open(output_path, 'wb') as f:
+                        async for chunk in response.aiter_bytes(chunk_size):
+                            first_byte = first_byte or time.perf_counter()
+                            size += len(chunk)
+                            await f.write(chunk)
+                else:
+                    async for chunk in response.aiter_bytes(chunk_size):
+                        first_byte = first_byte or time.perf_counter()
+                        size += len(chunk)
+                        chunks.append(chunk)
+            
+            finished = time.perf_counter()
+            return PreviewDownload(
+                content=None if output_path else b''.join(chunks),
+                path=output_path,
+                size_bytes=size,
+                time_to_first_byte_ms=round(((first_byte or finished) - started) * 1000, 1),
+                elapsed_ms=round((finished - started) * 1000, 1)
+            )
+        
+        # Transient failures are retried and raise UpstreamError once
+        # exhausted; a preview the CDN refuses (404, 403) is simply missing
+        try:
+            return await get_upstream("preview").acall(download)
+        except httpx.HTTPStatusError as e:
+            logger.warning("Preview not available: %s", e)
+            return None
+
+
+@lru_cache(maxsize=None)
+def get_spotify_service() -> SpotifyService:
+    """Process-wide Spotify service, created on first use"""
+    return SpotifyService()
\ No newline at end of file
@@ -0,0 +1,271 @@
+import os
+import time
+import random
+import asyncio
+import threading
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Optional
+import httpx
+from app.services.metrics import UPSTREAM_WAIT
+
+# Statuses worth retrying: timeouts, rate limits and transient server errors
+RETRYABLE_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+
+# rate (calls/s), burst, concurrent calls
+PROVIDER_DEFAULTS = {
+    "spotify": (10.0, 20, 10),
+    "genius": (5.0, 10, 5),
+    "llm": (2.0, 4, 4),
+    "preview": (20.0, 40, 10)
+}
+
+
+class UpstreamError(Exception):
+    """An upstream call that still failed after retries, or was throttled for too long"""
+
+    def __init__(self, provider: str, message: str, status_code: Optional[int] = None):
+        super().__init__(f"{provider} is unavailable: {message}")
+        self.provider = provider
+        self.status_code = status_code
+
+
+def _status_code(error: Exception) -> Optional[int]:
+    """HTTP status of a spotipy, requests, httpx or litellm error, if it has one"""
+    for attr in ("http_status", "status_code"):
+        status = getattr(error, attr, None)
+        if isinstance(status, int):
+            return status
+    response = getattr(error, "response", None)
+    status = getattr(response, "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    """Seconds from a Retry-After header (delta or HTTP date), if the error carries one"""
+    headers = getattr(error, "headers", None) or getattr(getattr(error, "response", None), "headers", None)
+    if not headers:
+        return None
+
+    value = headers.get("Retry-After") or headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def is_retryable(error: Exception) -> bool:
+    """Connection problems, timeouts, 429s and transient 5xx errors"""
+    # Imported here: only the spotipy and lyricsgenius clients use requests
+    import requests
+
+    if isinstance(error, (requests.ConnectionError, requests.Timeout, httpx.TransportError)):
+        return True
+    return _status_code(error) in RETRYABLE_STATUSES
+
+
+class Provider:
+    """
+    Rate limit, concurrency cap and retry policy for one upstream service
+
+    Calls take a token from a bucket refilled at ``rate`` per second (up to
+    ``burst``) and a slot from a concurrency limit, waiting for whichever is
+    missing. Retryable failures are retried with jittered exponential backoff,
+    waiting at least as long as the upstream's Retry-After. Works from worker
+    threads (``call``) and from the event loop (``acall``).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        rate: float,
+        burst: int,
+        concurrency: int,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+        max_retry_after: float = 60.0
+    ):
+        self.name = name
+        self.rate = rate
+        self.burst = burst
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_retry_after = max_retry_after
+
+        self._cond = threading.Condition()
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self.active = 0
+        self.waiting = 0
+
+        self.calls = 0
+        self.retries = 0
+        self.throttled = 0
+        self.failures = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def _try_acquire(self) -> float:
+        """Take a token and a slot; otherwise return how long to wait before trying again"""
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+        if self.active >= self.concurrency:
+            return 0.05
+        if self._tokens < 1:
+            return (1 - self._tokens) / self.rate
+
+        self._tokens -= 1
+        self.active += 1
+        return 0.0
+
+    def _record_wait(self, waited: float):
+        self.calls += 1
+        self.wait_seconds += waited
+        self.max_wait_seconds = max(self.max_wait_seconds, waited)
+        UPSTREAM_WAIT.labels(provider=self.name).observe(waited)
+
+    def acquire(self):
+        """Block the calling thread until a call may start"""
+        started = time.monotonic()
+        with self._cond:
+            self.waiting += 1
+            try:
+                while (delay := self._try_acquire()) > 0:
+                    self._cond.wait(timeout=delay)
+            finally:
+                self.waiting -= 1
+            self._record_wait(time.monotonic() - started)
+
+    async def acquire_async(self):
+        """Wait on the event loop until a call may start"""
+        started = time.monotonic()
+        with self._cond:
+            self.waiting += 1
+        try:
+            while True:
+                with self._cond:
+                    delay = self._try_acquire()
+                if delay <= 0:
+                    break
+                await asyncio.sleep(delay)
+        finally:
+            with self._cond:
+                self.waiting -= 1
+                self._record_wait(time.monotonic() - started)
+
+    def release(self):
+        with self._cond:
+            self.active -= 1
+            self._cond.notify()
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        """Delay before the next attempt; raises UpstreamError when giving up"""
+        status = _status_code(error)
+        if status == 429:
+            self.throttled += 1
+
+        if attempt >= self.max_retries:
+            self.failures += 1
+            raise UpstreamError(self.name, str(error) or type(error).__name__, status) from error
+
+        retry_after = _retry_after(error)
+        if retry_after is not None and retry_after > self.max_retry_after:
+            self.failures += 1
+            raise UpstreamError(
+                self.name,
+                f"rate limited for {retry_after:.0f}s",
+                status
+            ) from error
+
+        # Full jitter keeps clients that failed together from retrying together
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        self.retries += 1
+        return max(delay, retry_after or 0.0)
+
+    def call(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run a blocking upstream call under the limits, retrying transient failures"""
+        attempt = 0
+        while True:
+            self.acquire()
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                if not is_retryable(e):
+                    raise
+                error = e
+            finally:
+                self.release()
+
+            time.sleep(self._backoff(attempt, error))
+            attempt += 1
+
+    async def acall(self, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Await ``fn()`` under the limits, retrying transient failures"""
+        attempt = 0
+        while True:
+            await self.acquire_async()
+            try:
+                return await fn()
+            except Exception as e:
+                if not is_retryable(e):
+                    raise
+                error = e
+            finally:
+                self.release()
+
+            await asyncio.sleep(self._backoff(attempt, error))
+            attempt += 1
+
+    def stats(self) -> dict:
+        return {
+            "rate": self.rate,
+            "burst": self.burst,
+            "concurrency": self.concurrency,
+            "active": self.active,
+            "waiting": self.waiting,
+            "calls": self.calls,
+            "retries": self.retries,
+            "throttled": self.throttled,
+            "failures": self.failures,
+            "avg_wait_ms": round(self.wait_seconds / self.calls * 1000, 1) if self.calls else 0.0,
+            "max_wait_ms": round(self.max_wait_seconds * 1000, 1)
+        }
+
+
+@lru_cache(maxsize=None)
+def get_upstream(name: str) -> Provider:
+    """
+    Process-wide limits for one provider, created on first use
+
+    Configured with UPSTREAM_<NAME>_RATE, _BURST and _CONCURRENCY, plus the
+    shared UPSTREAM_MAX_RETRIES, UPSTREAM_BACKOFF_BASE, UPSTREAM_BACKOFF_MAX
+    and UPSTREAM_MAX_RETRY_AFTER.
+    """
+    rate, burst, concurrency = PROVIDER_DEFAULTS.get(name, (10.0, 20, 10))
+    prefix = f"UPSTREAM_{name.upper()}"
+    return Provider(
+        name,
+        rate=float(os.getenv(f"{prefix}_RATE", rate)),
+        burst=int(os.getenv(f"{prefix}_BURST", burst)),
+        concurrency=int(os.getenv(f"{prefix}_CONCURRENCY", concurrency)),
+        max_retries=int(os.getenv("UPSTREAM_MAX_RETRIES", 3)),
+        backoff_base=float(os.getenv("UPSTREAM_BACKOFF_BASE", 0.5)),
+        backoff_max=float(os.getenv("UPSTREAM_BACKOFF_MAX", 30.0)),
+        max_retry_after=float(os.getenv("UPSTREAM_MAX_RETRY_AFTER", 60.0))
+    )
+
+
+def upstream_stats() -> dict:
+    """Limits, queue wait times and retry counters of every provider"""
+    return {name: get_upstream(name).stats() for name in PROVIDER_DEFAULTS}
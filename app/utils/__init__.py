@@ -1,3 +1,29 @@
-from .audio_utils import AudioUtils
+"""Utilities, imported on first use so numpy, librosa and scipy load only when needed"""
+from importlib import import_module
 
-__all__ = ["AudioUtils"]
\ No newline at end of file
+# Exported name -> submodule that defines it
+_EXPORTS = {
+    "AudioUtils": ".audio_utils",
+    "LRUCache": ".cache",
+    "DiskCache": ".cache",
+    "TieredCache": ".cache",
+    "MusicEstimator": ".music_estimation",
+    "ChordRecognizer": ".chord_recognition",
+    "ChordAligner": ".chord_alignment"
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    """Import the submodule that defines a name on first access"""
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
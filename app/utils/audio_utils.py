@@ -1,6 +1,8 @@
-import os
+import io
 import base64
-from typing import Optional
+import numpy as np
+import librosa
+import soundfile as sf
 from pydub import AudioSegment
 
 
@@ -24,6 +26,46 @@ class AudioUtils:
             encoded = base64.b64encode(audio_file.read()).decode('utf-8')
         return encoded
     
+    @staticmethod
+    def decode_audio_bytes(data: bytes, sample_rate: int = 16000) -> np.ndarray:
+        """Decode compressed audio bytes to a mono float signal at the given rate"""
+        try:
+            samples, source_rate = sf.read(io.BytesIO(data), dtype='float32', always_2d=True)
+            samples = samples.mean(axis=1)
+        except (sf.LibsndfileError, RuntimeError):
+            # Older libsndfile builds cannot decode MP3; fall back to ffmpeg
+            audio = AudioSegment.from_file(io.BytesIO(data)).set_channels(1)
+            source_rate = audio.frame_rate
+            scale = float(1 << (8 * audio.sample_width - 1))
+            samples = np.array(audio.get_array_of_samples(), dtype=np.float32) / scale
+        
+        return AudioUtils.resample(samples, source_rate, sample_rate)
+    
+    @staticmethod
+    def resample(samples: np.ndarray, source_rate: int, sample_rate: int) -> np.ndarray:
+        """Resample a mono signal, or return it as is if already at the rate"""
+        if source_rate == sample_rate:
+            return samples
+        return librosa.resample(samples, orig_sr=source_rate, target_sr=sample_rate)
+    
+    @staticmethod
+    def encode_wav_base64(samples: np.ndarray, sample_rate: int) -> str:
+        """Encode a mono signal as a 16-bit PCM WAV and base64 it, in memory"""
+        buffer = io.BytesIO()
+        sf.write(buffer, samples, sample_rate, format='WAV', subtype='PCM_16')
+        return base64.b64encode(buffer.getvalue()).decode('utf-8')
+    
+    @staticmethod
+    def audio_bytes_to_wav_base64(data: bytes, sample_rate: int = 16000) -> str:
+        """
+        Downmix, resample and encode audio for an LLM request without temp files
+        
+        A 30 s preview at 16 kHz mono is roughly a sixth of the 44.1 kHz
+        stereo WAV that convert_to_wav produces.
+        """
+        samples = AudioUtils.decode_audio_bytes(data, sample_rate)
+        return AudioUtils.encode_wav_base64(samples, sample_rate)
+    
     @staticmethod
     def get_audio_duration(file_path: str) -> float:
         """Get duration of audio file in seconds"""
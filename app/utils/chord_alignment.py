@@ -0,0 +1,218 @@
+import re
+from math import ceil
+from typing import Optional
+
+# Section types recognized in Genius headers such as "[Chorus: Artist]"
+SECTION_TYPES = [
+    'pre-chorus', 'post-chorus', 'chorus', 'verse', 'bridge', 'intro',
+    'outro', 'hook', 'refrain', 'interlude', 'instrumental', 'solo', 'break'
+]
+
+_HEADER = re.compile(r'^\s*\[([^\]]+)\]\s*$')
+_WORD = re.compile(r"\S+")
+_VOWEL_GROUPS = re.compile(r"[aeiouy]+", re.IGNORECASE)
+
+
+def _section_type(name: str) -> Optional[str]:
+    """Normalized section type of a header or progression name"""
+    name = name.lower().replace(' ', '-')
+    for section_type in SECTION_TYPES:
+        if section_type in name:
+            return section_type
+    return None
+
+
+def _section_number(name: str) -> Optional[int]:
+    match = re.search(r'\d+', name)
+    return int(match.group()) if match else None
+
+
+def _syllables(word: str) -> int:
+    """Rough syllable count from vowel groups, ignoring a silent trailing e"""
+    letters = re.sub(r"[^a-z]", "", word.lower())
+    if not letters:
+        return 1
+    count = len(_VOWEL_GROUPS.findall(letters))
+    if letters.endswith('e') and not letters.endswith(('le', 'ee')) and count > 1:
+        count -= 1
+    return max(count, 1)
+
+
+class ChordAligner:
+    """
+    Local chord-to-lyrics alignment
+
+    Lyric sections (from Genius headers, or stanzas when there are none) are
+    matched to chord progressions by section name, type and order. Each
+    section's chords are spread over its lines and placed on word starts
+    weighted by syllable count, in the same "lines" schema as the LLM mapper.
+    """
+
+    def __init__(self, max_chords_per_line: int = 2, instrumental_bar_width: int = 8):
+        self.max_chords_per_line = max_chords_per_line
+        self.instrumental_bar_width = instrumental_bar_width
+
+    def align(self, lyrics: str, progressions: list[dict]) -> dict:
+        """Map chord progressions onto lyrics lines"""
+        progressions = [p for p in progressions or [] if p.get('chords')]
+        sections = self.split_sections(lyrics)
+
+        if not any(lines for _, lines in sections):
+            return {"lines": self.instrumental_lines(progressions), "engine": "local"}
+
+        lines = []
+        for index, (header, section_lines) in enumerate(sections):
+            if header is not None:
+                lines.append({"lyrics_line": header, "chords": []})
+
+            progression = self.match_progression(header, index, progressions)
+            chords = progression['chords'] if progression else []
+            lines.extend(self.place_section(section_lines, chords))
+
+        return {"lines": lines, "engine": "local"}
+
+    def split_sections(self, lyrics: str) -> list[tuple[Optional[str], list[str]]]:
+        """Split lyrics into (header, lines) pairs"""
+        raw_lines = [line.rstrip() for line in (lyrics or '').split('\n')]
+        has_headers = any(_HEADER.match(line) for line in raw_lines)
+
+        sections: list[tuple[Optional[str], list[str]]] = []
+        header: Optional[str] = None
+        current: list[str] = []
+
+        for line in raw_lines:
+            if has_headers and _HEADER.match(line):
+                if header is not None or current:
+                    sections.append((header, current))
+                header, current = line.strip(), []
+            elif not line.strip():
+                # Without headers, stanzas separated by blank lines are sections
+                if not has_headers and current:
+                    sections.append((None, current))
+                    current = []
+            else:
+                current.append(line.strip())
+
+        if header is not None or current:
+            sections.append((header, current))
+
+        return sections
+
+    def match_progression(
+        self,
+        header: Optional[str],
+        index: int,
+        progressions: list[dict]
+    ) -> Optional[dict]:
+        """
+        Pick the progression for a lyric section
+
+        Exact names win, then the same section type (preferring the same
+        number, e.g. Verse 2), then the progression at the same position.
+        """
+        if not progressions:
+            return None
+
+        if header:
+            name = _HEADER.match(header).group(1).split(':')[0].strip().lower()
+            section_type = _section_type(name)
+
+            for progression in progressions:
+                if (progression.get('section') or '').strip().lower() == name:
+                    return progression
+
+            if section_type:
+                same_type = [
+                    p for p in progressions
+                    if _section_type(p.get('section') or '') == section_type
+                ]
+                number = _section_number(name)
+                for progression in same_type:
+                    if number is not None and _section_number(progression.get('section') or '') == number:
+                        return progression
+                if same_type:
+                    return same_type[0]
+
+        return progressions[index % len(progressions)]
+
+    def place_section(self, lines: list[str], chords: list[str]) -> list[dict]:
+        """Spread a section's chords over its lines"""
+        if not lines:
+            return []
+        if not chords:
+            return [{"lyrics_line": line, "chords": []} for line in lines]
+
+        # Long progressions are split across the lines; short ones repeat
+        if len(chords) > len(lines):
+            per_line = ceil(len(chords) / len(lines))
+        else:
+            per_line = min(len(chords), self.max_chords_per_line)
+
+        result = []
+        cursor = 0
+        for line in lines:
+            if len(chords) > len(lines):
+                line_chords = chords[cursor:cursor + per_line]
+                cursor += per_line
+            else:
+                line_chords = [chords[(cursor + i) % len(chords)] for i in range(per_line)]
+                cursor += per_line
+
+            result.append({
+                "lyrics_line": line,
+                "chords": self.place_line(line, line_chords)
+            })
+
+        return result
+
+    def place_line(self, line: str, chords: list[str]) -> list[list]:
+        """
+        Place chords on word starts spread evenly by syllables
+
+        Chords never overlap: each one starts after the previous chord name.
+        """
+        if not chords:
+            return []
+
+        # (syllables sung before the word, character position of the word)
+        words = []
+        elapsed = 0
+        for match in _WORD.finditer(line):
+            words.append((elapsed, match.start()))
+            elapsed += _syllables(match.group())
+
+        if not words:
+            return [[0, chords[0]]]
+
+        placed = []
+        earliest = 0
+        for i, chord in enumerate(chords):
+            target = elapsed * i / len(chords)
+            candidates = [(offset, start) for offset, start in words if start >= earliest]
+
+            if candidates:
+                # Word start nearest to the target syllable
+                _, position = min(candidates, key=lambda word: abs(word[0] - target))
+            elif earliest < len(line):
+                position = earliest
+            else:
+                break
+
+            placed.append([position, chord])
+            earliest = position + len(chord) + 1
+
+        return placed
+
+    def instrumental_lines(self, progressions: list[dict]) -> list[dict]:
+        """Bar-line chord charts for songs without lyrics"""
+        lines = []
+        width = self.instrumental_bar_width
+        for progression in progressions:
+            chords = progression['chords']
+            lines.append({"lyrics_line": f"[{progression.get('section') or 'Instrumental'}]", "chords": []})
+            bar_line = ("|" + " " * (width - 1)) * len(chords) + "|"
+            lines.append({
+                "lyrics_line": bar_line,
+                "chords": [[i * width + 2, chord] for i, chord in enumerate(chords)]
+            })
+        return lines
@@ -0,0 +1,184 @@
+from typing import Optional
+import numpy as np
+import librosa
+from scipy.ndimage import median_filter
+from app.utils.music_estimation import MusicEstimator, NOTE_NAMES
+
+# Chord qualities as (suffix, intervals above the root)
+CHORD_QUALITIES = [
+    ('', (0, 4, 7)),
+    ('m', (0, 3, 7)),
+    ('7', (0, 4, 7, 10)),
+]
+
+NO_CHORD = 'N'
+
+
+def _build_templates() -> tuple[list[str], np.ndarray]:
+    """Build unit-norm chroma templates for every root and quality"""
+    names = []
+    templates = []
+
+    for suffix, intervals in CHORD_QUALITIES:
+        base = np.zeros(12)
+        base[list(intervals)] = 1.0
+        base /= np.linalg.norm(base)
+        for root in range(12):
+            names.append(f"{NOTE_NAMES[root]}{suffix}")
+            templates.append(np.roll(base, root))
+
+    return names, np.array(templates)
+
+
+CHORD_NAMES, CHORD_TEMPLATES = _build_templates()
+
+
+class ChordRecognizer:
+    """
+    Local chord recognition from chroma features
+
+    Frames are matched against chord templates in a single matrix product,
+    then smoothed with a median filter on the chroma and Viterbi decoding
+    with a strong self-transition so chords do not flicker between frames.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = 22050,
+        hop_length: int = 4096,
+        self_transition: float = 0.9,
+        min_chord_duration: float = 0.5,
+        bars_per_section: int = 8
+    ):
+        self.sample_rate = sample_rate
+        self.hop_length = hop_length
+        self.self_transition = self_transition
+        self.min_chord_duration = min_chord_duration
+        self.bars_per_section = bars_per_section
+
+    def analyze_file(self, audio_path: str, known: Optional[dict] = None) -> dict:
+        """Analyze an audio file and return the chord analysis JSON schema"""
+        y, sr = librosa.load(audio_path, sr=self.sample_rate, mono=True)
+        return self.analyze(y, sr, known)
+
+    def analyze(self, y: np.ndarray, sr: int, known: Optional[dict] = None) -> dict:
+        """
+        Analyze a mono signal and return the chord analysis JSON schema
+
+        Key, tempo and time signature given in ``known`` are used as-is;
+        anything missing is estimated from the signal, which only happens
+        when called standalone (the pipeline passes its own estimates).
+        """
+        known = known or {}
+        chroma = self.compute_chroma(y, sr)
+        timeline = self.decode(chroma, sr)
+
+        confidence = {}
+        if not all(known.get(field) for field in ("key", "tempo", "time_signature")):
+            estimates = MusicEstimator(sample_rate=sr).estimate(y, sr)
+            confidence = estimates["confidence"]
+            known = {**estimates, **{k: v for k, v in known.items() if v}}
+
+        tempo = float(known["tempo"])
+        time_signature = int(known["time_signature"])
+
+        return {
+            "key": known["key"],
+            "tempo": tempo,
+            "time_signature": time_signature,
+            "chord_progressions": self.group_sections(timeline, tempo, time_signature),
+            "structure": None,
+            "chord_timeline": timeline,
+            "confidence": confidence or None,
+            "engine": "local"
+        }
+
+    def compute_chroma(self, y: np.ndarray, sr: int) -> np.ndarray:
+        """Harmonic chroma smoothed over time, shape (12, frames)"""
+        chroma = librosa.feature.chroma_cqt(y=y, sr=sr, hop_length=self.hop_length)
+        return median_filter(chroma, size=(1, 5), mode='nearest')
+
+    def decode(self, chroma: np.ndarray, sr: int) -> list[dict]:
+        """Decode a chroma matrix into a list of timed chords"""
+        if chroma.shape[1] == 0:
+            return []
+
+        # Cosine similarity of every frame against every template at once
+        energy = np.linalg.norm(chroma, axis=0)
+        normalized = chroma / np.maximum(energy, 1e-9)
+        scores = CHORD_TEMPLATES @ normalized
+
+        # Quiet frames map to "no chord"
+        no_chord = np.where(energy < 0.1 * energy.max(), 1.0, 0.0)
+        scores = np.vstack([scores, no_chord])
+
+        # Sharpen into per-frame probabilities and decode the smoothest path
+        probs = np.exp(scores * 10)
+        probs /= probs.sum(axis=0, keepdims=True)
+        transition = librosa.sequence.transition_loop(len(probs), self.self_transition)
+        path = librosa.sequence.viterbi_discriminative(probs, transition)
+
+        names = CHORD_NAMES + [NO_CHORD]
+        frame_times = librosa.frames_to_time(
+            np.arange(len(path) + 1), sr=sr, hop_length=self.hop_length
+        )
+
+        # Collapse runs of identical states into chord segments
+        change_points = np.flatnonzero(np.diff(path)) + 1
+        starts = np.concatenate([[0], change_points])
+        ends = np.concatenate([change_points, [len(path)]])
+
+        timeline = []
+        for start, end in zip(starts, ends):
+            chord = names[path[start]]
+            start_time = float(frame_times[start])
+            end_time = float(frame_times[end])
+
+            if chord == NO_CHORD:
+                continue
+
+            # Absorb blips into the previous chord
+            if end_time - start_time < self.min_chord_duration and timeline:
+                timeline[-1]["end"] = round(end_time, 2)
+                continue
+
+            if timeline and timeline[-1]["chord"] == chord:
+                timeline[-1]["end"] = round(end_time, 2)
+                continue
+
+            timeline.append({
+                "chord": chord,
+                "start": round(start_time, 2),
+                "end": round(end_time, 2)
+            })
+
+        return timeline
+
+    def group_sections(
+        self,
+        timeline: list[dict],
+        tempo: float,
+        time_signature: int
+    ) -> list[dict]:
+        """Split the timeline into fixed-length sections of whole bars"""
+        if not timeline:
+            return []
+
+        bar_seconds = 60.0 / tempo * time_signature if tempo > 0 else 2.0
+        section_seconds = bar_seconds * self.bars_per_section
+
+        sections: list[dict] = []
+        for event in timeline:
+            index = int(event["start"] // section_seconds)
+            while len(sections) <= index:
+                sections.append({
+                    "section": f"Section {len(sections) + 1}",
+                    "chords": [],
+                    "timing": f"{self.bars_per_section} bars"
+                })
+
+            chords = sections[index]["chords"]
+            if not chords or chords[-1] != event["chord"]:
+                chords.append(event["chord"])
+
+        return [section for section in sections if section["chords"]]
@@ -0,0 +1,142 @@
+import re
+from functools import lru_cache
+from typing import Optional
+from app.schemas import ChordSheet
+
+SHARP_NAMES = ('C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B')
+FLAT_NAMES = ('C', 'Db', 'D', 'Eb', 'E', 'F', 'Gb', 'G', 'Ab', 'A', 'Bb', 'B')
+
+NOTE_INDEX = {
+    **{name: i for i, name in enumerate(SHARP_NAMES)},
+    **{name: i for i, name in enumerate(FLAT_NAMES)},
+    'Cb': 11, 'B#': 0, 'Fb': 4, 'E#': 5
+}
+
+# Conventional tonic spelling per pitch class, e.g. Eb major but G# minor
+MAJOR_TONICS = ('C', 'Db', 'D', 'Eb', 'E', 'F', 'F#', 'G', 'Ab', 'A', 'Bb', 'B')
+MINOR_TONICS = ('C', 'C#', 'D', 'Eb', 'E', 'F', 'F#', 'G', 'G#', 'A', 'Bb', 'B')
+
+# Keys whose signatures use flats
+FLAT_MAJOR_KEYS = {'F', 'Bb', 'Eb', 'Ab', 'Db', 'Gb', 'Cb'}
+FLAT_MINOR_KEYS = {'D', 'G', 'C', 'F', 'Bb', 'Eb', 'Ab'}
+
+_CHORD = re.compile(
+    r'^(?P<root>[A-G][#b]?)'
+    r'(?P<quality>maj(?=\d)|m(?!aj)|min|dim|aug|sus[24]?|\+|°)?'
+    r'(?P<extensions>[^/]*)'
+    r'(?:/(?P<bass>[A-G][#b]?))?$'
+)
+_KEY = re.compile(r'^\s*([A-G][#b]?)\s*(m|min|minor|major|maj)?\s*$', re.IGNORECASE)
+
+
+class Chord:
+    """
+    Parsed chord symbol
+
+    Instances are interned by parse_chord and immutable. The 12 transposed
+    spellings in sharps and in flats are computed once at parse time, so
+    transposing is a table lookup.
+    """
+
+    __slots__ = ('symbol', 'root', 'quality', 'extensions', 'bass', '_sharp', '_flat')
+
+    def __init__(self, symbol: str, root: int, quality: str, extensions: str, bass: Optional[int]):
+        self.symbol = symbol
+        self.root = root
+        self.quality = quality
+        self.extensions = extensions
+        self.bass = bass
+        self._sharp = tuple(self._spell(i, SHARP_NAMES) for i in range(12))
+        self._flat = tuple(self._spell(i, FLAT_NAMES) for i in range(12))
+
+    def _spell(self, semitones: int, names: tuple) -> str:
+        name = names[(self.root + semitones) % 12] + self.quality + self.extensions
+        if self.bass is not None:
+            name += '/' + names[(self.bass + semitones) % 12]
+        return name
+
+    def transpose(self, semitones: int, use_flats: bool = False) -> str:
+        """Chord name shifted by semitones, spelled with sharps or flats"""
+        if semitones % 12 == 0:
+            return self.symbol
+        table = self._flat if use_flats else self._sharp
+        return table[semitones % 12]
+
+    def __repr__(self) -> str:
+        return f"Chord({self.symbol!r})"
+
+
+@lru_cache(maxsize=4096)
+def parse_chord(symbol: str) -> Optional[Chord]:
+    """Parse and intern a chord symbol; None for text that is not a chord (e.g. N.C.)"""
+    match = _CHORD.match(symbol.strip())
+    if not match:
+        return None
+
+    bass = match.group('bass')
+    return Chord(
+        symbol=symbol,
+        root=NOTE_INDEX[match.group('root')],
+        quality=match.group('quality') or '',
+        extensions=match.group('extensions'),
+        bass=NOTE_INDEX[bass] if bass else None
+    )
+
+
+def transpose_chord(symbol: str, semitones: int, use_flats: bool = False) -> str:
+    """Transpose one chord symbol; unparseable text is returned unchanged"""
+    chord = parse_chord(symbol)
+    return chord.transpose(semitones, use_flats) if chord else symbol
+
+
+def parse_key(key: Optional[str]) -> Optional[tuple[int, bool]]:
+    """(tonic pitch class, is_minor) of names like "F# Minor", "Bb" or "Am" """
+    if not key:
+        return None
+    match = _KEY.match(key)
+    if not match or match.group(1) not in NOTE_INDEX:
+        return None
+    mode = (match.group(2) or '').lower()
+    return NOTE_INDEX[match.group(1)], mode in ('m', 'min', 'minor')
+
+
+def transpose_key(key: Optional[str], semitones: int) -> tuple[Optional[str], bool]:
+    """
+    Transposed key name and whether its signature uses flats
+
+    Unknown keys are returned unchanged and spelled with sharps.
+    """
+    parsed = parse_key(key)
+    if parsed is None:
+        return key, False
+
+    tonic, minor = parsed
+    pitch = (tonic + semitones) % 12
+    if minor:
+        name = MINOR_TONICS[pitch]
+        return f"{name} Minor", name in FLAT_MINOR_KEYS
+    name = MAJOR_TONICS[pitch]
+    return f"{name} Major", name in FLAT_MAJOR_KEYS
+
+
+def transpose_sheet(chord_sheet: ChordSheet, semitones: int) -> ChordSheet:
+    """
+    Transpose every chord of a sheet in one pass
+
+    Chords are spelled to match the target key (flats in F, Bb, Dm...), and
+    the sheet's key is renamed accordingly.
+    """
+    if semitones % 12 == 0:
+        return chord_sheet
+
+    key, use_flats = transpose_key(chord_sheet.key, semitones)
+    lines = [
+        line.model_copy(update={
+            "chords": [
+                (position, transpose_chord(chord, semitones, use_flats))
+                for position, chord in line.chords
+            ]
+        })
+        for line in chord_sheet.lines
+    ]
+    return chord_sheet.model_copy(update={"key": key, "lines": lines})
@@ -0,0 +1,192 @@
+from typing import Any, Optional
+import numpy as np
+import librosa
+
+
+NOTE_NAMES = ['C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B']
+
+# Krumhansl-Kessler key profiles
+MAJOR_PROFILE = np.array([6.35, 2.23, 3.48, 2.33, 4.38, 4.09, 2.52, 5.19, 2.39, 3.66, 2.29, 2.88])
+MINOR_PROFILE = np.array([6.33, 2.68, 3.52, 5.38, 2.60, 3.53, 2.54, 4.75, 3.98, 2.69, 3.34, 3.17])
+
+# How much a Spotify audio feature is trusted on its own
+SPOTIFY_CONFIDENCE = 0.8
+
+
+def _key_profiles() -> tuple[list[str], np.ndarray]:
+    """All 24 rotated, zero-mean, unit-norm key profiles"""
+    names = []
+    profiles = []
+    for mode, profile in (("Major", MAJOR_PROFILE), ("Minor", MINOR_PROFILE)):
+        for tonic in range(12):
+            rotated = np.roll(profile, tonic)
+            rotated = rotated - rotated.mean()
+            profiles.append(rotated / np.linalg.norm(rotated))
+            names.append(f"{NOTE_NAMES[tonic]} {mode}")
+    return names, np.array(profiles)
+
+
+KEY_NAMES, KEY_PROFILES = _key_profiles()
+
+
+class MusicEstimator:
+    """Estimate key, tempo and meter from audio, with a confidence per value"""
+
+    def __init__(self, sample_rate: int = 22050, hop_length: int = 512):
+        self.sample_rate = sample_rate
+        self.hop_length = hop_length
+
+    def estimate_file(self, audio_path: str) -> dict:
+        """Estimate musical features of an audio file"""
+        y, sr = librosa.load(audio_path, sr=self.sample_rate, mono=True)
+        return self.estimate(y, sr)
+
+    def estimate(self, y: np.ndarray, sr: int) -> dict:
+        """
+        Estimate musical features of a mono signal
+
+        Returns key, tempo and time_signature plus a "confidence" mapping
+        with a 0-1 score for each value.
+        """
+        onset_env = librosa.onset.onset_strength(y=y, sr=sr, hop_length=self.hop_length)
+        tempo, tempo_confidence, beats = self.estimate_tempo(onset_env, sr)
+        key, key_confidence = self.estimate_key(y, sr)
+        meter, meter_confidence = self.estimate_meter(onset_env, beats)
+
+        return {
+            "key": key,
+            "tempo": tempo,
+            "time_signature": meter,
+            "confidence": {
+                "key": key_confidence,
+                "tempo": tempo_confidence,
+                "time_signature": meter_confidence
+            }
+        }
+
+    def estimate_tempo(self, onset_env: np.ndarray, sr: int) -> tuple[float, float, np.ndarray]:
+        """BPM from beat tracking; confidence from beat interval regularity"""
+        tempo, beats = librosa.beat.beat_track(
+            onset_envelope=onset_env, sr=sr, hop_length=self.hop_length
+        )
+        tempo = float(np.atleast_1d(tempo)[0])
+
+        if len(beats) < 4 or tempo <= 0:
+            return round(tempo, 1), 0.0, beats
+
+        intervals = np.diff(beats)
+        variation = np.std(intervals) / np.mean(intervals)
+        confidence = float(np.clip(1.0 - 2.0 * variation, 0.0, 1.0))
+
+        return round(tempo, 1), round(confidence, 2), beats
+
+    def estimate_key(self, y: np.ndarray, sr: int) -> tuple[str, float]:
+        """Key and mode by correlating mean chroma with the 24 key profiles"""
+        chroma = librosa.feature.chroma_cqt(y=y, sr=sr, hop_length=4096)
+        profile = chroma.mean(axis=1)
+        profile = profile - profile.mean()
+        norm = np.linalg.norm(profile)
+
+        if norm == 0:
+            return "Unknown", 0.0
+
+        correlations = KEY_PROFILES @ (profile / norm)
+        ranked = np.argsort(correlations)[::-1]
+        best, runner_up = correlations[ranked[0]], correlations[ranked[1]]
+
+        # A clear winner over the runner-up (often the relative key) is confident
+        confidence = float(np.clip(best, 0.0, 1.0) * np.clip((best - runner_up) * 10, 0.0, 1.0))
+
+        return KEY_NAMES[ranked[0]], round(confidence, 2)
+
+    def estimate_meter(self, onset_env: np.ndarray, beats: np.ndarray) -> tuple[int, float]:
+        """Guess 3/4 vs 4/4 from how strongly accents repeat every 3 or 4 beats"""
+        if len(beats) < 12:
+            return 4, 0.0
+
+        accents = onset_env[beats]
+        accents = accents - accents.mean()
+        denominator = np.dot(accents, accents)
+
+        if denominator == 0:
+            return 4, 0.0
+
+        def periodicity(lag: int) -> float:
+            return float(np.dot(accents[:-lag], accents[lag:]) / denominator)
+
+        triple, quadruple = periodicity(3), periodicity(4)
+        meter = 3 if triple > quadruple else 4
+        confidence = float(np.clip(abs(triple - quadruple) * 2, 0.0, 1.0))
+
+        return meter, round(confidence, 2)
+
+    @staticmethod
+    def reconcile(reported: dict, estimates: dict) -> dict:
+        """
+        Combine values reported by Spotify with local estimates
+
+        Missing Spotify values fall back to the estimate. When both exist they
+        are cross-checked: agreement raises confidence, disagreement keeps the
+        more trusted value at a reduced confidence.
+        """
+        result: dict[str, Any] = {"confidence": {}}
+
+        for field in ("key", "tempo", "time_signature"):
+            spotify_value = reported.get(field)
+            local_value = estimates.get(field)
+            local_confidence = estimates.get("confidence", {}).get(field, 0.0)
+
+            if local_value in (None, "Unknown", 0):
+                local_value, local_confidence = None, 0.0
+
+            if spotify_value is None:
+                value, confidence = local_value, local_confidence
+            elif local_value is None:
+                value, confidence = spotify_value, SPOTIFY_CONFIDENCE
+            elif MusicEstimator._agree(field, spotify_value, local_value):
+                value = spotify_value
+                confidence = 1.0 - (1.0 - SPOTIFY_CONFIDENCE) * (1.0 - local_confidence)
+            elif local_confidence > SPOTIFY_CONFIDENCE:
+                value = local_value
+                confidence = local_confidence * (1.0 - SPOTIFY_CONFIDENCE / 2)
+            else:
+                value = spotify_value
+                confidence = SPOTIFY_CONFIDENCE * (1.0 - local_confidence / 2)
+
+            result[field] = value
+            result["confidence"][field] = round(confidence, 2)
+
+        return result
+
+    @staticmethod
+    def settled_values(reconciled: dict, min_confidence: float = 0.5) -> dict:
+        """Reconciled values confident enough to be treated as known downstream"""
+        return {
+            field: reconciled[field]
+            for field in ("key", "tempo", "time_signature")
+            if reconciled.get(field) is not None
+            and reconciled["confidence"].get(field, 0.0) >= min_confidence
+        }
+
+    @staticmethod
+    def _agree(field: str, a: Any, b: Any) -> bool:
+        if field == "tempo":
+            # Beat trackers often lock onto half or double time
+            ratio = float(a) / float(b)
+            return any(abs(ratio - target) / target < 0.04 for target in (0.5, 1.0, 2.0))
+        return a == b
+
+
+def format_known_values(values: Optional[dict]) -> str:
+    """Human-readable summary of known key, tempo and meter for prompts"""
+    if not values:
+        return ""
+
+    parts = []
+    if values.get("key"):
+        parts.append(f"key: {values['key']}")
+    if values.get("tempo"):
+        parts.append(f"tempo: {values['tempo']} BPM")
+    if values.get("time_signature"):
+        parts.append(f"time signature: {values['time_signature']}/4")
+    return ", ".join(parts)
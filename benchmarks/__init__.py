@@ -0,0 +1,4 @@
+import os
+
+# The suite runs offline: litellm would otherwise fetch its price table at import
+os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
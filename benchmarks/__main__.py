@@ -0,0 +1,69 @@
+"""
+Run the benchmark suite and check it against a baseline
+
+Runs the PDF, audio and chord microbenchmarks and the import-time report,
+plus the offline load test with --load. Timings (results ending in _ms or
+_us) more than --tolerance slower than the baseline, or rates (ending in
+_per_second) more than --tolerance lower, fail the run with exit status 1.
+
+    python -m benchmarks --json current.json
+    python -m benchmarks --baseline baseline.json [--tolerance 0.25] [--load]
+"""
+import sys
+import json
+import argparse
+from pathlib import Path
+from benchmarks import bench_audio, bench_chords, bench_pdf, import_time, load_test
+
+
+def regressions(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Timings slower and rates lower than the baseline by more than the tolerance"""
+    slower = []
+    for name, value in results.items():
+        if not baseline.get(name):
+            continue
+        change = value / baseline[name] - 1
+        if name.endswith(("_ms", "_us")) and change > tolerance:
+            slower.append(f"{name}: {baseline[name]:.2f} -> {value:.2f} (+{change:.0%})")
+        elif name.endswith("_per_second") and -change > tolerance:
+            slower.append(f"{name}: {baseline[name]:.2f} -> {value:.2f} ({change:.0%})")
+    return slower
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--quick", action="store_true", help="Fewer iterations, for smoke runs")
+    parser.add_argument("--load", action="store_true", help="Include the load test against the stand-ins")
+    parser.add_argument("--json", help="Write the results to this file")
+    parser.add_argument("--baseline", help="Results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown (default 0.25)")
+    args = parser.parse_args()
+
+    results = {}
+    results.update(bench_pdf.run(iterations=3 if args.quick else 20))
+    results.update(bench_audio.run(iterations=2 if args.quick else 10))
+    results.update(bench_chords.run(iterations=20 if args.quick else 200))
+    results.update(import_time.run(top=5))
+    if args.load:
+        # Latency histograms need enough requests; --quick keeps the run short
+        load_args = load_test.build_parser().parse_args(
+            ["--requests", "16", "--concurrency", "4"] if args.quick else []
+        )
+        results.update(load_test.run(load_args))
+
+    for name, value in results.items():
+        print(f"{name:<28} {value:>10.2f}")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+
+    if args.baseline:
+        slower = regressions(results, json.loads(Path(args.baseline).read_text()), args.tolerance)
+        for line in slower:
+            print(f"REGRESSION {line}")
+        if slower:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
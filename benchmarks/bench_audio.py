@@ -0,0 +1,46 @@
+"""
+AudioUtils microbenchmark
+
+Decodes, downmixes and resamples a synthetic 30-second MP3 preview and
+encodes it as the base64 WAV sent to the audio LLM, as the audio analysis
+stage does for every preview.
+
+    python -m benchmarks.bench_audio [--iterations 10] [--sample-rate 16000]
+"""
+import time
+import argparse
+from app.utils import AudioUtils
+from benchmarks.standins import synth_preview
+
+
+def bench(fn, iterations: int) -> float:
+    """Milliseconds per call, after one warm-up call"""
+    fn()
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - started) / iterations * 1000
+
+
+def run(iterations: int = 10, sample_rate: int = 16000) -> dict:
+    preview = synth_preview()
+    samples = AudioUtils.decode_audio_bytes(preview, sample_rate)
+    return {
+        "audio_decode_ms": bench(lambda: AudioUtils.decode_audio_bytes(preview, sample_rate), iterations),
+        "audio_encode_wav_ms": bench(lambda: AudioUtils.encode_wav_base64(samples, sample_rate), iterations),
+        "audio_to_wav_base64_ms": bench(lambda: AudioUtils.audio_bytes_to_wav_base64(preview, sample_rate), iterations)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--sample-rate", type=int, default=16000)
+    args = parser.parse_args()
+
+    for name, ms in run(args.iterations, args.sample_rate).items():
+        print(f"{name:<24} {ms:>9.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
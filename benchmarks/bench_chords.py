@@ -0,0 +1,61 @@
+"""
+Chord transposition microbenchmark
+
+Parses chord symbols cold, transposes already-parsed chords, and
+transposes a multi-page chord sheet as each download in a new key does.
+
+    python -m benchmarks.bench_chords [--iterations 200] [--sections 24]
+"""
+import time
+import argparse
+from app.utils.chords import parse_chord, transpose_chord, transpose_sheet
+from benchmarks.bench_pdf import build_sheet
+
+SYMBOLS = [
+    "C", "Cm", "C7", "Cmaj7", "Cm7b5", "Cdim", "Caug", "Csus4", "Cadd9", "C/E",
+    "F#m7", "Bb", "Ebmaj9", "G#dim7", "Dsus2", "A7sus4", "Em7", "D/F#", "Ab6", "B13"
+]
+
+
+def run(iterations: int = 200, sections: int = 24) -> dict:
+    # Cold: the parse cache is cleared so every symbol goes through the regex
+    started = time.perf_counter()
+    for _ in range(iterations):
+        parse_chord.cache_clear()
+        for symbol in SYMBOLS:
+            parse_chord(symbol)
+    parse_us = (time.perf_counter() - started) / (iterations * len(SYMBOLS)) * 1e6
+
+    started = time.perf_counter()
+    for i in range(iterations):
+        for symbol in SYMBOLS:
+            transpose_chord(symbol, i % 11 + 1, use_flats=i % 2 == 0)
+    transpose_us = (time.perf_counter() - started) / (iterations * len(SYMBOLS)) * 1e6
+
+    sheet = build_sheet(sections)
+    transpose_sheet(sheet, 2)
+    started = time.perf_counter()
+    for i in range(iterations):
+        transpose_sheet(sheet, i % 11 + 1)
+    sheet_ms = (time.perf_counter() - started) / iterations * 1000
+
+    return {
+        "chord_parse_us": parse_us,
+        "chord_transpose_us": transpose_us,
+        "sheet_transpose_ms": sheet_ms
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--sections", type=int, default=24)
+    args = parser.parse_args()
+
+    for name, value in run(args.iterations, args.sections).items():
+        unit = "us" if name.endswith("_us") else "ms"
+        print(f"{name:<20} {value:>9.2f} {unit}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+PDF rendering microbenchmark
+
+Renders a synthetic multi-page chord sheet with each renderer and reports
+pages per second.
+
+    python -m benchmarks.bench_pdf [--iterations 20] [--sections 24]
+"""
+import os
+import time
+import argparse
+import tempfile
+from app.schemas import ChordSheet, ChordLine, SongInfo
+from app.services.pdf_generator import PDFGenerator
+
+LINES = [
+    "Today is gonna be the day that they're gonna throw it back to you",
+    "By now you should've somehow realized what you gotta do",
+    "I don't believe that anybody feels the way I do about you now",
+    "And all the roads we have to walk are winding",
+]
+CHORDS = ["Em7", "G", "Dsus4", "A7sus4", "Cadd9", "D/F#"]
+
+
+def build_sheet(sections: int) -> ChordSheet:
+    """A chord sheet long enough to span several pages"""
+    lines = []
+    for section in range(sections):
+        lines.append(ChordLine(lyrics_line=f"[Verse {section + 1}]", chords=[]))
+        for i, text in enumerate(LINES):
+            lines.append(ChordLine(
+                lyrics_line=text,
+                chords=[(0, CHORDS[i % len(CHORDS)]), (len(text) // 2, CHORDS[(i + 1) % len(CHORDS)])]
+            ))
+        lines.append(ChordLine(lyrics_line="", chords=[]))
+
+    return ChordSheet(
+        song_info=SongInfo(
+            title="Benchmark Song",
+            artist="Benchmark Artist",
+            duration_ms=240000,
+            spotify_id="benchmark"
+        ),
+        key="E Minor",
+        tempo=87.0,
+        lines=lines
+    )
+
+
+def bench(renderer: str, sheet: ChordSheet, iterations: int, transpose: int) -> dict:
+    """Render the sheet repeatedly and return timing statistics"""
+    generator = PDFGenerator()
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.pdf")
+
+        # Warm-up render loads fonts and builds cached styles
+        generator.generate_chord_sheet(sheet, path, transpose=transpose, renderer=renderer)
+
+        started = time.perf_counter()
+        for _ in range(iterations):
+            generator.generate_chord_sheet(sheet, path, transpose=transpose, renderer=renderer)
+        elapsed = time.perf_counter() - started
+        size = os.path.getsize(path)
+
+    pages = generator.page_count * iterations
+    return {
+        "renderer": renderer,
+        "pages_per_render": generator.page_count,
+        "ms_per_render": elapsed / iterations * 1000,
+        "pages_per_second": pages / elapsed,
+        "bytes": size
+    }
+
+
+def run(iterations: int = 20, sections: int = 24, transpose: int = 2) -> dict:
+    """Pages per second and milliseconds per render for each renderer"""
+    sheet = build_sheet(sections)
+    results = {}
+    for renderer in ("platypus", "canvas"):
+        result = bench(renderer, sheet, iterations, transpose)
+        results[f"pdf_{renderer}_pages_per_second"] = result["pages_per_second"]
+        results[f"pdf_{renderer}_ms"] = result["ms_per_render"]
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--sections", type=int, default=24)
+    parser.add_argument("--transpose", type=int, default=2)
+    args = parser.parse_args()
+
+    sheet = build_sheet(args.sections)
+    print(f"{'renderer':<10} {'pages':>6} {'ms/render':>10} {'pages/s':>9} {'bytes':>8}")
+    for renderer in ("platypus", "canvas"):
+        result = bench(renderer, sheet, args.iterations, args.transpose)
+        print(
+            f"{result['renderer']:<10} {result['pages_per_render']:>6} "
+            f"{result['ms_per_render']:>10.1f} {result['pages_per_second']:>9.1f} {result['bytes']:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
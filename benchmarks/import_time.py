@@ -0,0 +1,133 @@
+"""
+Import-time report and fast-start check for the API process
+
+Imports app.main in a fresh interpreter under ``python -X importtime`` and
+reports the packages that cost the most, then starts the app under uvicorn
+and times how long /health takes to answer. With --check, exits 1 if the
+import is over budget or a deferred dependency is imported at startup.
+
+    python -m benchmarks.import_time [--top 15] [--check] [--max-import-ms 1500]
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import subprocess
+from collections import defaultdict
+from pathlib import Path
+import httpx
+from benchmarks.load_test import start_app
+from benchmarks.standins import free_port
+
+# Dependencies that must load on first use, not when the app starts
+DEFERRED = ("crewai", "litellm", "spotipy", "lyricsgenius", "reportlab", "librosa", "pydub", "scipy")
+
+
+def import_profile(module: str = "app.main") -> tuple[list[tuple[str, int, int]], float]:
+    """
+    Per-module import costs of a module in a fresh interpreter
+
+    Returns (name, self_us, cumulative_us) for every module imported, and the
+    module's own cumulative import time in milliseconds.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    rows = []
+    total = 0.0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = (field.strip() for field in line[len("import time:"):].split("|"))
+        rows.append((name, int(self_us), int(cumulative_us)))
+        if name == module:
+            total = int(cumulative_us) / 1000
+    return rows, total
+
+
+def by_package(rows: list[tuple[str, int, int]]) -> dict[str, float]:
+    """Self time in milliseconds summed by top-level package"""
+    packages = defaultdict(float)
+    for name, self_us, _ in rows:
+        packages[name.split(".")[0]] += self_us / 1000
+    return dict(sorted(packages.items(), key=lambda item: item[1], reverse=True))
+
+
+def time_to_health(timeout: float = 60.0) -> float:
+    """Milliseconds from starting uvicorn until /api/v1/health answers"""
+    temp_dir = tempfile.TemporaryDirectory(prefix="chord-start-")
+    port = free_port()
+    env = {**os.environ, "TEMP_DIR": temp_dir.name}
+    started = time.perf_counter()
+    process = start_app(env, port, Path(temp_dir.name) / "app.log")
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=1.0) as client:
+            while time.perf_counter() - started < timeout:
+                if process.poll() is not None:
+                    raise RuntimeError("App exited during startup")
+                try:
+                    if client.get("/api/v1/health").status_code == 200:
+                        return (time.perf_counter() - started) * 1000
+                except httpx.TransportError:
+                    pass
+                time.sleep(0.01)
+        raise RuntimeError("App did not become healthy")
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+        temp_dir.cleanup()
+
+
+def deferred_imports(rows: list[tuple[str, int, int]]) -> list[str]:
+    """Deferred dependencies that were imported anyway"""
+    imported = {name.split(".")[0] for name, _, _ in rows}
+    return [name for name in DEFERRED if name in imported]
+
+
+def run(top: int = 15, startup: bool = True) -> dict:
+    rows, total = import_profile()
+    packages = by_package(rows)
+    print(f"{'package':<24} {'self ms':>8}")
+    for name, ms in list(packages.items())[:top]:
+        print(f"{name:<24} {ms:>8.1f}")
+
+    deferred = deferred_imports(rows)
+    if deferred:
+        print(f"imported at startup but meant to load on first use: {', '.join(deferred)}")
+
+    results = {"import_app_ms": total, "deferred_imported": len(deferred)}
+    if startup:
+        results["startup_health_ms"] = time_to_health()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--top", type=int, default=15, help="Packages to list (default 15)")
+    parser.add_argument("--no-startup", action="store_true", help="Skip starting the app")
+    parser.add_argument("--check", action="store_true", help="Exit 1 if over budget or a deferred dependency loads")
+    parser.add_argument("--max-import-ms", type=float, default=1500, help="Import budget for app.main (default 1500)")
+    args = parser.parse_args()
+
+    results = run(args.top, startup=not args.no_startup)
+    for name, value in results.items():
+        print(f"{name:<28} {value:>10.2f}")
+
+    if args.check:
+        problems = []
+        if results["deferred_imported"]:
+            problems.append(f"{results['deferred_imported']} deferred dependencies imported at startup")
+        if results["import_app_ms"] > args.max_import_ms:
+            problems.append(f"app.main took {results['import_app_ms']:.0f} ms to import (budget {args.max_import_ms:.0f} ms)")
+        for problem in problems:
+            print(f"FAIL {problem}")
+        if problems:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
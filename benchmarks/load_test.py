@@ -0,0 +1,201 @@
+"""
+Offline load test of POST /api/v1/analyze
+
+Starts the upstream stand-ins (benchmarks/standins.py), runs the app under
+uvicorn pointed at them, and drives analyses at a fixed concurrency. Each
+request waits on the job's event stream until it finishes. Reports latency
+percentiles from submit to completion, requests/second and per-stage p50/p95.
+
+    python -m benchmarks.load_test [--requests 40] [--concurrency 8] [--llm-latency 1.0]
+
+Every request uses a new track ID unless --tracks limits the distinct
+tracks, which then exercises the caches and analysis coalescing.
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+import subprocess
+from collections import defaultdict
+from pathlib import Path
+import httpx
+from benchmarks.standins import add_latency_arguments, latency_from_args, start_standins, stop_standins, standin_env, free_port
+
+TERMINAL_EVENTS = {"completed", "failed", "cancelled"}
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Nearest-rank percentile"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(int(round(q / 100 * len(ordered) + 0.5)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+def start_app(env: dict, port: int, log_path: Path) -> subprocess.Popen:
+    """The app under uvicorn in its own process, as it runs in production"""
+    log = open(log_path, "wb")
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        env=env,
+        stdout=log,
+        stderr=subprocess.STDOUT
+    )
+
+
+async def wait_until_healthy(client: httpx.AsyncClient, process: subprocess.Popen, timeout: float = 120.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("App exited during startup")
+        try:
+            if (await client.get("/api/v1/health")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("App did not become healthy")
+
+
+async def analyze(client: httpx.AsyncClient, track_id: str) -> dict:
+    """Submit one analysis and wait for it to finish; returns its outcome and timings"""
+    started = time.perf_counter()
+    response = await client.post("/api/v1/analyze", json={"spotify_url": f"https://open.spotify.com/track/{track_id}"})
+    if response.status_code != 202:
+        return {"status": f"http_{response.status_code}", "latency": time.perf_counter() - started, "stages": []}
+    task_id = response.json()["task_id"]
+
+    status = None
+    async with client.stream("GET", f"/api/v1/analyze/{task_id}/events") as events:
+        async for line in events.aiter_lines():
+            if line.startswith("event: ") and line[7:] in TERMINAL_EVENTS:
+                status = line[7:]
+                break
+    latency = time.perf_counter() - started
+
+    job = (await client.get(f"/api/v1/jobs/{task_id}")).json()
+    stages = (job.get("result") or {}).get("stages", [])
+    return {"status": status, "latency": latency, "stages": stages, "error": job.get("error")}
+
+
+async def drive(base_url: str, process: subprocess.Popen, args: argparse.Namespace) -> tuple[list[dict], float]:
+    async with httpx.AsyncClient(base_url=base_url, timeout=None) as client:
+        await wait_until_healthy(client, process)
+
+        # Imports, model loading and first-call costs are not part of the measurement
+        for i in range(args.warmup):
+            await analyze(client, f"warmup{i}")
+
+        counter = iter(range(args.requests))
+        results = []
+
+        async def worker():
+            for i in counter:
+                track = i % args.tracks if args.tracks else i
+                results.append(await analyze(client, f"bench{track}"))
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+        return results, elapsed
+
+
+def report(results: list[dict], elapsed: float, args: argparse.Namespace) -> dict:
+    """Print the summary and return the headline numbers"""
+    completed = [r for r in results if r["status"] == "completed"]
+    latencies = [r["latency"] * 1000 for r in completed]
+    errors = len(results) - len(completed)
+
+    summary = {
+        "analyze_p50_ms": percentile(latencies, 50),
+        "analyze_p95_ms": percentile(latencies, 95),
+        "analyze_p99_ms": percentile(latencies, 99),
+        "requests_per_second": len(completed) / elapsed if elapsed else 0.0,
+        "errors": errors
+    }
+
+    print(f"requests {len(results)}  concurrency {args.concurrency}  errors {errors}  elapsed {elapsed:.1f}s")
+    print(
+        f"latency ms   p50 {summary['analyze_p50_ms']:.0f}  p95 {summary['analyze_p95_ms']:.0f}  "
+        f"p99 {summary['analyze_p99_ms']:.0f}  max {max(latencies, default=0):.0f}"
+    )
+    print(f"throughput   {summary['requests_per_second']:.2f} req/s")
+
+    stages = defaultdict(list)
+    for result in completed:
+        for stage in result["stages"]:
+            stages[stage["name"]].append(stage["duration_ms"])
+    if stages:
+        print(f"{'stage':<16} {'p50 ms':>8} {'p95 ms':>8}")
+        for name, durations in stages.items():
+            print(f"{name:<16} {percentile(durations, 50):>8.0f} {percentile(durations, 95):>8.0f}")
+
+    failures = [r for r in results if r["status"] != "completed"]
+    for failure in failures[:5]:
+        print(f"failed: {failure['status']} {failure.get('error')}")
+
+    return summary
+
+
+def run(args: argparse.Namespace) -> dict:
+    standins = start_standins(latency_from_args(args), args.audio_features)
+    temp_dir = tempfile.TemporaryDirectory(prefix="chord-bench-")
+    port = free_port()
+    env = {
+        **os.environ,
+        **standin_env(standins),
+        # A fresh TEMP_DIR means cold caches and an empty artifact store
+        "TEMP_DIR": temp_dir.name,
+        "PIPELINE_MODE": args.pipeline,
+        "AUDIO_ANALYSIS_ENGINE": args.audio_engine,
+        "CHORD_MAPPING_ENGINE": args.mapping_engine,
+        "JOB_WORKERS": str(args.job_workers),
+        "JOB_QUEUE_SIZE": str(max(args.requests + args.warmup, 100))
+    }
+    log_path = Path(temp_dir.name) / "app.log"
+    process = start_app(env, port, log_path)
+
+    try:
+        results, elapsed = asyncio.run(drive(f"http://127.0.0.1:{port}", process, args))
+        summary = report(results, elapsed, args)
+        requests = ", ".join(f"{name} {standin.requests}" for name, standin in standins.items())
+        print(f"upstream requests: {requests}")
+        return summary
+    except Exception:
+        print(log_path.read_text(errors="replace")[-4000:])
+        raise
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+        stop_standins(standins)
+        temp_dir.cleanup()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--tracks", type=int, default=0, help="Distinct tracks to cycle through (0: all distinct)")
+    parser.add_argument("--job-workers", type=int, default=8)
+    parser.add_argument("--pipeline", default="direct", choices=["direct", "crew"], help="PIPELINE_MODE; crew runs the agents against the stand-in LLM")
+    parser.add_argument("--audio-engine", default="llm", choices=["llm", "local"])
+    parser.add_argument("--mapping-engine", default="llm", choices=["llm", "local"])
+    parser.add_argument("--json", help="Write the summary to this file")
+    add_latency_arguments(parser)
+    return parser
+
+
+def main():
+    args = build_parser().parse_args()
+    summary = run(args)
+    if args.json:
+        Path(args.json).write_text(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,429 @@
+"""
+Local stand-ins for the upstream services
+
+Serves the Spotify Web API (token, tracks, audio features), the preview
+CDN, Genius (search, song and lyrics page) and an OpenAI-compatible chat
+completion endpoint, each on its own port with a configurable response
+delay. Tracks are generated from their ID, so every ID is a distinct song.
+
+    python -m benchmarks.standins [--spotify-latency 0.05] [--llm-latency 1.0]
+
+prints the environment that points the app at them.
+"""
+import io
+import re
+import json
+import time
+import random
+import socket
+import asyncio
+import argparse
+import threading
+import numpy as np
+import soundfile as sf
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import HTMLResponse, JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+# Seconds of delay added to every response, before jitter
+DEFAULT_LATENCY = {
+    "spotify": 0.05,
+    "cdn": 0.05,
+    "genius": 0.2,
+    "llm": 1.0
+}
+
+SECTIONS = {
+    "Verse 1": ["C", "G", "Am", "F"],
+    "Chorus": ["F", "G", "C", "Am"],
+    "Verse 2": ["C", "G", "Am", "F"],
+    "Bridge": ["Dm", "G", "Em", "Am"]
+}
+
+LYRIC_LINES = [
+    "Today is gonna be the day that they're gonna throw it back to you",
+    "By now you should've somehow realized what you gotta do",
+    "I don't believe that anybody feels the way I do about you now",
+    "And all the roads we have to walk are winding"
+]
+
+NOTE_FREQUENCIES = {"C": 261.63, "D": 293.66, "E": 329.63, "F": 349.23, "G": 392.0, "A": 440.0, "B": 493.88}
+
+
+def synth_preview(seconds: float = 30.0, sample_rate: int = 44100) -> bytes:
+    """An MP3 of triads following the stand-in chord progressions, two seconds each"""
+    chords = [chord for progression in SECTIONS.values() for chord in progression]
+    per_chord = int(2 * sample_rate)
+    t = np.arange(per_chord) / sample_rate
+
+    segments = []
+    while sum(len(s) for s in segments) < seconds * sample_rate:
+        chord = chords[len(segments) % len(chords)]
+        root = NOTE_FREQUENCIES[chord[0]]
+        third = 2 ** ((3 if chord.endswith("m") else 4) / 12)
+        tone = sum(np.sin(2 * np.pi * root * ratio * t) for ratio in (1, third, 2 ** (7 / 12)))
+        segments.append((tone / 3 * 0.5).astype(np.float32))
+
+    buffer = io.BytesIO()
+    sf.write(buffer, np.concatenate(segments)[:int(seconds * sample_rate)], sample_rate, format="MP3")
+    return buffer.getvalue()
+
+
+def lyrics_text(song: str = "") -> str:
+    """Stand-in lyrics with section headers matching SECTIONS, distinct per song"""
+    return "\n\n".join(
+        f"[{section}]\n" + "\n".join(LYRIC_LINES) + f"\nThis is {song or 'the stand-in song'}"
+        for section in SECTIONS
+    )
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class StandIn:
+    """One stand-in service on its own port, served from a background thread"""
+
+    def __init__(self, name: str, routes: list, latency: float, jitter: float = 0.2):
+        self.name = name
+        self.latency = latency
+        self.jitter = jitter
+        self.port = free_port()
+        self.requests = 0
+        self.app = Starlette(routes=routes)
+        self._server = uvicorn.Server(uvicorn.Config(
+            self.app,
+            host="127.0.0.1",
+            port=self.port,
+            log_level="warning",
+            access_log=False
+        ))
+        self._thread = threading.Thread(target=self._server.run, name=f"standin-{name}", daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    async def delay(self):
+        """Simulated upstream latency, without blocking other requests"""
+        self.requests += 1
+        if self.latency > 0:
+            await asyncio.sleep(self.latency * random.uniform(1 - self.jitter, 1 + self.jitter))
+
+    def start(self):
+        self._thread.start()
+        deadline = time.monotonic() + 10
+        while not self._server.started:
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"Stand-in {self.name} did not start")
+            time.sleep(0.01)
+
+    def stop(self):
+        self._server.should_exit = True
+        self._thread.join(timeout=5)
+
+
+def spotify_standin(latency: float, cdn_url: str, audio_features: bool = False) -> StandIn:
+    """Client-credentials token, tracks and audio features"""
+
+    def track(track_id: str) -> dict:
+        return {
+            "id": track_id,
+            "name": f"Stand-in Song {track_id}",
+            "artists": [{"name": "Stand-in Artist"}],
+            "album": {"name": "Stand-in Album"},
+            "duration_ms": 30000,
+            "preview_url": f"{cdn_url}/previews/{track_id}.mp3"
+        }
+
+    async def token(request: Request):
+        await service.delay()
+        return JSONResponse({"access_token": "standin", "token_type": "Bearer", "expires_in": 3600})
+
+    async def get_track(request: Request):
+        await service.delay()
+        return JSONResponse(track(request.path_params["track_id"]))
+
+    async def get_tracks(request: Request):
+        await service.delay()
+        ids = request.query_params.get("ids", "").split(",")
+        return JSONResponse({"tracks": [track(track_id) for track_id in ids if track_id]})
+
+    async def get_audio_features(request: Request):
+        await service.delay()
+        if not audio_features:
+            # What Spotify answers apps created after the endpoint was deprecated
+            return JSONResponse({"error": {"status": 403, "message": "Forbidden"}}, status_code=403)
+        ids = request.query_params.get("ids", "").split(",")
+        return JSONResponse({"audio_features": [
+            {"id": track_id, "key": 0, "mode": 1, "tempo": 120.0, "time_signature": 4}
+            for track_id in ids if track_id
+        ]})
+
+    service = StandIn("spotify", [
+        Route("/api/token", token, methods=["POST"]),
+        Route("/v1/tracks/", get_tracks),
+        Route("/v1/tracks/{track_id}", get_track),
+        Route("/v1/audio-features/", get_audio_features)
+    ], latency)
+    return service
+
+
+def cdn_standin(latency: float, chunk_size: int = 16 * 1024) -> StandIn:
+    """30-second MP3 previews, streamed in chunks"""
+    preview = synth_preview()
+
+    async def get_preview(request: Request):
+        await service.delay()
+
+        async def body():
+            for start in range(0, len(preview), chunk_size):
+                yield preview[start:start + chunk_size]
+
+        return StreamingResponse(body(), media_type="audio/mpeg", headers={"Content-Length": str(len(preview))})
+
+    service = StandIn("cdn", [Route("/previews/{name}", get_preview)], latency)
+    return service
+
+
+def genius_standin(latency: float) -> StandIn:
+    """Search, song details and the lyrics page lyricsgenius scrapes"""
+
+    def song(song_id: int) -> dict:
+        return {
+            "id": song_id,
+            "title": f"Stand-in Song {song_id}",
+            "primary_artist": {"name": "Stand-in Artist"},
+            "lyrics_state": "complete",
+            "path": f"/stand-in-song-{song_id}-lyrics",
+            # lyricsgenius strips this prefix and requests the path from its web root
+            "url": f"https://genius.com/stand-in-song-{song_id}-lyrics"
+        }
+
+    async def search(request: Request):
+        await service.delay()
+        song_id = abs(hash(request.query_params.get("q", ""))) % 10 ** 8
+        return JSONResponse({"response": {"sections": [
+            {"type": "song", "hits": [{"index": "song", "type": "song", "result": song(song_id)}]}
+        ]}})
+
+    async def get_song(request: Request):
+        await service.delay()
+        return JSONResponse({"response": {"song": song(int(request.path_params["song_id"]))}})
+
+    async def lyrics_page(request: Request):
+        await service.delay()
+        html = "<br/>".join(lyrics_text(request.path_params["path"]).split("\n"))
+        return HTMLResponse(f'<html><body><div data-lyrics-container="true">{html}</div></body></html>')
+
+    service = StandIn("genius", [
+        Route("/api/search/multi", search),
+        Route("/api/songs/{song_id:int}", get_song),
+        Route("/songs/{song_id:int}", get_song),
+        Route("/{path}", lyrics_page)
+    ], latency)
+    return service
+
+
+def _message_text(messages: list) -> tuple[str, bool]:
+    """Text of a chat request and whether it carries audio"""
+    text, audio = [], False
+    for message in messages:
+        content = message.get("content")
+        if isinstance(content, str):
+            text.append(content)
+            continue
+        for part in content or []:
+            if part.get("type") == "text":
+                text.append(part["text"])
+            elif part.get("type") == "input_audio":
+                audio = True
+    return "\n".join(text), audio
+
+
+def _mapping_arguments(text: str) -> dict:
+    lyrics = text.split("LYRICS:", 1)[1].split("CHORD PROGRESSIONS:", 1)[0]
+    progressions = re.search(r"CHORD PROGRESSIONS:\s*(\{.*\})", text).group(1)
+    return {
+        "lyrics": "\n".join(line.strip() for line in lyrics.strip().split("\n")),
+        "chord_progressions": progressions
+    }
+
+
+# How the stand-in agent reads each tool's arguments back out of the CrewAI
+# task description (app/crew/tasks.py), by the function name CrewAI sends
+AGENT_TOOL_ARGUMENTS = {
+    "get_spotify_track_info": lambda text: {
+        "spotify_url": re.search(r"song at: (\S+)", text).group(1)
+    },
+    "fetch_song_lyrics": lambda text: dict(zip(
+        ("title", "artist"),
+        re.search(r'lyrics for "(.+?)" by (.+)', text).groups()
+    )),
+    "analyze_audio_for_chords": lambda text: dict(zip(
+        ("audio_file_path", "song_title", "artist"),
+        re.search(r'audio file at (\S+) for "(.+?)" by (.+)', text).groups()
+    )),
+    "map_chords_to_lyrics": _mapping_arguments
+}
+
+
+def _agent_tool_call(body: dict, text: str):
+    """
+    The next step of a CrewAI agent: call its tool, or None once it has
+
+    The agent calls the first tool it is offered that the stand-in knows,
+    once, with the arguments from its task; the tool's output then becomes
+    its final answer.
+    """
+    messages = body.get("messages", [])
+    if any(message.get("role") == "tool" for message in messages):
+        return None
+    for tool in body.get("tools") or []:
+        name = tool.get("function", {}).get("name")
+        if name in AGENT_TOOL_ARGUMENTS:
+            return {
+                "id": f"call_{name}",
+                "type": "function",
+                "function": {"name": name, "arguments": json.dumps(AGENT_TOOL_ARGUMENTS[name](text))}
+            }
+    return None
+
+
+def llm_standin(latency: float) -> StandIn:
+    """
+    OpenAI-compatible chat completions
+
+    Audio requests get a chord analysis of the stand-in progressions; chord
+    mapping requests get their draft mapping back unchanged. CrewAI agents
+    call their tool and answer with its output, and the quality review
+    approves, so PIPELINE_MODE=crew runs end to end.
+    """
+
+    def completion_content(text: str, audio: bool) -> str:
+        if audio:
+            return json.dumps({
+                "key": "C Major",
+                "tempo": 120,
+                "time_signature": 4,
+                "chord_progressions": [
+                    {"section": section, "chords": chords, "timing": "Each chord for 1 bar"}
+                    for section, chords in SECTIONS.items()
+                ],
+                "structure": "-".join(SECTIONS)
+            })
+        marker = "DRAFT MAPPING"
+        if marker in text:
+            draft = text.split(marker, 1)[1].split("\n", 2)[1]
+            return draft
+        return "APPROVED: Chord sheet is accurate and complete"
+
+    async def chat_completions(request: Request):
+        await service.delay()
+        body = await request.json()
+        messages = body.get("messages", [])
+        text, audio = _message_text(messages)
+
+        tool_call = _agent_tool_call(body, text)
+        if tool_call:
+            message = {"role": "assistant", "content": None, "tool_calls": [tool_call]}
+            finish_reason = "tool_calls"
+        else:
+            tool_results = [m["content"] for m in messages if m.get("role") == "tool"]
+            content = tool_results[-1] if tool_results else completion_content(text, audio)
+            message = {"role": "assistant", "content": content}
+            finish_reason = "stop"
+
+        prompt_tokens = len(text) // 4 + (750 if audio else 0)
+        completion_tokens = len(json.dumps(message)) // 4
+        return JSONResponse({
+            "id": f"chatcmpl-standin-{service.requests}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "standin"),
+            "choices": [{
+                "index": 0,
+                "message": message,
+                "finish_reason": finish_reason
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens
+            }
+        })
+
+    service = StandIn("llm", [Route("/v1/chat/completions", chat_completions, methods=["POST"])], latency)
+    return service
+
+
+def start_standins(latency: dict = None, audio_features: bool = False) -> dict[str, StandIn]:
+    """Start all four stand-ins; stop them with stop_standins"""
+    latency = {**DEFAULT_LATENCY, **(latency or {})}
+    cdn = cdn_standin(latency["cdn"])
+    cdn.start()
+    standins = {"cdn": cdn}
+    for name, factory in (
+        ("spotify", lambda: spotify_standin(latency["spotify"], cdn.url, audio_features)),
+        ("genius", lambda: genius_standin(latency["genius"])),
+        ("llm", lambda: llm_standin(latency["llm"]))
+    ):
+        standins[name] = factory()
+        standins[name].start()
+    return standins
+
+
+def stop_standins(standins: dict[str, StandIn]):
+    for standin in standins.values():
+        standin.stop()
+
+
+def standin_env(standins: dict[str, StandIn]) -> dict[str, str]:
+    """Environment that points the app at the stand-ins, with dummy credentials"""
+    return {
+        "SPOTIFY_CLIENT_ID": "standin",
+        "SPOTIFY_CLIENT_SECRET": "standin",
+        "SPOTIFY_API_URL": f"{standins['spotify'].url}/v1/",
+        "SPOTIFY_TOKEN_URL": f"{standins['spotify'].url}/api/token",
+        "GENIUS_ACCESS_TOKEN": "standin",
+        "GENIUS_BASE_URL": standins["genius"].url,
+        "OPENAI_API_KEY": "standin",
+        "OPENAI_API_BASE": f"{standins['llm'].url}/v1",
+        # The provider prefix routes any model name to the OpenAI-compatible stand-in
+        "AUDIO_ANALYSIS_MODEL": "openai/gpt-4o-audio-preview",
+        "TEXT_ANALYSIS_MODEL": "openai/gpt-4o-mini",
+        # litellm would otherwise fetch its model price table at import
+        "LITELLM_LOCAL_MODEL_COST_MAP": "True"
+    }
+
+
+def add_latency_arguments(parser: argparse.ArgumentParser):
+    for name, latency in DEFAULT_LATENCY.items():
+        parser.add_argument(f"--{name}-latency", type=float, default=latency, help=f"Seconds (default {latency})")
+    parser.add_argument("--audio-features", action="store_true", help="Serve Spotify audio features instead of 403")
+
+
+def latency_from_args(args: argparse.Namespace) -> dict:
+    return {name: getattr(args, f"{name}_latency") for name in DEFAULT_LATENCY}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_latency_arguments(parser)
+    args = parser.parse_args()
+
+    standins = start_standins(latency_from_args(args), args.audio_features)
+    for name, value in standin_env(standins).items():
+        print(f"export {name}={value}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        stop_standins(standins)
+
+
+if __name__ == "__main__":
+    main()
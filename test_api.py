@@ -40,11 +40,18 @@ def analyze_song(spotify_url: str, transpose: int = 0):
     response = requests.post(
         f"{BASE_URL}/analyze",
         json=payload,
-        timeout=300  # 5 minutes timeout for long analysis
+        timeout=30
     )
     
-    if response.status_code == 200:
-        result = response.json()
+    if response.status_code != 202:
+        print(f"\n❌ Error: {response.status_code}")
+        print(response.json())
+        return None
+    
+    job = wait_for_job(response.json()['task_id'])
+    
+    if job['status'] == 'completed':
+        result = job['result']
         print("\n✅ Analysis successful!")
         print(f"Task ID: {result['task_id']}")
         print(f"Song: {result['song_info']['title']} by {result['song_info']['artist']}")
@@ -64,11 +71,26 @@ def analyze_song(spotify_url: str, transpose: int = 0):
         
         return result
     else:
-        print(f"\n❌ Error: {response.status_code}")
-        print(response.json())
+        print(f"\n❌ Job {job['status']}: {job.get('error')}")
         return None
 
 
+def wait_for_job(task_id: str, timeout: int = 300, interval: float = 2.0):
+    """Poll the job endpoint until the analysis finishes"""
+    print(f"Job queued: {task_id}")
+    deadline = time.time() + timeout  # 5 minutes timeout for long analysis
+    
+    while True:
+        job = requests.get(f"{BASE_URL}/jobs/{task_id}").json()
+        if job['status'] in ('completed', 'failed', 'cancelled'):
+            return job
+        if time.time() > deadline:
+            requests.delete(f"{BASE_URL}/jobs/{task_id}")
+            return {**job, 'status': 'cancelled', 'error': 'Timed out waiting for job'}
+        print(f"  ...{job['status']}")
+        time.sleep(interval)
+
+
 def download_pdf(task_id: str):
     """Download the generated PDF"""
     print(f"\nDownloading PDF for task {task_id}...")